@@ -1,17 +1,19 @@
 import os
 from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Threads.settings')
+# Django consumer'lar import qilinishidan oldin sozlanadi (modellar/settings kerak)
+django_asgi_app = get_asgi_application()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
-import posts.routing
 from channels.auth import AuthMiddlewareStack
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'your_project.settings')
+import posts.routing
 
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
         URLRouter(
             posts.routing.websocket_urlpatterns
         )
     ),
 })
-
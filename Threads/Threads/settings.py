@@ -83,6 +83,16 @@ CHANNEL_LAYERS = {
     },
 }
 
+# WebSocket (posts.consumers): bitta ulanish obuna bo'lishi mumkin bo'lgan postlar soni.
+# LIKE_COALESCE_WINDOW — post like hisobi shu oynada bir marta yuboriladi (0 — har like'da darhol).
+# BATCH_WINDOW / BATCH_MAX — subprotocol kelishilgan ulanishlarda hodisalar bitta kadrga yig'iladi
+REALTIME = {
+    'MAX_SUBSCRIPTIONS': 50,
+    'LIKE_COALESCE_WINDOW': 0.25,
+    'BATCH_WINDOW': 0.05,
+    'BATCH_MAX': 32,
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -91,6 +101,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Yozuvchi tranzaksiyalar boshidanoq lock oladi va kutadi ("database is locked" o'rniga)
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -117,6 +132,10 @@ AUTHENTICATION_BACKENDS = [
     'accounts.backends.MultiFieldModelBackend',
 ]
 
+# Login/register'dagi parol hash'lari uchun thread pool (accounts.hashing) — jarayonga shuncha
+# parallel hash; odatda CPU yadrolari soni
+PASSWORD_HASH_WORKERS = 4
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -139,6 +158,78 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 
+# Javob keshi (core.cache): versiyali kalitlar signal'lar bilan oshiriladi, TIMEOUT — zaxira muddat.
+# ETag (If-None-Match -> 304) esa bazadagi holatdan — view validatorlari o'qiydi.
+# LOCK_WAIT — bir xil kalitni boshqa so'rov hisoblayotganda kutish vaqti (stampede himoyasi)
+RESPONSE_CACHE = {
+    'TIMEOUT': 60,
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2.0,
+}
+
+# Profil sarlavhasi keshi (profil tahriri, yangi post, follow/unfollow'da o'chiriladi)
+PROFILE_SUMMARY_CACHE_SECONDS = 300
+
+# Home feed: followerlar soni shundan ko'p bo'lsa post fan-out qilinmaydi (o'qishda tortiladi)
+FEED_FANOUT_MAX_FOLLOWERS = 10000
+FEED_FANOUT_BATCH_SIZE = 1000
+
+# Ommabop postlar uchun sharded hisoblagichlar: minutiga shuncha yozuvdan oshsa post
+# COUNTER_SHARDS ta shard'ga o'tkaziladi (None — avtomatik o'tkazish o'chiq)
+COUNTER_SHARDS = 16
+COUNTER_SHARD_PROMOTE_WRITES_PER_MINUTE = 600
+COUNTER_SHARD_READ_CACHE_SECONDS = 2
+
+# Post ko'rishlari buferi: 'posts.ingest.InProcessViewBuffer' (write-behind) yoki
+# 'posts.ingest.SynchronousViewBuffer' (darhol yozish)
+VIEW_BUFFER = {
+    'BACKEND': 'posts.ingest.InProcessViewBuffer',
+    'MAX_SIZE': 500,
+    'FLUSH_INTERVAL': 2.0,
+}
+
+# Ko'rishlarni hisoblash: 'exact' (View qatorlari) yoki 'hll' (HyperLogLog sketch, ~1.6% xato).
+# VIEW_STORE_ROWS=False bo'lsa 'hll' rejimida View qatorlari umuman yozilmaydi;
+# VIEW_ROW_RETENTION_DAYS — prune_views buyrug'i shundan eski qatorlarni o'chiradi.
+VIEW_COUNTING = 'exact'
+VIEW_STORE_ROWS = True
+VIEW_SKETCH_PRECISION = 12
+VIEW_ROW_RETENTION_DAYS = None
+
+# Qidiruv backendi: None — baza turiga qarab (SQLite FTS5 / Postgres tsvector / icontains)
+SEARCH_BACKEND = None
+
+# Trending hashtaglar: 15 daqiqalik bo'laklar, 1 soatlik oyna 24 soatlik fon bilan taqqoslanadi.
+# Manba — baza (PostTag, Comment, Like), shuning uchun hamma worker'larda natija bir xil.
+# Xotira: (WINDOW_BUCKETS + BASELINE_BUCKETS + 2) * DEPTH * WIDTH * 8 bayt (~3.3 MB)
+TRENDING = {
+    'BUCKET_SECONDS': 900,
+    'WINDOW_BUCKETS': 4,
+    'BASELINE_BUCKETS': 96,
+    'WIDTH': 1024,
+    'DEPTH': 4,
+    'CAPACITY': 200,
+    'MIN_COUNT': 3,
+    # Har bir worker yangi hodisalarni bazadan shu oraliqda o'qiydi (trending so'ralganda)
+    'SYNC_SECONDS': 30,
+}
+
+# Tavsiya backendi: 'recent', 'tfidf', 'cf', 'hybrid' yoki to'liq class yo'li
+RECOMMENDER_BACKEND = 'hybrid'
+# Tavsiyalar (recommendation) indeksi saqlanadigan papka
+RECOMMENDER_INDEX_DIR = BASE_DIR / 'var' / 'recommender'
+# Delta segmentida shundan ko'p qator (upsert + tombstone) bo'lsa indeks fonda qayta quriladi
+RECOMMENDER_INDEX_DELTA_MAX_ROWS = 20000
+# Qiziqish vaznlarining yarim yemirilish davri va saqlanadigan termlar soni
+RECOMMENDER_INTEREST_HALF_LIFE = timedelta(days=14)
+RECOMMENDER_INTEREST_MAX_TERMS = 300
+# Collaborative filtering faktorlari va ularning kontent ballari bilan aralashtirish vazni
+RECOMMENDER_CF_DIR = BASE_DIR / 'var' / 'cf'
+RECOMMENDER_CF_WEIGHT = 0.5
+# Oldindan hisoblangan tavsiyalar shu vaqt ichida yangi hisoblanadi
+RECOMMENDER_PRECOMPUTED_TTL = timedelta(hours=6)
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -151,6 +242,9 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # Barcha list endpointlar uchun (created_at, id) bo'yicha cursor pagination
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
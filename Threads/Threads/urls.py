@@ -11,8 +11,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('posts/', include('posts.urls')),
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('', include('core.urls')),  # accounts'dagi /<username> dan oldin bo'lishi kerak
     path('', include('accounts.urls')),
-    # path('', include('core.urls')),
 ]
 
 
@@ -1,20 +1,94 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password, verify_password
+from django.db.models import Q
+
+from . import hashing
 
 UserModel = get_user_model()
 
+
+def login_fields(identifier):
+    # Bir nechta foydalanuvchi mos kelsa (masalan raqamli username boshqasining telefoni) —
+    # identifikator ko'rinishidagi maydon ustun
+    if '@' in identifier:
+        return ('email', 'username', 'phone')
+    if identifier.startswith('+') or identifier.isdigit():
+        return ('phone', 'username', 'email')
+    return ('username', 'email', 'phone')
+
+
+def find_user(identifier):
+    """Login: username, email yoki phone — bitta OR so'rov."""
+    fields = login_fields(identifier)
+    query = Q()
+    for field in fields:
+        query |= Q(**{field: identifier})
+    users = list(UserModel.objects.filter(query)[:len(fields)])
+    for field in fields:
+        for user in users:
+            if getattr(user, field) == identifier:
+                return user
+    return users[0] if users else None
+
+
+def verify(user, password):
+    """
+    Parol bir marta tekshiriladi: (to'g'ri, qayta hash kerak). Foydalanuvchi topilmasa ham
+    bitta hash bajariladi — javob vaqtidan login mavjudligini bilib bo'lmaydi. Bazaga tegmaydi.
+    """
+    if user is None:
+        make_password(password)
+        return False, False
+    return verify_password(password, user.password)
+
+
+def save_password(user, encoded):
+    # Hasher yoki iteratsiyalar o'zgargan — parol yangi parametrlarda saqlanadi
+    user.password = encoded
+    user.save(update_fields=['password'])
+
+
+def authenticate_login(identifier, password):
+    """(user, parol to'g'ri) — user None bo'lsa login topilmadi."""
+    user = find_user(identifier)
+    valid, must_update = verify(user, password)
+    if valid and must_update:
+        save_password(user, make_password(password))
+    return user, valid
+
+
+async def aauthenticate_login(identifier, password):
+    # So'rov — Django'ning sync oqimida (qisqa), hash — hashing pool'ida
+    user = await sync_to_async(find_user)(identifier)
+    valid, must_update = await hashing.run(verify, user, password)
+    if valid and must_update:
+        await sync_to_async(save_password)(user, await hashing.run(make_password, password))
+    return user, valid
+
+
 class MultiFieldModelBackend(ModelBackend):
     """
     Login: email, username yoki phone orqali ruxsat beriladi
     """
     def authenticate(self, request, username=None, password=None, **kwargs):
-        user = None
-        for field in ['username', 'email', 'phone']:
-            try:
-                kwargs = {field: username}
-                user = UserModel.objects.get(**kwargs)
-                if user.check_password(password):
-                    return user
-            except UserModel.DoesNotExist:
-                continue
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if not username or password is None:
+            return None
+        user, valid = authenticate_login(username, password)
+        if valid and self.user_can_authenticate(user):
+            return user
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        # ModelBackend'niki faqat username bo'yicha qidiradi
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if not username or password is None:
+            return None
+        user, valid = await aauthenticate_login(username, password)
+        if valid and self.user_can_authenticate(user):
+            return user
         return None
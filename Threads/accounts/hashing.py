@@ -0,0 +1,28 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+# Parol hash'lari (PBKDF2 ~0.5 s CPU) uchun cheklangan pool. ASGI'da sync view'lar bitta umumiy
+# (thread_sensitive) oqimda ishlaydi — hash u yerda bajarilsa boshqa so'rovlar navbatda turadi.
+# hashlib GIL'ni bo'shatadi, shuning uchun hash'lar yadrolar soniga qadar parallel.
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash',
+            )
+        return _executor
+
+
+async def run(func, *args):
+    """func(*args) hash pool'ida. Faqat CPU ishi uchun — bazaga tegadigan kod sync_to_async orqali."""
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), functools.partial(func, *args))
@@ -2,6 +2,7 @@ from django.db import models
 import shortuuid
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from .managers import UserManager
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator, MinLengthValidator
 
 
@@ -14,6 +15,20 @@ username_validator = RegexValidator(
     )
 )
 
+# Profil URL'i /<username> — bu nomlar boshqa yo'llar (search, metrics, login, ...) bilan to'qnashadi
+RESERVED_USERNAMES = frozenset({
+    'admin', 'auth', 'check', 'follow', 'login', 'logout', 'metrics', 'posts', 'register', 'search',
+})
+
+
+def validate_username_not_reserved(value):
+    if value.lower() in RESERVED_USERNAMES:
+        raise ValidationError("Bu username band (tizim manzili bilan bir xil).")
+
+
+# UserSerializer maydonlari — ETag validatorlari ham aynan shularni o'qiydi
+PUBLIC_FIELDS = ('username', 'fullname', 'bio', 'photo', 'link')
+
 
 def generate_shortuuid():
     return shortuuid.uuid()[:11]
@@ -26,13 +41,16 @@ def random_file_path(instance, filename):
 
 
 class User(AbstractBaseUser, PermissionsMixin):
-    username = models.CharField(max_length=150, unique=True, validators=[username_validator, MinLengthValidator(3, message="Username kamida 3 ta belgidan iborat bo'lishi kerak.")])
+    username = models.CharField(max_length=150, unique=True, validators=[username_validator, validate_username_not_reserved, MinLengthValidator(3, message="Username kamida 3 ta belgidan iborat bo'lishi kerak.")])
     email = models.EmailField(max_length=150, unique=True)
     phone = models.CharField(max_length=13, unique=True)
     fullname = models.CharField(max_length=150)
     bio = models.CharField(max_length=150, null=True, blank=True)
     photo = models.ImageField(verbose_name="profile_picture", upload_to=random_file_path, null=True, blank=True)
     link = models.URLField(null=True, blank=True)
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+    posts_count = models.IntegerField(default=0)
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
@@ -44,6 +62,10 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.username
+
+    def etag_state(self):
+        """PUBLIC_FIELDS qiymatlari (rasm — fayl nomi): javobdagi foydalanuvchi ma'lumoti o'zgarganini bilish uchun."""
+        return self.username, self.fullname, self.bio, self.photo.name, self.link
     
 
 class UserFollow(models.Model):
@@ -61,6 +83,10 @@ class UserFollow(models.Model):
 
     class Meta:
         unique_together = ('follower', 'following')  # Bir odamni ikki marta follow qilib bo‘lmaydi
+        indexes = [
+            models.Index(fields=['following', '-created_at', '-id'], name='follow_following_created_idx'),
+            models.Index(fields=['follower', '-created_at', '-id'], name='follow_follower_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.follower} ➡️ {self.following}"
\ No newline at end of file
@@ -2,7 +2,8 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 from django.utils.translation import gettext_lazy as _
-from accounts.models import User, UserFollow
+from accounts.models import PUBLIC_FIELDS, User, UserFollow
+from accounts.backends import aauthenticate_login, authenticate_login
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 
@@ -14,7 +15,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        fields = ('username', 'fullname', 'bio', 'photo', 'link') 
+        fields = PUBLIC_FIELDS
     
     def get_photo(self, obj):
         request = self.context.get('request')
@@ -30,14 +31,24 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ('username', 'email', 'phone', 'fullname', 'password')
 
-    def create(self, validated_data):
-        user = User(**validated_data)
-        password = validated_data.pop('password')
+    def validate(self, attrs):
+        # Parol qoidalari hash'dan oldin tekshiriladi
+        user = User(**{key: value for key, value in attrs.items() if key != 'password'})
         try:
-            validate_password(password, user)
+            validate_password(attrs['password'], user)
         except DjangoValidationError as e:
             raise serializers.ValidationError({"password": e.messages})
-        user.set_password(password)
+        return attrs
+
+    def create(self, validated_data):
+        password = validated_data.pop('password')
+        # Async RegisterView hash'ni pool'da oldindan hisoblaydi (save(password_hash=...))
+        password_hash = validated_data.pop('password_hash', None)
+        user = User(**validated_data)
+        if password_hash:
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save()
         return user
 
@@ -47,36 +58,38 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
     def validate(self, attrs):
-        identifier = attrs.get("login")
-        password = attrs.get("password")
+        user, valid = authenticate_login(attrs["login"], attrs["password"])
+        return self.check_login(attrs, user, valid)
 
-        user = None
+    async def ais_valid(self):
+        # is_valid() ning async varianti: maydonlar odatdagidek, login — aauthenticate_login (hash pool'da)
+        try:
+            attrs = self.to_internal_value(self.initial_data)
+            user, valid = await aauthenticate_login(attrs["login"], attrs["password"])
+            self._validated_data = self.check_login(attrs, user, valid)
+        except serializers.ValidationError as exc:
+            self._validated_data = {}
+            self._errors = serializers.as_serializer_error(exc)
+        else:
+            self._errors = {}
+        return not self._errors
 
-        # Har xil maydonlar orqali aniqlashga harakat qilamiz
-        if "@" in identifier:
-            try:
-                user_obj = User.objects.get(email=identifier)
-            except User.DoesNotExist:
+    def check_login(self, attrs, user, valid):
+        identifier = attrs["login"]
+        if user is None:
+            if "@" in identifier:
                 raise serializers.ValidationError(_("Email noto‘g‘ri"))
-        elif identifier.startswith("+") or identifier.isdigit():
-            try:
-                user_obj = User.objects.get(phone=identifier)
-            except User.DoesNotExist:
+            if identifier.startswith("+") or identifier.isdigit():
                 raise serializers.ValidationError(_("Telefon raqam noto‘g‘ri"))
-        else:
-            try:
-                user_obj = User.objects.get(username=identifier)
-            except User.DoesNotExist:
-                raise serializers.ValidationError(_("Username noto‘g‘ri"))
+            raise serializers.ValidationError(_("Username noto‘g‘ri"))
 
-        # Parolni tekshirish
-        if not user_obj.check_password(password):
+        if not valid:
             raise serializers.ValidationError(_("Parol noto‘g‘ri"))
 
-        if not user_obj.is_active:
+        if not user.is_active:
             raise serializers.ValidationError(_("Foydalanuvchi aktiv emas"))
 
-        attrs["user"] = user_obj
+        attrs["user"] = user
         return attrs
     
 
@@ -97,25 +110,16 @@ class LogoutSerializer(serializers.Serializer):
 
 class ProfileSerializer(serializers.ModelSerializer):
     is_owner = serializers.SerializerMethodField()
-    posts = serializers.SerializerMethodField()
-    followers_count = serializers.SerializerMethodField()
-    following_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ('username', 'email', 'phone', 'fullname', 'bio', 'photo', 'link', 'is_owner', 'posts', 'followers_count', 'following_count')
-        read_only_fields = ('is_owner', 'posts')
+        fields = ('username', 'email', 'phone', 'fullname', 'bio', 'photo', 'link', 'is_owner', 'followers_count', 'following_count')
+        read_only_fields = ('is_owner', 'followers_count', 'following_count')
 
     def get_is_owner(self, obj):
         request = self.context.get('request')
-        print(request.user, obj)
         return request.user == obj
 
-    def get_posts(self, obj):
-        from posts.serializers import PostSerializer
-        request = self.context.get('request') 
-        return PostSerializer(obj.posts.all().order_by('-created_at'), many=True, context={'request': request}).data
-
     def to_representation(self, instance):
         # Get the default representation
         representation = super().to_representation(instance)
@@ -127,12 +131,6 @@ class ProfileSerializer(serializers.ModelSerializer):
             representation.pop('phone', None)
             
         return representation
-    
-    def get_followers_count(self, obj):
-        return obj.followers.count()
-    
-    def get_following_count(self, obj):
-        return obj.following.count()
         
 
 
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import invalidate, user_scope
+from .models import User, UserFollow
+from .summary import invalidate_profile_summary
+
+PROFILE_PARTS = ('profile', 'posts', 'followers', 'following')
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    # Username o'zgarsa eski kalit bo'yicha kesh ham o'chirilishi kerak
+    if instance.pk and (update_fields is None or 'username' in update_fields):
+        instance._old_username = User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_summary(sender, instance, **kwargs):
+    old_username = getattr(instance, '_old_username', None)
+    invalidate_profile_summary(instance.username, old_username)
+    # Postlar ro'yxatida muallif ma'lumoti ham bor
+    scopes = [user_scope(instance.username, 'profile'), user_scope(instance.username, 'posts')]
+    if old_username and old_username != instance.username:
+        scopes += [user_scope(old_username, part) for part in PROFILE_PARTS]
+    invalidate(*scopes)
+
+
+@receiver(post_save, sender=UserFollow)
+@receiver(post_delete, sender=UserFollow)
+def invalidate_follow_summaries(sender, instance, **kwargs):
+    follower, following = instance.follower.username, instance.following.username
+    invalidate_profile_summary(follower, following)
+    invalidate(
+        user_scope(following, 'followers'), user_scope(following, 'profile'),
+        user_scope(follower, 'following'), user_scope(follower, 'profile'),
+    )
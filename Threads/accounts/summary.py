@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+# summary_state shu tartibda qaytaradi
+SUMMARY_FIELDS = ('id', 'username', 'fullname', 'bio', 'photo', 'link', 'followers_count', 'following_count', 'posts_count')
+
+
+def _key(username):
+    return f'profile:summary:{username}'
+
+
+def summary_state(username):
+    """Sarlavha qiymatlari bazadan — bitta qator (hisoblagichlar denormalizatsiya qilingan). Topilmasa None."""
+    from .models import User
+
+    return User.objects.filter(username=username).values_list(*SUMMARY_FIELDS).first()
+
+
+def get_profile_summary(username, state=None):
+    """
+    Profil sarlavhasi (hisoblagichlar, bio, rasm) — username bo'yicha keshlanadi, shuning uchun
+    keshdan o'qilganda bazaga umuman murojaat qilinmaydi. Foydalanuvchi topilmasa None.
+
+    state (summary_state, masalan ETag validatori o'qigan) berilsa keshdagi yozuv faqat shu holat
+    uchun olinadi, aks holda sarlavha state'dan so'rovsiz quriladi — boshqa worker yangilagan
+    profil (bu jarayonning keshi tozalanmagan) yangi ETag bilan eski sarlavhada qaytmaydi.
+    """
+    from .models import User
+
+    key = _key(username)
+    cached = cache.get(key)
+    if cached is not None and (state is None or cached[0] == state):
+        return cached[1]
+    if state is None:
+        state = summary_state(username)
+        if state is None:
+            return None
+    summary = dict(zip(SUMMARY_FIELDS, state))
+    summary['photo'] = User._meta.get_field('photo').storage.url(summary['photo']) if summary['photo'] else None
+    cache.set(key, (state, summary), settings.PROFILE_SUMMARY_CACHE_SECONDS)
+    return summary
+
+
+def invalidate_profile_summary(*usernames):
+    """Commit'dan keyin keshni o'chiradi (F() bilan yangilangan hisoblagichlar ham ko'rinsin)."""
+    keys = [_key(username) for username in usernames if username]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
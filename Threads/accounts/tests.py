@@ -1,3 +1,252 @@
-from django.test import TestCase
+from django.contrib.auth import aauthenticate, authenticate
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from posts.models import Post
+from .backends import aauthenticate_login, find_user, verify
+from .models import RESERVED_USERNAMES, User, UserFollow
+from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
+
+
+class ReservedUsernameTests(TestCase):
+    def register(self, username):
+        return APIClient().post(reverse('register'), {
+            'username': username, 'email': f'{username}@example.com', 'phone': '+998900000000',
+            'fullname': 'Test', 'password': 'parol-12345',
+        }, format='json')
+
+    def test_reserved_usernames_shadow_routes(self):
+        # Har bir band nom haqiqatan ham profil emas, boshqa view'ga tushadi (ro'yxat eskirmasin)
+        for name in ('search', 'metrics', 'login', 'logout', 'register'):
+            with self.subTest(name=name):
+                self.assertIn(name, RESERVED_USERNAMES)
+                self.assertNotEqual(resolve(f'/{name}').url_name, 'profile')
+
+    def test_register_rejects_reserved_username(self):
+        for name in ('search', 'Metrics'):
+            with self.subTest(name=name):
+                response = self.register(name)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('username', response.json())
+
+    def test_check_username_reports_reserved(self):
+        response = APIClient().post(reverse('check-username'), {'username': 'search'})
+        self.assertFalse(response.json()['available'])
+
+    def test_regular_username_registers(self):
+        self.assertEqual(self.register('searcher').status_code, 201)
+
+
+class ProfileETagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', '+998900000001', password='x' * 12)
+        cls.fan = User.objects.create_user('fan', 'fan@example.com', '+998900000002', password='x' * 12)
+        UserFollow.objects.create(follower=cls.fan, following=cls.owner)
+        cls.post = Post.objects.create(author=cls.owner, content='salom')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('profile', kwargs={'username': 'owner'})
+
+    def test_not_modified(self):
+        etag = APIClient().get(self.url)['ETag']
+        cache.clear()  # boshqa worker
+        self.assertEqual(APIClient().get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_header_not_stale_after_unsignalled_change(self):
+        # F() bilan yangilangan hisoblagich: signal yo'q — bu jarayonning sarlavha keshi tozalanmaydi
+        # (boshqa worker'dagi follow kabi), lekin javob ham, ETag ham bazadan
+        etag = APIClient().get(self.url)['ETag']
+        User.objects.filter(pk=self.owner.pk).update(followers_count=F('followers_count') + 5)
+        response = APIClient().get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['followers_count'], 5)
+
+    def test_posts_page_changes_etag(self):
+        url = f'{self.url}?fields=posts'
+        etag = APIClient().get(url)['ETag']
+        Post.objects.filter(pk=self.post.pk).update(views_count=3)
+        response = APIClient().get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['posts']['results'][0]['views_count'], 3)
+
+    def test_owner_contact_changes_etag(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        etag = client.get(self.url)['ETag']
+        self.assertNotEqual(etag, APIClient().get(self.url)['ETag'])
+        User.objects.filter(pk=self.owner.pk).update(email='new@example.com')
+        client.force_authenticate(User.objects.get(pk=self.owner.pk))
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['email'], 'new@example.com')
+
+    def test_followers_etag(self):
+        url = reverse('user-followers', kwargs={'username': 'owner'})
+        etag = APIClient().get(url)['ETag']
+        User.objects.filter(pk=self.fan.pk).update(fullname='Muxlis')
+        response = APIClient().get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['followers'][0]['fullname'], 'Muxlis')
+
+    def test_missing_user(self):
+        for name in ('profile', 'user-followers', 'user-following'):
+            with self.subTest(name):
+                url = reverse(name, kwargs={'username': 'ghost'})
+                self.assertEqual(APIClient().get(url, HTTP_IF_NONE_MATCH='*').status_code, 404)
+
+    def test_header_is_one_row_query(self):
+        # Sarlavha: ETag ham, javob ham bitta qatordan (posts_count ustun, COUNT yo'q)
+        url = f'{self.url}?fields=header'
+        etag = APIClient().get(url)['ETag']
+        for header in (None, etag):
+            with self.subTest(if_none_match=header), CaptureQueriesContext(connection) as queries:
+                kwargs = {'HTTP_IF_NONE_MATCH': header} if header else {}
+                response = APIClient().get(url, **kwargs)
+            self.assertEqual(response.status_code, 304 if header else 200)
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn('COUNT(', queries[0]['sql'].upper())
+            self.assertNotIn('JOIN', queries[0]['sql'].upper())
+
+    def test_posts_count_column(self):
+        Post.objects.create(author=self.owner, content='ikkinchi')
+        self.assertEqual(APIClient().get(self.url).json()['posts_count'], 2)
+        Post.objects.filter(pk=self.post.pk).delete()
+        self.owner.refresh_from_db()
+        self.assertEqual(self.owner.posts_count, 1)
+
+
+# Testlarda PBKDF2 (~0.5 s) o'rniga tez hasher; qayta hash testi o'zi PBKDF2 hash yozadi
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher', 'django.contrib.auth.hashers.PBKDF2PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LoginBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', '+998901112233', password='secret-pass-1')
+        # Raqamli username boshqa foydalanuvchining telefoni bilan bir xil
+        cls.other = User.objects.create_user('998904445566', 'other@example.com', '+998907778899', password='secret-pass-2')
+        cls.owner = User.objects.create_user('phoneowner', 'owner@example.com', '998904445566', password='secret-pass-3')
+
+    def test_find_user_by_each_field(self):
+        for identifier in ('alice', 'alice@example.com', '+998901112233'):
+            with self.subTest(identifier=identifier), self.assertNumQueries(1):
+                self.assertEqual(find_user(identifier), self.user)
+
+    def test_ambiguous_identifier_prefers_its_shape(self):
+        # Faqat raqamlar — telefon ko'rinishi, username emas
+        self.assertEqual(find_user('998904445566'), self.owner)
+
+    def test_unknown_user(self):
+        self.assertIsNone(find_user('nobody'))
+        # Foydalanuvchi topilmasa ham hash bajariladi (vaqt bo'yicha farq qilmaydi)
+        with self.assertNumQueries(0):
+            self.assertEqual(verify(None, 'secret-pass-1'), (False, False))
+
+    def test_verify(self):
+        self.assertEqual(verify(self.user, 'secret-pass-1'), (True, False))
+        self.assertEqual(verify(self.user, 'wrong'), (False, False))
+
+    def test_authenticate(self):
+        for identifier in ('alice', 'alice@example.com', '+998901112233'):
+            with self.subTest(identifier=identifier):
+                self.assertEqual(authenticate(username=identifier, password='secret-pass-1'), self.user)
+        self.assertIsNone(authenticate(username='alice', password='wrong'))
+        self.assertIsNone(authenticate(username='nobody', password='secret-pass-1'))
+
+    def test_inactive_user_rejected(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(authenticate(username='alice', password='secret-pass-1'))
+
+    async def test_aauthenticate(self):
+        for identifier in ('alice', 'alice@example.com', '+998901112233'):
+            with self.subTest(identifier=identifier):
+                self.assertEqual(await aauthenticate(username=identifier, password='secret-pass-1'), self.user)
+        self.assertEqual(await aauthenticate(username='998904445566', password='secret-pass-3'), self.owner)
+        self.assertIsNone(await aauthenticate(username='alice', password='wrong'))
+        self.assertIsNone(await aauthenticate(username='nobody', password='secret-pass-1'))
+
+    async def test_aauthenticate_login_rehashes_outdated_password(self):
+        # PBKDF2 hash'i — birinchi hasher (MD5) emas, login'da yangilanadi
+        await User.objects.filter(pk=self.user.pk).aupdate(
+            password=make_password('secret-pass-1', hasher='pbkdf2_sha256'),
+        )
+        user, valid = await aauthenticate_login('alice', 'secret-pass-1')
+        self.assertTrue(valid)
+        stored = (await User.objects.aget(pk=self.user.pk)).password
+        self.assertTrue(stored.startswith('md5$'))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class AsyncAuthViewTests(TestCase):
+    """Async Login/Register view'lari sync serializer yo'li bilan bir xil status va javob qaytaradi."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'alice', 'alice@example.com', '+998901112233', password='secret-pass-1', fullname='Alice',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assertTokenResponse(self, response, status_code, message, user):
+        self.assertEqual(response.status_code, status_code)
+        body = response.json()
+        self.assertEqual(set(body), {'message', 'user', 'refresh', 'access'})
+        self.assertEqual(body['message'], message)
+        self.assertEqual(body['user'], UserSerializer(user).data)
+
+    def test_login_by_each_field(self):
+        for identifier in ('alice', 'alice@example.com', '+998901112233'):
+            with self.subTest(identifier=identifier):
+                response = self.client.post(reverse('login'), {'login': identifier, 'password': 'secret-pass-1'}, format='json')
+                self.assertTokenResponse(response, 200, 'Tizimga muvaffaqiyatli kirildi!', self.user)
+
+    def test_login_errors_match_sync_serializer(self):
+        cases = [
+            {'login': 'alice', 'password': 'wrong'},
+            {'login': 'nobody', 'password': 'secret-pass-1'},
+            {'login': 'nobody@example.com', 'password': 'secret-pass-1'},
+            {'login': '+998900000000', 'password': 'secret-pass-1'},
+            {'login': 'alice'},
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                serializer = LoginSerializer(data=data)
+                self.assertFalse(serializer.is_valid())
+                response = self.client.post(reverse('login'), data, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), serializer.errors)
+
+    def test_register(self):
+        data = {
+            'username': 'bobby', 'email': 'bob@example.com', 'phone': '+998905556677',
+            'fullname': 'Bob', 'password': 'long-enough-pass-9',
+        }
+        response = self.client.post(reverse('register'), data, format='json')
+        user = User.objects.get(username='bobby')
+        self.assertTokenResponse(response, 201, 'Foydalanuvchi muvaffaqiyatli yaratildi', user)
+        self.assertTrue(user.check_password('long-enough-pass-9'))
+
+    def test_register_errors_match_sync_serializer(self):
+        cases = [
+            {'username': 'alice', 'email': 'new@example.com', 'phone': '+998905556677', 'fullname': 'A', 'password': 'long-enough-pass-9'},
+            {'username': 'bobby', 'email': 'bob@example.com', 'phone': '+998905556677', 'fullname': 'Bob', 'password': '123'},
+            {'username': 'bobby'},
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                serializer = RegisterSerializer(data=data)
+                self.assertFalse(serializer.is_valid())
+                response = self.client.post(reverse('register'), data, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), serializer.errors)
+        self.assertFalse(User.objects.filter(username='bobby').exists())
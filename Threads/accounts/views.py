@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics
@@ -7,41 +8,65 @@ from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.decorators import api_view, parser_classes
 from django.shortcuts import get_object_or_404
-from .models import User, UserFollow
-
-class RegisterView(APIView):
+from django.db import transaction
+from django.db.models import F
+from .models import PUBLIC_FIELDS, RESERVED_USERNAMES, User, UserFollow
+from rest_framework.utils.urls import replace_query_param
+from django.http import Http404
+from django.contrib.auth.hashers import make_password
+from core.pagination import KeysetPagination
+from core.cache import cache_response, page_state, user_scope
+from core.views import AsyncAPIView
+from posts.models import Post
+from posts.serializers import PostSerializer
+from .summary import get_profile_summary, summary_state
+from . import hashing
+
+def token_response(user, message):
+    refresh = RefreshToken.for_user(user) # JWT token yaratish
+    return {
+        "message": message,
+        "user": UserSerializer(user).data,
+        "refresh": str(refresh),
+        "access": str(refresh.access_token)
+    }
+
+
+def follows_state(view, user_field, shown_field):
+    # ETag validatori: sahifadagi follow yozuvlari va ko'rsatiladigan foydalanuvchilar ma'lumoti
+    user_id = User.objects.filter(username=view.kwargs['username']).values_list('id', flat=True).first()
+    if user_id is None:
+        return None
+    return page_state(
+        UserFollow.objects.filter(**{user_field: user_id}).select_related(shown_field)
+        .only('created_at', *(f'{shown_field}__{field}' for field in PUBLIC_FIELDS)),
+        view, lambda follow: (follow.pk, getattr(follow, shown_field).etag_state()),
+    )
+
+
+class RegisterView(AsyncAPIView):
     parser_classes = [JSONParser, MultiPartParser, FormParser]  # Rasmlar uchun
 
-    def post(self, request):
+    async def post(self, request):
         serializer = RegisterSerializer(data=request.data)
-        if serializer.is_valid():
-            user = serializer.save()
-            user_data = UserSerializer(user).data
-            refresh = RefreshToken.for_user(user) # JWT token yaratish
-            return Response({
-                "message": "Foydalanuvchi muvaffaqiyatli yaratildi",
-                "user": user_data,
-                "refresh": str(refresh),
-                "access": str(refresh.access_token)
-            }, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not await sync_to_async(serializer.is_valid)():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # Hash — hashing pool'ida, so'rovlar — sync oqimda
+        password_hash = await hashing.run(make_password, serializer.validated_data['password'])
+        user = await sync_to_async(serializer.save)(password_hash=password_hash)
+        data = await sync_to_async(token_response)(user, "Foydalanuvchi muvaffaqiyatli yaratildi")
+        return Response(data, status=status.HTTP_201_CREATED)
 
 
-class LoginView(APIView): 
+class LoginView(AsyncAPIView): 
     # permission_classes = [AllowAny]  
 
-    def post(self, request):
+    async def post(self, request):
         serializer = LoginSerializer(data=request.data)
-        if serializer.is_valid():
+        if await serializer.ais_valid():
             user = serializer.validated_data["user"]
-            refresh = RefreshToken.for_user(user)
-            user_data = UserSerializer(user).data
-            return Response({
-                "message": "Tizimga muvaffaqiyatli kirildi!",
-                "user": user_data,
-                "refresh": str(refresh),
-                "access": str(refresh.access_token)
-            }, status=status.HTTP_200_OK)
+            data = await sync_to_async(token_response)(user, "Tizimga muvaffaqiyatli kirildi!")
+            return Response(data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -71,6 +96,71 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return get_object_or_404(self.get_queryset(), username=self.kwargs['username'])
 
+    def is_owner(self):
+        return self.request.user.is_authenticated and self.request.user.username == self.kwargs['username']
+
+    def requested_fields(self):
+        # ?fields=header — faqat sarlavha, ?fields=posts — faqat postlar sahifasi (?cursor= bilan)
+        return set(self.request.query_params.get('fields', 'header,posts').split(','))
+
+    def etag_state(self):
+        # ETag validatori: sarlavha (bitta so'rov), egasiga email/telefon, so'ralgan bo'lsa postlar sahifasi.
+        # Sarlavha holati retrieve'da ham ishlatiladi — javob aynan shu holatdan quriladi
+        self.summary_state = summary_state(self.kwargs['username'])
+        if self.summary_state is None:
+            return None
+        values = [self.summary_state]
+        if self.is_owner():
+            values.append((self.request.user.email, self.request.user.phone))
+        if 'posts' in self.requested_fields():
+            posts = Post.objects.filter(author_id=self.summary_state[0]).for_etag()
+            values.append(page_state(posts, self, Post.etag_state))
+        return values
+
+    @cache_response(
+        lambda view: [user_scope(view.kwargs['username'], 'profile'), user_scope(view.kwargs['username'], 'posts')],
+        lambda view: view.etag_state(),
+        variant=lambda view: 'owner' if view.is_owner() else 'public',
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        summary = get_profile_summary(self.kwargs['username'], getattr(self, 'summary_state', None))
+        if summary is None:
+            raise Http404
+        fields = self.requested_fields()
+        data = {}
+        if 'header' in fields:
+            data.update(self.get_header(summary))
+        if 'posts' in fields:
+            data['posts'] = self.get_posts_page(summary)
+        return Response(data)
+
+    def get_header(self, summary):
+        request = self.request
+        header = {key: value for key, value in summary.items() if key != 'id'}
+        if header['photo']:
+            header['photo'] = request.build_absolute_uri(header['photo'])
+        header['is_owner'] = request.user.is_authenticated and request.user.pk == summary['id']
+        if header['is_owner']:
+            # Email va telefon faqat egasiga — request.user'dan, keshda saqlanmaydi
+            header['email'] = request.user.email
+            header['phone'] = request.user.phone
+        return header
+
+    def get_posts_page(self, summary):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(
+            Post.objects.with_related().filter(author_id=summary['id']), self.request, view=self,
+        )
+        next_link = paginator.get_next_link()
+        if next_link:
+            # Keyingi sahifalar sarlavhasiz yuklanadi
+            next_link = replace_query_param(next_link, 'fields', 'posts')
+        serializer = PostSerializer(page, many=True, context={'request': self.request})
+        return {'next': next_link, 'results': serializer.data}
+
     def update(self, request, *args, **kwargs):
         obj = self.get_object()
         if not request.user.is_authenticated or request.user != obj:
@@ -86,7 +176,7 @@ def check_username(request):
     if not username:
         return Response({"error": "Username is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-    if User.objects.filter(username=username).exists():
+    if username.lower() in RESERVED_USERNAMES or User.objects.filter(username=username).exists():
         return Response({"available": False, "message": "Username already taken."})
     return Response({"available": True})
 
@@ -135,36 +225,56 @@ class FollowView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        follow_instance = UserFollow.objects.filter(
-            follower=follower,
-            following=following
-        ).first()
-
-        if follow_instance:
-            follow_instance.delete()
+        with transaction.atomic():
+            follow_instance = UserFollow.objects.filter(
+                follower=follower,
+                following=following
+            ).first()
+
+            if follow_instance:
+                follow_instance.delete()
+                delta = -1
+            else:
+                UserFollow.objects.create(follower=follower, following=following)
+                delta = 1
+            # Hisoblagichlar follow yozuvi bilan bitta tranzaksiyada yangilanadi
+            User.objects.filter(pk=follower.pk).update(following_count=F('following_count') + delta)
+            User.objects.filter(pk=following.pk).update(followers_count=F('followers_count') + delta)
+
+        if delta < 0:
             return Response({"detail": "Unfollowed"}, status=status.HTTP_204_NO_CONTENT)
-        else:
-            UserFollow.objects.create(follower=follower, following=following)
-            return Response({"detail": "Followed"}, status=status.HTTP_201_CREATED)
+        return Response({"detail": "Followed"}, status=status.HTTP_201_CREATED)
     
 
 class FollowersView(APIView):
+    @cache_response(
+        lambda view: [user_scope(view.kwargs['username'], 'followers')],
+        lambda view: follows_state(view, 'following', 'follower'),
+    )
     def get(self, request, username):
         user = get_object_or_404(User, username=username)
 
         followers_qs = UserFollow.objects.filter(following=user).select_related('follower')
-        followers = [follow.follower for follow in followers_qs]  # faqat userlar
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(followers_qs, request, view=self)
+        followers = [follow.follower for follow in page]  # faqat userlar
 
-        data = UserSerializer(followers, many=True)
-        return Response({"followers": data.data}, status=status.HTTP_200_OK)
+        data = UserSerializer(followers, many=True, context={'request': request})
+        return paginator.get_paginated_response(data.data, key='followers')
 
 
 class FollowingView(APIView):
+    @cache_response(
+        lambda view: [user_scope(view.kwargs['username'], 'following')],
+        lambda view: follows_state(view, 'follower', 'following'),
+    )
     def get(self, request, username):
         user = get_object_or_404(User, username=username)
 
         following_qs = UserFollow.objects.filter(follower=user).select_related('following')
-        followings = [follow.following for follow in following_qs]  # faqat userlar
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(following_qs, request, view=self)
+        followings = [follow.following for follow in page]  # faqat userlar
 
         data = UserSerializer(followings, many=True, context={'request': request})
-        return Response({"following": data.data}, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(data.data, key='following')
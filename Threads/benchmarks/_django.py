@@ -0,0 +1,46 @@
+import os
+import shutil
+import tempfile
+
+
+def setup(**overrides):
+    """
+    Django'ni vaqtinchalik SQLite bazasi bilan ishga tushiradi (asosiy bazaga tegmaydi).
+    Vaqtinchalik papka yo'lini qaytaradi.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Threads.settings')
+    import django
+    from django.conf import settings
+
+    workdir = tempfile.mkdtemp(prefix='threads-bench-')
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(workdir, 'db.sqlite3'),
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 30},
+    }
+    settings.RECOMMENDER_INDEX_DIR = os.path.join(workdir, 'recommender')
+    settings.RECOMMENDER_CF_DIR = os.path.join(workdir, 'cf')
+    settings.ALLOWED_HOSTS = ['*']
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+    import logging
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    return workdir
+
+
+def teardown(workdir):
+    from django.db import connections
+    connections.close_all()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
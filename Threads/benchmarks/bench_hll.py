@@ -0,0 +1,50 @@
+"""
+HyperLogLog aniqligi va xotirasi: aniq set bilan solishtirish, kunlik sketch'larni birlashtirish.
+
+    python -m benchmarks.bench_hll
+"""
+import argparse
+import sys
+import time
+
+from posts.hyperloglog import HyperLogLog
+
+
+def set_memory(items):
+    return sys.getsizeof(items) + sum(sys.getsizeof(item) for item in items)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--precision', type=int, default=12)
+    parser.add_argument('--days', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'viewers':>9} {'exact KB':>10} {'hll KB':>7} {'estimate':>10} {'error %':>8} {'merged err %':>13} {'add µs':>7}")
+    for n in args.sizes:
+        keys = [f'u{i}' for i in range(n)]
+        exact = set(keys)
+
+        sketch = HyperLogLog(args.precision)
+        started = time.perf_counter()
+        sketch.update(keys)
+        per_add = (time.perf_counter() - started) / n * 1e6
+        estimate = sketch.estimate()
+
+        # Bir xil ko'ruvchilar bir necha kunda takrorlanadi — birlashtirilgan sketch ularni bir marta sanaydi
+        merged = HyperLogLog(args.precision)
+        for day in range(args.days):
+            daily = HyperLogLog(args.precision)
+            daily.update(keys[day * n // (2 * args.days): n // 2 + day * n // (2 * args.days)])
+            merged.merge(daily)
+        merged_truth = len(set(keys[:n // 2 + (args.days - 1) * n // (2 * args.days)]))
+
+        print(
+            f"{n:>9} {set_memory(exact) / 1024:>10.0f} {len(sketch.to_bytes()) / 1024:>7.0f} {estimate:>10.0f} "
+            f"{abs(estimate - n) / n * 100:>8.2f} {abs(merged.estimate() - merged_truth) / merged_truth * 100:>13.2f} {per_add:>7.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Bitta postga ko'p oqimli like/unlike yuklamasi: oddiy va sharded hisoblagichlar.
+Har bir oqim o'z foydalanuvchisi nomidan LikeToggleView'ni chaqiradi.
+
+    python -m benchmarks.bench_like_contention --threads 16 --toggles 50
+"""
+import argparse
+import threading
+import time
+
+from benchmarks._django import setup, teardown, percentile
+
+
+def run(post, users, toggles):
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(users))
+
+    def worker(user):
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(user)
+        local, failed = [], 0
+        barrier.wait()
+        for _ in range(toggles):
+            started = time.perf_counter()
+            try:
+                response = client.post(f'/posts/{post.uid}/like')
+                if response.status_code >= 400:
+                    failed += 1
+            except Exception:
+                failed += 1
+            local.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--toggles', type=int, default=50)
+    parser.add_argument('--shards', type=int, default=16)
+    args = parser.parse_args()
+
+    workdir = setup(COUNTER_SHARD_PROMOTE_WRITES_PER_MINUTE=None)
+    try:
+        from accounts.models import User
+        from posts.models import Post
+        from posts import counters
+        from django.core.cache import cache
+
+        users = [
+            User.objects.create_user(f'bench{i}', f'bench{i}@example.com', f'+99890{i:07d}', password='benchpass123')
+            for i in range(args.threads)
+        ]
+        author = User.objects.create_user('author', 'author@example.com', '+998000000000', password='benchpass123')
+
+        print(f"{'mode':>8} {'ops/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'likes':>6}")
+        for mode in ('plain', 'sharded'):
+            post = Post.objects.create(author=author, content=f'{mode} benchmark post')
+            if mode == 'sharded':
+                counters.promote(post, shards=args.shards)
+            latencies, errors, elapsed = run(post, users, args.toggles)
+            post.refresh_from_db()
+            cache.clear()
+            total = len(latencies)
+            print(
+                f"{mode:>8} {total / elapsed:>8.0f} {percentile(latencies, 50) * 1000:>8.2f} "
+                f"{percentile(latencies, 99) * 1000:>8.2f} {errors:>7} {counters.get_count(post, 'likes_count'):>6}"
+            )
+    finally:
+        teardown(workdir)
+
+
+if __name__ == '__main__':
+    main()
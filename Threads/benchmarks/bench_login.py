@@ -0,0 +1,189 @@
+"""
+Login: eski MultiFieldModelBackend (maydonlar bo'yicha uchta get(), har biriga check_password)
+va accounts.backends resolver'i (bitta OR so'rov, bitta parol tekshiruvi) — so'rovlar va hash'lar.
+
+So'ng bitta ASGI worker'da logins/s: sync view (hash Django'ning umumiy thread_sensitive
+oqimida) va async LoginView (hash accounts.hashing pool'ida). Login'lar bilan bir vaqtda
+yengil sync endpoint (ping) kechikishi o'lchanadi — hash boshqa so'rovlarni to'sadimi.
+
+    python -m benchmarks.bench_login --logins 40 --concurrency 8
+    python -m benchmarks.bench_login --iterations 100000   # tezroq hasher bilan
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+from benchmarks._django import percentile, setup, teardown
+
+
+PASSWORD = 'parol-12345'
+
+
+class CountingHasher(PBKDF2PasswordHasher):
+    calls = 0
+
+    def encode(self, password, salt, iterations=None):
+        type(self).calls += 1
+        return super().encode(password, salt, iterations)
+
+
+def hasher():
+    # PASSWORD_HASHERS'dagi klass (-m bilan ishga tushganda __main__ dagisi boshqa obyekt)
+    from django.contrib.auth.hashers import get_hasher
+    return type(get_hasher())
+
+
+def legacy_authenticate(username, password):
+    # Eski MultiFieldModelBackend.authenticate
+    from accounts.models import User
+
+    for field in ['username', 'email', 'phone']:
+        try:
+            user = User.objects.get(**{field: username})
+            if user.check_password(password):
+                return user
+        except User.DoesNotExist:
+            continue
+    return None
+
+
+def __getattr__(name):
+    # ROOT_URLCONF — Django setup'dan keyin import qilinadi
+    if name != 'urlpatterns':
+        raise AttributeError(name)
+    from django.urls import path
+    from rest_framework.permissions import AllowAny
+    from rest_framework.response import Response
+    from rest_framework.views import APIView
+    from accounts.serializers import LoginSerializer
+    from accounts.views import LoginView, token_response
+
+    class SyncLoginView(APIView):
+        def post(self, request):
+            serializer = LoginSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            return Response(token_response(serializer.validated_data['user'], 'ok'))
+
+    class PingView(APIView):
+        permission_classes = [AllowAny]
+
+        def get(self, request):
+            return Response({})
+
+    return [
+        path('sync/login/', SyncLoginView.as_view()),
+        path('async/login/', LoginView.as_view()),
+        path('ping/', PingView.as_view()),
+    ]
+
+
+def create_users(count):
+    from django.contrib.auth.hashers import make_password
+    from accounts.models import User
+
+    encoded = make_password(PASSWORD)
+    User.objects.bulk_create([
+        User(username=f'user{i}', email=f'user{i}@example.com', phone=f'+99890{i:07d}', fullname=f'User {i}', password=encoded)
+        for i in range(count)
+    ])
+
+
+def lookup_costs():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from accounts.backends import authenticate_login
+
+    counter = hasher()
+
+    cases = [
+        ('username', 'user1', PASSWORD),
+        ('email', 'user1@example.com', PASSWORD),
+        ('phone', '+998900000001', PASSWORD),
+        ("noto'g'ri parol", '+998900000001', 'xato'),
+        ('topilmadi', 'nobody', PASSWORD),
+    ]
+    print(f"{'login':<16} {'eski: so`rov':>13} {'hash':>5} {'resolver: so`rov':>17} {'hash':>5}")
+    for label, identifier, password in cases:
+        row = []
+        for func in (legacy_authenticate, authenticate_login):
+            counter.calls = 0
+            with CaptureQueriesContext(connection) as queries:
+                func(identifier, password)
+            row += [len(queries), counter.calls]
+        print(f"{label:<16} {row[0]:>13} {row[1]:>5} {row[2]:>17} {row[3]:>5}")
+
+
+async def load(mode, logins, concurrency, users):
+    from django.test import AsyncClient
+
+    gate = asyncio.Semaphore(concurrency)
+    login_times, ping_times = [], []
+    done = asyncio.Event()
+
+    async def login(i):
+        async with gate:
+            body = json.dumps({'login': f'user{i % users}@example.com', 'password': PASSWORD})
+            started = time.perf_counter()
+            response = await AsyncClient().post(f'/{mode}/login/', body, content_type='application/json')
+            login_times.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.content
+
+    async def ping():
+        client = AsyncClient()
+        while not done.is_set():
+            started = time.perf_counter()
+            await client.get('/ping/')
+            ping_times.append(time.perf_counter() - started)
+            await asyncio.sleep(0.05)
+
+    pinger = asyncio.create_task(ping())
+    started = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await pinger
+    return elapsed, login_times, ping_times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=None, help="PBKDF2 iteratsiyalari (standart — Django'niki)")
+    args = parser.parse_args()
+
+    workdir = setup(
+        ROOT_URLCONF='benchmarks.bench_login',
+        PASSWORD_HASHERS=['benchmarks.bench_login.CountingHasher'],
+    )
+    try:
+        from django.conf import settings
+        if args.iterations:
+            hasher().iterations = args.iterations
+
+        create_users(args.users)
+        lookup_costs()
+        print()
+        print(
+            f"{args.logins} login, concurrency {args.concurrency}, PBKDF2 {hasher().iterations} iteratsiya, "
+            f"PASSWORD_HASH_WORKERS={settings.PASSWORD_HASH_WORKERS}"
+        )
+        print(f"{'view':<6} {'login/s':>8} {'login p50':>10} {'p99':>9} {'ping p50':>9} {'p99':>9} {'max':>9}")
+        for mode in ('sync', 'async'):
+            elapsed, login_times, ping_times = asyncio.run(load(mode, args.logins, args.concurrency, args.users))
+            print(
+                f"{mode:<6} {args.logins / elapsed:>8.1f}"
+                f" {percentile(login_times, 50) * 1000:>7.0f} ms {percentile(login_times, 99) * 1000:>6.0f} ms"
+                f" {percentile(ping_times, 50) * 1000:>6.1f} ms {percentile(ping_times, 99) * 1000:>6.1f} ms"
+                f" {max(ping_times, default=0) * 1000:>6.1f} ms"
+            )
+    finally:
+        teardown(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Tavsiya reyting bosqichi benchmarki: to'liq argsort va argpartition + exclusion.
+
+    python -m benchmarks.bench_ranking
+"""
+import argparse
+import time
+
+import numpy as np
+
+from posts.recommender.ranking import top_k
+
+
+def timeit(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--seen', type=int, default=5_000, help="chiqarib tashlanadigan postlar soni")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'posts':>10} {'argsort ms':>12} {'top_k ms':>10} {'top_k+seen ms':>14}")
+    for n in args.sizes:
+        post_ids = np.arange(1, n + 1, dtype=np.int64)
+        scores = rng.random(n, dtype=np.float32)
+        seen = rng.choice(post_ids, size=min(args.seen, n), replace=False)
+
+        full = timeit(lambda: post_ids[scores.argsort()[-args.k:][::-1]], args.repeat)
+        partial = timeit(lambda: top_k(post_ids, scores, args.k), args.repeat)
+        excluded = timeit(lambda: top_k(post_ids, scores, args.k, exclude=seen), args.repeat)
+        print(f"{n:>10} {full:>12.2f} {partial:>10.2f} {excluded:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+WebSocket kadrlari: har bir qabul qiluvchi uchun json.dumps (eski send_like/send_comment)
+va hodisani bir marta kodlash (JSON / msgpack), batch kadrlar bilan va batch'siz.
+
+Har bir rejim uchun: yetkazilgan hodisaga CPU vaqti (publish'dagi kodlash ham kiradi),
+hodisaga simdagi baytlar (kadr sarlavhasi bilan), kadrlar soni va permessage-deflate (context takeover) bilan baytlar.
+Consumer'lar haqiqiy LikeCommentConsumer — faqat base_send soxta (tarmoq yo'q).
+
+    python -m benchmarks.bench_realtime_frames --recipients 1000 --events 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import zlib
+
+from benchmarks._django import setup, teardown
+
+
+def make_events(count, rng):
+    words = ['salom', 'zo\'r', 'post', 'rahmat', 'ajoyib', 'haqiqatan', 'qiziq', 'yana', 'bugun', 'men']
+    events = []
+    for i in range(count):
+        uid = f'Po{rng.randrange(10 ** 9):09d}'
+        if rng.random() < 0.8:
+            events.append({'type': 'like', 'post_id': uid, 'like_count': rng.randrange(10 ** 5)})
+        else:
+            events.append({'type': 'comment', 'post_id': uid, 'comment': {
+                'post': uid,
+                'author': f'user{rng.randrange(10 ** 4)}',
+                'content': ' '.join(rng.choices(words, k=rng.randint(3, 25))),
+                'created_at': '2025-06-01T12:00:00.000000Z',
+            }})
+    return events
+
+
+def consumer_classes():
+    from posts.consumers import LikeCommentConsumer
+
+    class LegacyConsumer(LikeCommentConsumer):
+        # Eski protokol: har bir qabul qiluvchi hodisani o'zi json.dumps qiladi
+        async def send_like(self, event):
+            await self.send(text_data=json.dumps({
+                "type": "like",
+                "like_count": event["like_count"],
+                "post_id": event["post_id"]
+            }))
+
+        async def send_comment(self, event):
+            await self.send(text_data=json.dumps({
+                "type": "comment",
+                "comment": event["comment"],
+                "post_id": event["post_id"]
+            }))
+
+    return LikeCommentConsumer, LegacyConsumer
+
+
+def build(cls, count, codec, batching):
+    consumers = []
+    for _ in range(count):
+        consumer = cls()
+        consumer.codec, consumer.batching = codec, batching
+        consumer.outbox, consumer.flush_handle = [], None
+        consumer.frames = []
+
+        async def base_send(message, frames=consumer.frames):
+            frames.append(message.get('text') if message.get('text') is not None else message['bytes'])
+        consumer.base_send = base_send
+        consumers.append(consumer)
+    return consumers
+
+
+async def deliver(mode, events, recipients, burst):
+    from posts.consumers import encode_event
+
+    new_cls, legacy_cls = consumer_classes()
+    codec = 'msgpack' if 'msgpack' in mode else 'json'
+    batching = 'batch' in mode
+    consumers = build(legacy_cls if mode == 'legacy' else new_cls, recipients, codec, batching)
+
+    started = time.process_time()
+    for start in range(0, len(events), burst):
+        for payload in events[start:start + burst]:
+            if mode == 'legacy':
+                message = {'type': f"send_{payload['type']}", **{k: v for k, v in payload.items() if k != 'type'}}
+                for consumer in consumers:
+                    await consumer.send_like(message) if payload['type'] == 'like' else await consumer.send_comment(message)
+            else:
+                # Publish: bir marta kodlash, keyin har bir socket tayyor kadrni oladi
+                message = encode_event(payload)
+                for consumer in consumers:
+                    await consumer.send_event(message)
+        if batching:
+            # BATCH_WINDOW tugadi
+            for consumer in consumers:
+                await consumer.flush_outbox()
+    cpu = time.process_time() - started
+
+    frames = [frame.encode() if isinstance(frame, str) else frame for frame in consumers[0].frames]
+    size = sum(len(frame) + frame_header(len(frame)) for frame in frames)
+    # permessage-deflate: ulanish bo'yicha umumiy kontekst, har kadr oxirida sync flush (oxirgi 4 bayt yuborilmaydi)
+    compressor = zlib.compressobj(wbits=-15)
+    deflated = 0
+    for frame in frames:
+        length = len(compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+        deflated += length + frame_header(length)
+    return cpu, size, deflated, len(frames)
+
+
+def frame_header(length):
+    # Server -> klient WebSocket kadr sarlavhasi (mask yo'q)
+    return 2 if length < 126 else 4 if length < 65536 else 10
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--recipients', type=int, default=1000)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--burst', type=int, default=8, help='bitta BATCH_WINDOW ichidagi hodisalar')
+    args = parser.parse_args()
+
+    workdir = setup()
+    try:
+        from django.conf import settings
+        settings.REALTIME = {**settings.REALTIME, 'BATCH_MAX': args.burst + 1}
+
+        events = make_events(args.events, random.Random(0))
+        delivered = args.events * args.recipients
+        print(f"{args.recipients} qabul qiluvchi, {args.events} hodisa (80% like, 20% comment), burst {args.burst}")
+        print(f"{'rejim':<14} {'CPU/hodisa':>11} {'bayt/hodisa':>12} {'deflate':>9} {'kadrlar':>8}")
+        for mode in ('legacy', 'json', 'msgpack', 'json+batch', 'msgpack+batch'):
+            cpu, size, deflated, frames = asyncio.run(deliver(mode, events, args.recipients, args.burst))
+            print(
+                f"{mode:<14} {cpu / delivered * 1e6:>8.2f} us {size / args.events:>12.1f}"
+                f" {deflated / args.events:>9.1f} {frames:>8}"
+            )
+    finally:
+        teardown(workdir)
+
+
+if __name__ == '__main__':
+    main()
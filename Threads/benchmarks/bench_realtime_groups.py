@@ -0,0 +1,120 @@
+"""
+WebSocket fan-out: bitta global "realtime" guruhi va post.<uid> obuna guruhlari.
+InMemoryChannelLayer ustida N ta simulyatsiya qilingan socket (har biri Zipf bo'yicha
+tanlangan postlarga obuna), like/comment hodisalari ham Zipf bo'yicha.
+
+Har bir rejim uchun: yetkazilgan xabarlar (layer send + deepcopy soni), ulardan
+foydalisi (socket shu postga obuna bo'lgan), publish vaqti va layer xotirasi cho'qqisi.
+InMemoryChannelLayer har group_send'da barcha kanal va a'zoliklarni expiry uchun
+aylanib chiqadi (Redis layer'da bu TTL) — o'lchovga aralashmasligi uchun o'chirilgan.
+
+    python -m benchmarks.bench_realtime_groups --sockets 10000
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+import tracemalloc
+
+from benchmarks._django import setup, teardown
+
+
+def workload(args, rng):
+    uids = [f'p{i:06d}' for i in range(args.posts)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(uids))))
+    subscriptions = [
+        set(rng.choices(uids, cum_weights=cum_weights, k=args.subscriptions))
+        for _ in range(args.sockets)
+    ]
+    events = rng.choices(uids, cum_weights=cum_weights, k=args.events)
+    return subscriptions, events
+
+
+def counting_layer(capacity):
+    from channels.layers import InMemoryChannelLayer
+
+    class CountingLayer(InMemoryChannelLayer):
+        sent = 0
+
+        async def send(self, channel, message):
+            self.sent += 1
+            await super().send(channel, message)
+
+        def _clean_expired(self):
+            pass
+
+    return CountingLayer(capacity=capacity)
+
+
+async def run(mode, subscriptions, events, batch):
+    from posts.consumers import post_group
+
+    # Xabarlar o'qilmaguncha navbatda turadi — sig'im cheklovi o'lchovga aralashmasin
+    layer = counting_layer(capacity=batch + 1)
+    channels = [await layer.new_channel() for _ in subscriptions]
+    for channel, uids in zip(channels, subscriptions):
+        if mode == 'global':
+            await layer.group_add('realtime', channel)
+        else:
+            for uid in uids:
+                await layer.group_add(post_group(uid), channel)
+
+    subscribers = {}
+    for uids in subscriptions:
+        for uid in uids:
+            subscribers[uid] = subscribers.get(uid, 0) + 1
+    useful = sum(subscribers.get(uid, 0) for uid in events)
+
+    send = lambda uid: layer.group_send(
+        'realtime' if mode == 'global' else post_group(uid),
+        {'type': 'send_like', 'post_id': uid, 'like_count': 1},
+    )
+
+    # Xotira alohida o'lchanadi (tracemalloc vaqtni bir necha barobar sekinlashtiradi):
+    # bitta batch navbatda turganda layer egallagan joy
+    tracemalloc.start()
+    for uid in events[:batch]:
+        await send(uid)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    layer.channels.clear()
+    layer.sent = 0
+
+    elapsed = 0.0
+    for start in range(0, len(events), batch):
+        started = time.perf_counter()
+        for uid in events[start:start + batch]:
+            await send(uid)
+        elapsed += time.perf_counter() - started
+        # Socketlar navbatni o'qib bo'ldi
+        layer.channels.clear()
+    return layer.sent, useful, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sockets', type=int, default=10000)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--subscriptions', type=int, default=10, help="har bir socket obuna bo'ladigan postlar")
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=100, help="socketlar navbatni o'qishidan oldingi hodisalar")
+    args = parser.parse_args()
+
+    workdir = setup()
+    try:
+        subscriptions, events = workload(args, random.Random(0))
+        print(f"{args.sockets} socket, {args.posts} post, {args.subscriptions} obuna/socket, {args.events} hodisa")
+        print(f"{'rejim':<10} {'yetkazildi':>12} {'hodisaga':>10} {'foydali':>8} {'publish':>10} {'hodisa/s':>10} {'xotira':>9}")
+        for mode in ('global', 'per-post'):
+            delivered, useful, elapsed, peak = asyncio.run(run(mode, subscriptions, events, args.batch))
+            print(
+                f"{mode:<10} {delivered:>12} {delivered / len(events):>10.1f} {useful / max(delivered, 1):>8.1%}"
+                f" {elapsed:>8.2f} s {len(events) / elapsed:>10.0f} {peak / 2 ** 20:>6.1f} MB"
+            )
+    finally:
+        teardown(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Qidiruv: SQLite FTS5 (bm25, prefiks, snippet) va har bir so'z bo'yicha icontains skani.
+Postlar Zipf taqsimotidagi lug'atdan tasodifiy matnlar.
+
+    python -m benchmarks.bench_search --posts 200000
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+
+from benchmarks._django import setup, teardown
+
+
+SYLLABLES = ['ba', 'ko', 'ri', 'mu', 'sha', 'to', 'le', 'vi', 'na', 'qo', 'zu', 'de', 'ga', 'yo']
+
+
+def vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def populate(count, seed=0):
+    from accounts.models import User
+    from posts.models import Post
+
+    rng = random.Random(seed)
+    words = vocabulary(20000, rng)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    author = User.objects.create_user('bench', 'bench@example.com', '+998900000000', password='x' * 12)
+    batch = 5000
+    for start in range(0, count, batch):
+        # bulk_create — FTS trigger'lari baribir ishlaydi
+        Post.objects.bulk_create([
+            Post(author=author, content=' '.join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(8, 40))))
+            for _ in range(start, min(start + batch, count))
+        ])
+    return words
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = setup()
+    try:
+        from core.search import IcontainsBackend, SQLiteFTSBackend
+
+        started = time.perf_counter()
+        words = populate(args.posts)
+        print(f"{args.posts} post yozildi (FTS trigger'lari bilan): {time.perf_counter() - started:.1f} s")
+
+        fts, scan = SQLiteFTSBackend(), IcontainsBackend()
+        queries = [
+            ('ommabop so`z', words[0], False),
+            ('kam uchraydigan so`z', words[-1], False),
+            ('ikki so`z', f'{words[3]} {words[50]}', False),
+            ('prefiks (type-ahead)', words[-1][:3], True),
+        ]
+        print(f"{'so`rov':<24} {'FTS5':>10} {'icontains':>12} {'natija':>7}")
+        for label, query, prefix in queries:
+            fts_ms, fts_rows = timed(lambda: fts.search_posts(query, 20, prefix=prefix), args.repeat)
+            scan_ms, scan_rows = timed(lambda: scan.search_posts(query, 20, prefix=prefix), args.repeat)
+            print(f"{label:<24} {fts_ms:>7.2f} ms {scan_ms:>9.2f} ms {len(fts_rows):>7}")
+    finally:
+        teardown(workdir)
+
+
+if __name__ == '__main__':
+    main()
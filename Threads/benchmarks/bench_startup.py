@@ -0,0 +1,58 @@
+"""
+Ishga tushish vaqti benchmarki: `manage.py check` va WSGI ilovasini yuklash.
+Har bir o'lchov yangi jarayonda bajariladi; og'ir kutubxonalar yuklanganmi — ko'rsatiladi.
+
+    python -m benchmarks.bench_startup
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ('numpy', 'scipy', 'sklearn', 'joblib')
+
+WSGI_PROBE = f"""
+import json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Threads.settings')
+from Threads.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns  # birinchi so'rov URLconf'ni yuklaydi
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def run(args):
+    started = time.perf_counter()
+    result = subprocess.run(args, cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+    return time.perf_counter() - started, result.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    check_times = [run([sys.executable, 'manage.py', 'check'])[0] for _ in range(args.repeat)]
+
+    wsgi_times, loaded = [], []
+    for _ in range(args.repeat):
+        _, stdout = run([sys.executable, '-c', WSGI_PROBE])
+        probe = json.loads(stdout)
+        wsgi_times.append(probe['seconds'])
+        loaded = probe['loaded']
+
+    print(f"manage.py check:  median {statistics.median(check_times) * 1000:.0f} ms, min {min(check_times) * 1000:.0f} ms")
+    print(f"WSGI app + urls:  median {statistics.median(wsgi_times) * 1000:.0f} ms, min {min(wsgi_times) * 1000:.0f} ms")
+    print(f"og'ir modullar yuklangan: {', '.join(loaded) or 'hech biri'}")
+
+
+if __name__ == '__main__':
+    main()
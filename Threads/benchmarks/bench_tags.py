@@ -0,0 +1,110 @@
+"""
+Hashtag bo'yicha sahifalash: posting list (PostTag indeksi) va zanjirli JOIN/OFFSET.
+Tasodifiy postlar ommabop (#common), o'rtacha (#medium) va kam uchraydigan (#rare) teglar bilan.
+
+    python -m benchmarks.bench_tags --posts 100000
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from benchmarks._django import setup, teardown
+
+
+TAG_RATES = {'common': 0.5, 'medium': 0.05, 'rare': 0.002}
+
+
+def populate(count, seed=0):
+    from django.db import connection
+    from django.utils import timezone
+    from accounts.models import User
+    from posts.models import Hashtag, Post, PostTag
+
+    rng = random.Random(seed)
+    author = User.objects.create_user('bench', 'bench@example.com', '+998900000000', password='x' * 12)
+    tags = {name: Hashtag.objects.create(name=name) for name in TAG_RATES}
+    now = timezone.now().replace(microsecond=0)
+    batch = 5000
+    for start in range(0, count, batch):
+        # bulk_create Post.save ni chaqirmaydi — teglar to'g'ridan-to'g'ri yoziladi
+        posts = Post.objects.bulk_create([
+            Post(author=author, content='bench') for _ in range(start, min(start + batch, count))
+        ])
+        links = []
+        for post in posts:
+            created_at = now - timedelta(seconds=count - post.id)
+            for name, rate in TAG_RATES.items():
+                if rng.random() < rate:
+                    links.append(PostTag(post=post, hashtag=tags[name], created_at=created_at))
+        PostTag.objects.bulk_create(links)
+    # Har bir postga alohida vaqt (PostTag.created_at bilan bir xil) — bitta UPDATE bilan
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE posts_post SET created_at = datetime(%s, '-' || (%s - id) || ' seconds')",
+            [now.strftime('%Y-%m-%d %H:%M:%S'), count],
+        )
+    return tags
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = setup()
+    try:
+        from core.pagination import encode_cursor
+        from posts.models import Post, PostTag
+        from posts.tags import tag_page
+
+        tags = populate(args.posts)
+        page = 20
+
+        # Chuqur sahifa: #common ning 90% chuqurligidagi cursor va shu joyga OFFSET
+        common = PostTag.objects.filter(hashtag=tags['common']).order_by('-created_at', '-post_id')
+        depth = int(common.count() * 0.9)
+        # cursor — oldingi sahifaning oxirgi yozuvi
+        created_at, post_id = common.values_list('created_at', 'post_id')[depth - 1]
+        cursor = encode_cursor(created_at, post_id)
+        rows = [
+            ('#common 1-sahifa',
+             lambda: tag_page(['common'], limit=page),
+             lambda: list(Post.objects.filter(tags__name='common').order_by('-created_at', '-id')[:page])),
+            (f'#common OFFSET {depth}',
+             lambda: tag_page(['common'], cursor=cursor, limit=page),
+             lambda: list(Post.objects.filter(tags__name='common').order_by('-created_at', '-id')[depth:depth + page])),
+            ('#common AND #rare',
+             lambda: tag_page(['common', 'rare'], limit=page),
+             lambda: list(Post.objects.filter(tags__name='common').filter(tags__name='rare').order_by('-created_at', '-id')[:page])),
+            ('#common AND #medium',
+             lambda: tag_page(['common', 'medium'], limit=page),
+             lambda: list(Post.objects.filter(tags__name='common').filter(tags__name='medium').order_by('-created_at', '-id')[:page])),
+            ('#medium OR #rare',
+             lambda: tag_page(['medium', 'rare'], match='any', limit=page),
+             lambda: list(Post.objects.filter(tags__name__in=['medium', 'rare']).distinct().order_by('-created_at', '-id')[:page])),
+        ]
+
+        print(f"{args.posts} post, sahifa {page}")
+        print(f"{'so`rov':<28} {'posting list':>13} {'JOIN':>10}")
+        for label, postings, join in rows:
+            expected = [post.id for post in join()]
+            assert [post.id for post in postings()[0]] == expected, label
+            print(f"{label:<28} {timed(postings, args.repeat):>10.2f} ms {timed(join, args.repeat):>7.2f} ms")
+    finally:
+        teardown(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+WebSocket yuk testi: to'liq ASGI stek (Threads.asgi.application — AuthMiddlewareStack,
+URLRouter, LikeCommentConsumer) channels WebsocketCommunicator va InMemoryChannelLayer
+bilan, tarmoqsiz bitta jarayonda.
+
+Minglab klient ulanadi va Zipf bo'yicha postlarga obuna bo'ladi, so'ng hodisalar
+posts.realtime.apublish() orqali yuboriladi. Natija: ulanish tezligi, publish -> klient
+qabul qilish kechikishi (p50/p99), ulanishga xotira (RSS, klient + server tomoni birga) va
+consumer tomonidagi core.metrics vaqtlari (ws.connect, ws.receive, ws.delivery_lag).
+
+Standart InMemoryChannelLayer har receive/group_send'da barcha kanal va a'zoliklarni expiry
+uchun aylanib chiqadi (minglab socketda har bir yetkazish O(socketlar)) va group_send'da har
+a'zo uchun alohida task yaratadi — o'lchovni layer egallaydi. Shuning uchun standart
+--layer=fast (tozalash soniyasiga bir marta, ketma-ket send); --layer=inmemory — o'zgartirilmagan.
+
+    python -m benchmarks.bench_websocket_load --clients 2000 --events 300
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import resource
+import time
+
+import msgpack
+from channels.exceptions import ChannelFull
+from channels.layers import InMemoryChannelLayer
+
+from benchmarks._django import percentile, setup, teardown
+
+
+SUBPROTOCOLS = {'legacy': None, 'json': ['threads.json'], 'msgpack': ['threads.msgpack']}
+
+
+class FastInMemoryChannelLayer(InMemoryChannelLayer):
+    # Expiry tozalash soniyasiga bir marta (Redis layer'da bu ishni TTL bajaradi)
+    _cleaned_at = 0.0
+
+    def _clean_expired(self):
+        now = time.monotonic()
+        if now - self._cleaned_at >= 1.0:
+            self._cleaned_at = now
+            super()._clean_expired()
+
+    async def group_send(self, group, message):
+        self.require_valid_group_name(group)
+        self._clean_expired()
+        for channel in list(self.groups.get(group, ())):
+            try:
+                await self.send(channel, message)
+            except ChannelFull:
+                pass
+
+
+LAYERS = {
+    'fast': 'benchmarks.bench_websocket_load.FastInMemoryChannelLayer',
+    'inmemory': 'channels.layers.InMemoryChannelLayer',
+}
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # Linux bo'lmasa — cho'qqi qiymat (kamroq aniq)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def encode(protocol, payload):
+    return {'bytes_data': msgpack.packb(payload)} if protocol == 'msgpack' else {'text_data': json.dumps(payload)}
+
+
+def decode(frame):
+    message = msgpack.unpackb(frame, raw=False) if isinstance(frame, bytes) else json.loads(frame)
+    return message['events'] if message.get('type') == 'batch' else [message]
+
+
+class Client:
+    def __init__(self, communicator):
+        self.communicator = communicator
+        self.reader = None
+
+
+async def connect_all(app, count, concurrency, protocol):
+    from channels.testing import WebsocketCommunicator
+
+    clients, times = [], []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def connect():
+        async with gate:
+            communicator = WebsocketCommunicator(app, '/ws/like_comment/', subprotocols=SUBPROTOCOLS[protocol])
+            started = time.perf_counter()
+            connected, _ = await communicator.connect(timeout=60)
+            times.append(time.perf_counter() - started)
+            if not connected:
+                raise RuntimeError("Ulanib bo'lmadi")
+            clients.append(Client(communicator))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connect() for _ in range(count)))
+    return clients, times, time.perf_counter() - started
+
+
+async def subscribe_all(clients, protocol, uids, cum_weights, per_client, rng):
+    subscribers = {}
+    for client in clients:
+        posts = sorted(set(rng.choices(uids, cum_weights=cum_weights, k=per_client)))
+        await client.communicator.send_to(**encode(protocol, {'type': 'subscribe', 'posts': posts}))
+        ack = decode(await client.communicator.receive_from(timeout=30))[0]
+        assert ack['type'] == 'subscribed' and not ack['rejected'], ack
+        for uid in posts:
+            subscribers[uid] = subscribers.get(uid, 0) + 1
+    return subscribers
+
+
+async def read(client, sent, latencies, progress):
+    while True:
+        frame = await client.communicator.receive_from(timeout=3600)
+        received = time.perf_counter()
+        for event in decode(frame):
+            latencies.append(received - sent[event['like_count']])
+        progress.set()
+
+
+async def run(args):
+    from django.conf import settings
+    from core import metrics
+    from posts.consumers import post_group
+    from posts.realtime import apublish
+    from Threads.asgi import application
+
+    rng = random.Random(0)
+    uids = [f'p{i:06d}' for i in range(args.posts)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(uids))))
+    settings.REALTIME = {**settings.REALTIME, 'MAX_SUBSCRIPTIONS': max(args.subscriptions, settings.REALTIME['MAX_SUBSCRIPTIONS'])}
+    metrics.reset()
+
+    baseline = rss_bytes()
+    clients, connect_times, connect_elapsed = await connect_all(application, args.clients, args.concurrency, args.protocol)
+    subscribers = await subscribe_all(clients, args.protocol, uids, cum_weights, args.subscriptions, rng)
+    per_connection = (rss_bytes() - baseline) / len(clients)
+
+    sent, latencies, progress = {}, [], asyncio.Event()
+    for client in clients:
+        client.reader = asyncio.create_task(read(client, sent, latencies, progress))
+
+    expected = 0
+    interval = 1 / args.rate
+    started = time.perf_counter()
+    for seq, uid in enumerate(rng.choices(uids, cum_weights=cum_weights, k=args.events)):
+        expected += subscribers.get(uid, 0)
+        sent[seq] = time.perf_counter()
+        await apublish(post_group(uid), {'type': 'like', 'post_id': uid, 'like_count': seq})
+        # Belgilangan tezlik; o'qiydigan task'lar ham shu oraliqda ishlaydi
+        await asyncio.sleep(max(0.0, started + (seq + 1) * interval - time.perf_counter()))
+
+    deadline = time.perf_counter() + args.drain_timeout
+    while len(latencies) < expected and time.perf_counter() < deadline:
+        progress.clear()
+        try:
+            await asyncio.wait_for(progress.wait(), timeout=max(0.0, deadline - time.perf_counter()))
+        except asyncio.TimeoutError:
+            break
+
+    for client in clients:
+        client.reader.cancel()
+    await asyncio.gather(*(client.reader for client in clients), return_exceptions=True)
+    for client in clients:
+        await client.communicator.disconnect()
+
+    return {
+        'connect_elapsed': connect_elapsed,
+        'connect_times': connect_times,
+        'per_connection': per_connection,
+        'expected': expected,
+        'latencies': latencies,
+        'metrics': metrics.snapshot(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200, help="bir vaqtda ulanayotgan klientlar")
+    parser.add_argument('--protocol', choices=SUBPROTOCOLS, default='json')
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--subscriptions', type=int, default=5, help="har bir klient obuna bo'ladigan postlar")
+    parser.add_argument('--events', type=int, default=300)
+    parser.add_argument('--rate', type=float, default=100.0, help='hodisa/s')
+    parser.add_argument('--drain-timeout', type=float, default=30.0)
+    parser.add_argument('--layer', choices=LAYERS, default='fast')
+    args = parser.parse_args()
+
+    workdir = setup(CHANNEL_LAYERS={'default': {'BACKEND': LAYERS[args.layer]}})
+    try:
+        result = asyncio.run(run(args))
+        connect_times, latencies = result['connect_times'], result['latencies']
+        print(
+            f"{args.clients} klient ({args.protocol}, {args.layer} layer), {args.subscriptions} obuna/klient, "
+            f"{args.events} hodisa @ {args.rate:.0f}/s"
+        )
+        print(
+            f"ulanish:     {args.clients / result['connect_elapsed']:.0f} ulanish/s, "
+            f"p50 {percentile(connect_times, 50) * 1000:.1f} ms, p99 {percentile(connect_times, 99) * 1000:.1f} ms"
+        )
+        print(f"xotira:      {result['per_connection'] / 1024:.1f} KB/ulanish (RSS)")
+        print(
+            f"yetkazildi:  {len(latencies)}/{result['expected']}, kechikish "
+            f"p50 {percentile(latencies, 50) * 1000:.2f} ms, p99 {percentile(latencies, 99) * 1000:.2f} ms, "
+            f"max {max(latencies, default=0) * 1000:.2f} ms"
+        )
+        print('consumer metrikalari:')
+        for name, value in sorted(result['metrics'].items()):
+            if isinstance(value, dict):
+                print(
+                    f"  {name:<20} n={value['count']:<8} mean {value['mean_ms']:.3f} ms, "
+                    f"p50 {value['p50_ms']:.3f} ms, p99 {value['p99_ms']:.3f} ms, max {value['max_ms']:.3f} ms"
+                )
+            else:
+                print(f"  {name:<20} {value}")
+    finally:
+        teardown(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .search import install_search_index
+        # FTS jadvallari/indekslari migratsiyalardan keyin yaratiladi
+        post_migrate.connect(install_search_index, sender=self)
@@ -0,0 +1,176 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import metrics
+from .pagination import KeysetPagination
+
+
+# Versiya kalitlari muddatsiz saqlanadi; kesh ularni chiqarib yuborsa yangi versiya vaqtdan
+# olinadi, shuning uchun eski yozuvlar hech qachon qayta ishlatilmaydi
+def _version_key(scope):
+    return f'v:{scope}'
+
+
+def post_scope(uid):
+    return f'post:{uid}'
+
+
+def user_scope(username, part):
+    """part: 'profile', 'posts', 'followers', 'following'."""
+    return f'user:{username}:{part}'
+
+
+def get_versions(scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, time.time_ns(), None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def bump(*scopes):
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate(*scopes):
+    """Commit'dan keyin versiyalarni oshiradi — eski ma'lumot yangi versiya bilan keshlanib qolmasin."""
+    scopes = [scope for scope in scopes if scope]
+    if scopes:
+        transaction.on_commit(lambda: bump(*scopes))
+
+
+def single_flight(key, compute, timeout):
+    """
+    Keshdan o'qiydi; yo'q bo'lsa faqat bitta jarayon/oqim qayta hisoblaydi (cache.add lock),
+    qolganlari natijani kutadi. compute() None qaytarsa natija keshlanmaydi.
+    (value, 'HIT' | 'MISS') qaytaradi.
+    """
+    value = cache.get(key)
+    if value is not None:
+        metrics.incr('response_cache.hit')
+        return value, 'HIT'
+
+    config = settings.RESPONSE_CACHE
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, config['LOCK_TIMEOUT']):
+        metrics.incr('response_cache.miss')
+        try:
+            value = compute()
+            if value is not None:
+                cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value, 'MISS'
+
+    # Boshqa so'rov hisoblayapti — natijani kutamiz (viral postda yuzlab parallel so'rov bitta render)
+    deadline = time.monotonic() + config['LOCK_WAIT']
+    while time.monotonic() < deadline:
+        time.sleep(0.02)
+        value = cache.get(key)
+        if value is not None:
+            metrics.incr('response_cache.coalesced')
+            return value, 'HIT'
+        if cache.get(lock_key) is None:
+            # Hisoblovchi tugadi, lekin natija keshlanmadi (masalan 404) — o'zimiz hisoblaymiz
+            metrics.incr('response_cache.miss')
+            return compute(), 'MISS'
+    metrics.incr('response_cache.lock_timeout')
+    return compute(), 'MISS'
+
+
+def _not_modified(request, etag):
+    # If-None-Match taqqoslash kuchsiz (RFC 9110): W/ prefiksi e'tiborga olinmaydi.
+    # '*' — resurs mavjud bo'lsa mos keladi (validator uni topgan)
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    tags = {tag.removeprefix('W/') for tag in parse_etags(header)}
+    return '*' in tags or etag in tags
+
+
+def page_state(queryset, view, state):
+    """
+    Ro'yxat validatorlari uchun: joriy sahifa qatorlarining state(row) qiymatlari.
+    Sahifa view'dagidek keyset pagination bilan olinadi; queryset .only() bilan toraytirilsin.
+    """
+    rows = KeysetPagination().paginate_queryset(queryset, view.request, view=view)
+    return [state(row) for row in rows]
+
+
+def _digest(raw):
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def cache_response(scopes, validator, variant=None, timeout=None):
+    """
+    GET metodi uchun dekorator: javob ma'lumoti (response.data) keshlanadi va ETag qaytariladi.
+    validator(view) — javobni o'zgartiradigan qiymatlar bazadan (updated_at, hisoblagichlar,
+    sahifa qatorlari — arzon so'rov); resurs topilmasa None, shunda view o'zi javob beradi (404).
+    scopes(view) — signal'lar oshiradigan versiya doiralari,
+    variant(view) — bir URL uchun har xil javoblar (masalan profil egasi uchun).
+
+    ETag faqat validator qiymatlaridan olinadi: hamma worker'larda bir xil va bump qilinmagan
+    o'zgarishlarda ham (views_count, muallif ma'lumoti) yangilanadi. If-None-Match mos kelsa
+    serializer ishga tushmasdan 304 qaytadi. Kesh kaliti — ETag va versiyalar: tana bazadagi
+    holatdan eskiroq bo'lsa ham yangi ETag ostida qaytarilmaydi.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            values = validator(view)
+            if values is None:
+                return method(view, request, *args, **kwargs)
+            raw = '|'.join([
+                type(view).__name__,
+                request.get_full_path(),
+                variant(view) if variant else '',
+                # Bir xil ma'lumot JSON va browsable API'da har xil baytlar — ETag ham har xil
+                request.accepted_renderer.format,
+                repr(values),
+            ])
+            etag = quote_etag(_digest(raw))
+
+            if _not_modified(request, etag):
+                metrics.incr('response_cache.not_modified')
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = None
+
+                def compute():
+                    nonlocal response
+                    response = method(view, request, *args, **kwargs)
+                    # Faqat muvaffaqiyatli javoblar keshlanadi
+                    return response.data if response.status_code == 200 else None
+
+                view_scopes = scopes(view)
+                versions = get_versions(view_scopes)
+                key = _digest('|'.join([raw, *(f'{scope}={version}' for scope, version in zip(view_scopes, versions))]))
+                data, state = single_flight(f'resp:{key}', compute, timeout or settings.RESPONSE_CACHE['TIMEOUT'])
+                if response is None:
+                    response = Response(data)
+                response['X-Cache'] = state
+                if response.status_code != 200:
+                    return response
+
+            response['ETag'] = etag
+            patch_vary_headers(response, ('Accept', 'Authorization'))
+            return response
+        return wrapper
+    return decorator
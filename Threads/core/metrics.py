@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+
+# Har bir vaqt metrikasi uchun oxirgi namunalar (p50/p99 shulardan hisoblanadi)
+SAMPLE_SIZE = 2048
+
+_counters = Counter()
+_timings = {}
+_lock = threading.Lock()
+
+
+class _Timing:
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def summary(self):
+        samples = sorted(self.samples)
+        pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000 if samples else 0.0
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': pick(0.50),
+            'p99_ms': pick(0.99),
+            'max_ms': self.max * 1000,
+        }
+
+
+def incr(name, value=1):
+    """Jarayon ichidagi hisoblagich (masalan 'response_cache.hit')."""
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name, seconds):
+    """Davomiylik namunasi (masalan 'ws.connect'); snapshot'da count/mean/p50/p99/max."""
+    with _lock:
+        timing = _timings.get(name)
+        if timing is None:
+            timing = _timings[name] = _Timing()
+        timing.count += 1
+        timing.total += seconds
+        timing.max = max(timing.max, seconds)
+        timing.samples.append(seconds)
+
+
+@contextmanager
+def timer(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started)
+
+
+def snapshot():
+    with _lock:
+        data = dict(_counters)
+        data.update({name: timing.summary() for name, timing in _timings.items()})
+        return data
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _timings.clear()
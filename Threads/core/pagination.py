@@ -0,0 +1,92 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(value, pk):
+    raw = f"{value.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    """(datetime, pk) yoki None, agar cursor noto'g'ri bo'lsa."""
+    if not cursor:
+        return None
+    try:
+        value, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(value), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_filter(queryset, field, position, pk_field='pk', inclusive=False):
+    """(field, pk) < position (inclusive=True da <=) sharti — (field, pk) indeksi bo'yicha range so'rov."""
+    if position is None:
+        return queryset
+    value, pk = position
+    pk_lookup = 'lte' if inclusive else 'lt'
+    # field <= value alohida shart — shunda SQLite indeksda range seek qiladi (OR ko'rinishida skan qiladi)
+    return queryset.filter(
+        Q(**{f'{field}__lte': value}),
+        Q(**{f'{field}__lt': value}) | Q(**{f'{pk_field}__{pk_lookup}': pk}),
+    )
+
+
+class KeysetPagination(BasePagination):
+    """
+    (created_at, id) bo'yicha keyset (cursor) pagination — OFFSET ishlatilmaydi,
+    shuning uchun chuqur sahifalar ham birinchi sahifa kabi arzon.
+    View'da `pagination_ordering_field` bilan boshqa sana maydonini berish mumkin.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering_field = 'created_at'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        field = getattr(view, 'pagination_ordering_field', self.ordering_field)
+        page_size = self.get_page_size(request)
+        position = decode_cursor(request.query_params.get(self.cursor_query_param))
+
+        queryset = keyset_filter(queryset, field, position).order_by(f'-{field}', '-pk')
+        rows = list(queryset[:page_size + 1])
+        self.next_position = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_position = (getattr(rows[-1], field), rows[-1].pk)
+        return rows
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.build_link(encode_cursor(*self.next_position))
+
+    def build_link(self, cursor):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data, key='results'):
+        return Response({'next': self.get_next_link(), key: data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
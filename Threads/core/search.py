@@ -0,0 +1,243 @@
+import html
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+
+# Baza turiga qarab avtomatik tanlanadigan backendlar (settings.SEARCH_BACKEND = None bo'lsa)
+VENDOR_BACKENDS = {
+    'sqlite': 'core.search.SQLiteFTSBackend',
+    'postgresql': 'core.search.PostgresSearchBackend',
+}
+FALLBACK_BACKEND = 'core.search.IcontainsBackend'
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_QUERY_TOKENS = 8
+
+# Snippet belgilari: avval Private Use belgilar bilan belgilanadi, keyin matn escape qilinib
+# <mark> ga almashtiriladi — foydalanuvchi matnidagi HTML bajarilmaydi
+START_SEL, STOP_SEL = '\ue000', '\ue001'
+ELLIPSIS = '…'
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query or '')[:MAX_QUERY_TOKENS]
+
+
+def highlight(text):
+    if text is None:
+        return None
+    return html.escape(text).replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>')
+
+
+class BaseSearchBackend:
+    """
+    search_posts/search_users — [(id, snippet), ...] relevantlik bo'yicha.
+    prefix=True — oxirgi so'z prefiks sifatida qidiriladi (type-ahead).
+    """
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    def install(self):
+        """Indeks tuzilmalarini yaratadi (post_migrate'da chaqiriladi)."""
+
+    def search_posts(self, query, limit=20, prefix=True):
+        raise NotImplementedError
+
+    def search_users(self, query, limit=20, prefix=True):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    FTS5 external-content jadvallari: matn posts_post/accounts_user da qoladi, FTS faqat
+    indeksni saqlaydi. Trigger'lar har qanday yozishda (bulk_create, update() ham) sinxronlaydi;
+    UPDATE trigger'i faqat matn o'zgarganda ishlaydi — hisoblagich yangilanishlari indeksga tegmaydi.
+    """
+    post_table = 'core_post_fts'
+    user_table = 'core_user_fts'
+    tokenizer = 'unicode61 remove_diacritics 2'
+    max_candidates = 2000
+
+    def _schema(self):
+        from accounts.models import User
+        from posts.models import Post
+
+        tables = []
+        for fts, source, columns in (
+            (self.post_table, Post._meta.db_table, ['content']),
+            (self.user_table, User._meta.db_table, ['username', 'fullname']),
+        ):
+            cols = ', '.join(columns)
+            new = ', '.join(f'new.{col}' for col in columns)
+            old = ', '.join(f'old.{col}' for col in columns)
+            changed = ' OR '.join(f'old.{col} IS NOT new.{col}' for col in columns)
+            tables.append((fts, [
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{source}', content_rowid='id', "
+                f"prefix='2 3', tokenize='{self.tokenizer}')",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {source} WHEN {changed} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+                f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+            ]))
+        return tables
+
+    def install(self):
+        with connections[self.using].cursor() as cursor:
+            for table, statements in self._schema():
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+                if cursor.fetchone():
+                    continue
+                # Jadval yangi — trigger'lar bilan yaratiladi va mavjud qatorlardan to'ldiriladi
+                for statement in statements:
+                    cursor.execute(statement)
+
+    def match_expression(self, query, prefix):
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        terms = ['"{}"'.format(token.replace('"', '""')) for token in tokens]
+        if prefix:
+            terms[-1] += '*'
+        return ' '.join(terms)
+
+    def _search(self, table, column, order, query, limit, prefix):
+        expression = self.match_expression(query, prefix)
+        if expression is None:
+            return []
+        # bm25 faqat eng yangi max_candidates ta moslik ichida hisoblanadi: ommabop so'zda
+        # barcha mosliklarni reytinglash o'rniga doclist oxiridan bitta rowid chegarasi olinadi
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, snippet({table}, {column}, %s, %s, %s, 12) FROM {table} "
+                f"WHERE {table} MATCH %s AND rowid >= ("
+                f"SELECT COALESCE(MIN(rowid), 0) FROM (SELECT rowid FROM {table} WHERE {table} MATCH %s "
+                f"ORDER BY rowid DESC LIMIT %s)) "
+                f"ORDER BY {order}, rowid DESC LIMIT %s",
+                [START_SEL, STOP_SEL, ELLIPSIS, expression, expression, self.max_candidates, limit],
+            )
+            return [(row_id, highlight(snippet)) for row_id, snippet in cursor.fetchall()]
+
+    def search_posts(self, query, limit=20, prefix=True):
+        return self._search(self.post_table, 0, 'rank', query, limit, prefix)
+
+    def search_users(self, query, limit=20, prefix=True):
+        # username mosligi fullname'dan kuchliroq; snippet — fullname (-1 — eng mos ustun)
+        return self._search(self.user_table, -1, f'bm25({self.user_table}, 2.0, 1.0)', query, limit, prefix)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    tsvector ifodasi bo'yicha GIN indekslari — alohida ustun yoki trigger kerak emas,
+    indeks jadval bilan birga yangilanadi. So'rovlar aynan shu ifodalarni ishlatadi.
+    """
+    config = 'simple'
+
+    def _post_vector(self):
+        from django.contrib.postgres.search import SearchVector
+        return SearchVector('content', config=self.config)
+
+    def _user_vector(self):
+        from django.contrib.postgres.search import SearchVector
+        return SearchVector('username', config=self.config, weight='A') + \
+            SearchVector('fullname', config=self.config, weight='B')
+
+    def install(self):
+        from accounts.models import User
+        from posts.models import Post
+
+        config = f"'{self.config}'::regconfig"
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS core_post_search_idx ON {Post._meta.db_table} "
+                f"USING GIN (to_tsvector({config}, COALESCE(content, '')))"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS core_user_search_idx ON {User._meta.db_table} USING GIN (("
+                f"setweight(to_tsvector({config}, COALESCE(username, '')), 'A') || "
+                f"setweight(to_tsvector({config}, COALESCE(fullname, '')), 'B')))"
+            )
+
+    def ts_query(self, query, prefix):
+        from django.contrib.postgres.search import SearchQuery
+
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        terms = ["'{}'".format(token.replace("'", "''")) for token in tokens]
+        if prefix:
+            terms[-1] += ':*'
+        return SearchQuery(' & '.join(terms), search_type='raw', config=self.config)
+
+    def _search(self, queryset, vector, field, query, limit, prefix):
+        from django.contrib.postgres.search import SearchHeadline, SearchRank
+
+        ts_query = self.ts_query(query, prefix)
+        if ts_query is None:
+            return []
+        rows = (
+            queryset.using(self.using)
+            .annotate(document=vector)
+            .filter(document=ts_query)
+            .annotate(
+                rank=SearchRank(vector, ts_query),
+                snippet=SearchHeadline(field, ts_query, config=self.config, start_sel=START_SEL,
+                                       stop_sel=STOP_SEL, max_words=24, min_words=8, fragment_delimiter=ELLIPSIS),
+            )
+            .order_by('-rank', '-id')
+            .values_list('id', 'snippet')[:limit]
+        )
+        return [(row_id, highlight(snippet)) for row_id, snippet in rows]
+
+    def search_posts(self, query, limit=20, prefix=True):
+        from posts.models import Post
+        return self._search(Post.objects.all(), self._post_vector(), 'content', query, limit, prefix)
+
+    def search_users(self, query, limit=20, prefix=True):
+        from accounts.models import User
+        return self._search(User.objects.all(), self._user_vector(), 'fullname', query, limit, prefix)
+
+
+class IcontainsBackend(BaseSearchBackend):
+    """Boshqa bazalar uchun: har bir so'z bo'yicha icontains (to'liq skan, reytingsiz)."""
+
+    def _search(self, queryset, fields, query, limit):
+        from django.db.models import Q
+
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        for token in tokens:
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f'{field}__icontains': token})
+            queryset = queryset.filter(condition)
+        return [(row_id, None) for row_id in queryset.order_by('-id').values_list('id', flat=True)[:limit]]
+
+    def search_posts(self, query, limit=20, prefix=True):
+        from posts.models import Post
+        return self._search(Post.objects.using(self.using), ['content'], query, limit)
+
+    def search_users(self, query, limit=20, prefix=True):
+        from accounts.models import User
+        return self._search(User.objects.using(self.using), ['username', 'fullname'], query, limit)
+
+
+@lru_cache(maxsize=None)
+def get_search_backend(using='default'):
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path is None:
+        path = VENDOR_BACKENDS.get(connections[using].vendor, FALLBACK_BACKEND)
+    return import_string(path)(using=using)
+
+
+def install_search_index(sender, using='default', **kwargs):
+    get_search_backend(using).install()
@@ -1,9 +1,7 @@
-from django.urls import path
-# from .views import PostListView, PostDetailView, UserPostsListView, PostCreateView
+from django.urls import re_path
+from .views import SearchView, MetricsView
 
 urlpatterns = [
-    # path('posts/', PostListView.as_view(), name='post-list'),
-    # path('posts/<str:uid>/', PostDetailView.as_view(), name='post-detail'),
-    # path('posts/add/', PostCreateView.as_view(), name='post-create'),
-    # path('<str:username>/', UserPostsListView.as_view(), name='user-posts'),
-]
\ No newline at end of file
+    re_path(r'^search/?$', SearchView.as_view(), name='search'),
+    re_path(r'^metrics/?$', MetricsView.as_view(), name='metrics'),
+]
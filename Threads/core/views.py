@@ -1,6 +1,89 @@
+import inspect
+
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
-from rest_framework import generics, status, permissions
-from .serializers import ProfileSerializer
+from rest_framework import permissions
+from rest_framework.response import Response
+
+from accounts.models import User
+from accounts.serializers import UserSerializer
+from posts.models import Post
+from posts.serializers import PostSerializer
+from . import metrics
+from .search import get_search_backend
+
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+
+class AsyncAPIView(APIView):
+    """
+    `async def` handler'li APIView (DRF dispatch'i faqat sync). Autentifikatsiya, ruxsatlar va
+    throttling sync_to_async orqali; handler event loop'da — bazaga o'zi sync_to_async bilan tegadi.
+    """
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def _in_order(queryset, rows):
+    objects = queryset.in_bulk([row_id for row_id, _ in rows])
+    return [(objects[row_id], snippet) for row_id, snippet in rows if row_id in objects]
+
+
+class SearchView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        kind = request.query_params.get('type')
+        prefix = request.query_params.get('prefix', '1') != '0'
+        try:
+            limit = int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            limit = SEARCH_DEFAULT_LIMIT
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+        backend = get_search_backend()
+        context = {'request': request}
+        data = {}
+        if kind in (None, 'posts'):
+            rows = _in_order(Post.objects.with_related(), backend.search_posts(query, limit, prefix=prefix))
+            data['posts'] = [
+                {**PostSerializer(post, context=context).data, 'snippet': snippet} for post, snippet in rows
+            ]
+        if kind in (None, 'users'):
+            rows = _in_order(User.objects.all(), backend.search_users(query, limit, prefix=prefix))
+            data['users'] = [
+                {**UserSerializer(user, context=context).data, 'snippet': snippet} for user, snippet in rows
+            ]
+        return Response(data)
 
 
+class MetricsView(APIView):
+    # Jarayon ichidagi hisoblagichlar (javob keshi hit/miss va h.k.)
+    permission_classes = [permissions.IsAdminUser]
 
+    def get(self, request):
+        return Response(metrics.snapshot())
@@ -1,48 +1,201 @@
+import asyncio
 import json
+import re
+import time
+
+import msgpack
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from core import metrics
+
+
+# Channels guruh nomida ':' ruxsat etilmaydi — post.<uid>
+UID_RE = re.compile(r'^[a-zA-Z0-9]{1,64}$')
+
+# Sec-WebSocket-Protocol -> kodek. Subprotocol kelishilgan klientlar batch kadrlarni ham qabul qiladi
+SUBPROTOCOLS = {
+    'threads.msgpack': 'msgpack',
+    'threads.json': 'json',
+}
+
+
+def post_group(uid):
+    return f'post.{uid}'
+
+
+def encode_json(payload):
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
+
+
+def encode_msgpack(payload):
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def encode_event(payload):
+    """
+    Hodisa bir marta, ikkala kodekda kodlanadi — guruhdagi har bir socket tayyor kadrni
+    yuboradi, json.dumps har bir qabul qiluvchi uchun qayta bajarilmaydi.
+    """
+    return {'type': 'send_event', 'json': encode_json(payload), 'msgpack': encode_msgpack(payload)}
+
+
+def batch_frame(codec, frames):
+    # Kodlangan hodisalar qayta kodlanmaydi — {"type": "batch", "events": [...]} qo'lda yig'iladi
+    if codec == 'msgpack':
+        packer = msgpack.Packer(use_bin_type=True)
+        head = packer.pack_map_header(2) + packer.pack('type') + packer.pack('batch') + packer.pack('events')
+        return head + packer.pack_array_header(len(frames)) + b''.join(frames)
+    return '{"type":"batch","events":[' + ','.join(frames) + ']}'
+
 
 class LikeCommentConsumer(AsyncWebsocketConsumer):
+    """
+    Har bir socket faqat obuna bo'lgan postlar guruhiga qo'shiladi — hodisa O(barcha socketlar)
+    emas, faqat shu postni ko'rib turganlarga yuboriladi.
+
+        {"type": "subscribe", "posts": ["<uid>", ...]}
+        {"type": "unsubscribe", "posts": ["<uid>", ...]}
+
+    Serverdan: {"type": "like", "post_id", "like_count"} va {"type": "comment", "post_id", "comment"}.
+
+    Subprotocol: "threads.msgpack" (binary kadrlar) yoki "threads.json". Kelishilgan ulanishlarga
+    BATCH_WINDOW ichidagi hodisalar bitta {"type": "batch", "events": [...]} kadrida yuboriladi;
+    subprotocolsiz (eski) klientlar — JSON, har hodisa alohida kadr.
+    """
+
+    async def dispatch(self, message):
+        # channels har bir xabardan oldin aclose_old_connections() ni chaqiradi — bu barcha socketlar
+        # uchun umumiy bitta oqimga (thread_sensitive) o'tish. send_event bazaga tegmaydi
+        if message['type'] == 'send_event':
+            return await self.send_event(message)
+        await super().dispatch(message)
+
     async def connect(self):
-        await self.channel_layer.group_add("realtime", self.channel_name)
-        await self.accept()
+        with metrics.timer('ws.connect'):
+            await self.open()
+        metrics.incr('ws.open')
+
+    async def open(self):
+        self.subscriptions = set()
+        self.outbox = []
+        self.flush_handle = None
+
+        offered = [name for name in self.scope.get('subprotocols', []) if name in SUBPROTOCOLS]
+        subprotocol = offered[0] if offered else None
+        self.codec = SUBPROTOCOLS[subprotocol] if subprotocol else 'json'
+        self.batching = subprotocol is not None
+        await self.accept(subprotocol=subprotocol)
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard("realtime", self.channel_name)
+        metrics.incr('ws.open', -1)
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+        for uid in self.subscriptions:
+            await self.channel_layer.group_discard(post_group(uid), self.channel_name)
+        self.subscriptions.clear()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        with metrics.timer('ws.receive'):
+            await self.handle(text_data, bytes_data)
 
-    async def receive(self, text_data):
+    async def handle(self, text_data, bytes_data):
         # frontenddan kelgan habar
-        data = json.loads(text_data)
+        try:
+            data = json.loads(text_data) if text_data is not None else msgpack.unpackb(bytes_data, raw=False)
+        except (ValueError, msgpack.UnpackException):
+            return await self.send_error('invalid_json' if text_data is not None else 'invalid_msgpack')
+        if not isinstance(data, dict):
+            return await self.send_error('invalid_message')
         message_type = data.get("type")
 
-        if message_type == "like":
-            await self.channel_layer.group_send(
-                "realtime",
-                {
-                    "type": "send_like",
-                    "like_count": data["like_count"],
-                    "post_id": data["post_id"],
-                }
-            )
-        elif message_type == "comment":
-            await self.channel_layer.group_send(
-                "realtime",
-                {
-                    "type": "send_comment",
-                    "comment": data["comment"],
-                    "post_id": data["post_id"],
-                }
+        if message_type == "subscribe":
+            await self.subscribe(data.get("posts"))
+        elif message_type == "unsubscribe":
+            await self.unsubscribe(data.get("posts"))
+        else:
+            # like/comment hodisalarini faqat server yuboradi (posts.realtime) — klient hisobiga ishonilmaydi
+            await self.send_error('unsupported_type')
+
+    @staticmethod
+    def valid_uid(uid):
+        return isinstance(uid, str) and UID_RE.match(uid) is not None
+
+    def parse_uids(self, uids):
+        if isinstance(uids, str):
+            uids = [uids]
+        if not isinstance(uids, list):
+            return None
+        return [uid for uid in dict.fromkeys(uids) if isinstance(uid, str)]
+
+    async def subscribe(self, uids):
+        uids = self.parse_uids(uids)
+        if uids is None:
+            return await self.send_error('invalid_posts')
+        new = [uid for uid in uids if uid not in self.subscriptions and self.valid_uid(uid)]
+        # Limitdan oshganlari qo'shilmaydi — klient eskilaridan unsubscribe qilishi kerak
+        room = max(0, settings.REALTIME['MAX_SUBSCRIPTIONS'] - len(self.subscriptions))
+        accepted = new[:room]
+        rejected = [uid for uid in uids if not self.valid_uid(uid)] + new[room:]
+        for uid in accepted:
+            await self.channel_layer.group_add(post_group(uid), self.channel_name)
+        self.subscriptions.update(accepted)
+        await self.send_subscriptions(rejected)
+
+    async def unsubscribe(self, uids):
+        uids = self.parse_uids(uids)
+        if uids is None:
+            return await self.send_error('invalid_posts')
+        for uid in uids:
+            if uid in self.subscriptions:
+                self.subscriptions.discard(uid)
+                await self.channel_layer.group_discard(post_group(uid), self.channel_name)
+        await self.send_subscriptions()
+
+    async def send_subscriptions(self, rejected=()):
+        await self.send_payload({
+            "type": "subscribed",
+            "posts": sorted(self.subscriptions),
+            "rejected": list(rejected),
+            "limit": settings.REALTIME['MAX_SUBSCRIPTIONS'],
+        })
+
+    async def send_error(self, code):
+        await self.send_payload({"type": "error", "code": code})
+
+    async def send_payload(self, payload):
+        # Faqat shu ulanishga javob — darhol, batch'siz
+        await self.send_frame(encode_msgpack(payload) if self.codec == 'msgpack' else encode_json(payload))
+
+    async def send_frame(self, frame):
+        if self.codec == 'msgpack':
+            await self.send(bytes_data=frame)
+        else:
+            await self.send(text_data=frame)
+
+    async def send_event(self, event):
+        # posts.realtime.publish() tomonidan oldindan kodlangan kadr
+        if 'sent_at' in event:
+            # publish -> socketga yozish (channel layer orqali o'tish vaqti)
+            metrics.observe('ws.delivery_lag', time.time() - event['sent_at'])
+        frame = event[self.codec]
+        if not self.batching:
+            return await self.send_frame(frame)
+        self.outbox.append(frame)
+        if len(self.outbox) >= settings.REALTIME['BATCH_MAX']:
+            await self.flush_outbox()
+        elif self.flush_handle is None:
+            # Task emas, timer — oyna ichida BATCH_MAX to'lsa bekor qilish arzon
+            self.flush_handle = asyncio.get_running_loop().call_later(
+                settings.REALTIME['BATCH_WINDOW'], lambda: asyncio.ensure_future(self.flush_outbox()),
             )
 
-    async def send_like(self, event):
-        await self.send(text_data=json.dumps({
-            "type": "like",
-            "like_count": event["like_count"],
-            "post_id": event["post_id"]
-        }))
-
-    async def send_comment(self, event):
-        await self.send(text_data=json.dumps({
-            "type": "comment",
-            "comment": event["comment"],
-            "post_id": event["post_id"]
-        }))
+    async def flush_outbox(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        frames, self.outbox = self.outbox, []
+        if len(frames) == 1:
+            await self.send_frame(frames[0])
+        elif frames:
+            await self.send_frame(batch_frame(self.codec, frames))
@@ -0,0 +1,86 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+
+from .models import Post, PostCounterShard
+
+
+COUNTER_FIELDS = ('likes_count', 'comments_count', 'views_count')
+SHARDED_FIELDS = ('likes_count', 'views_count')
+
+
+def _rate_key(post_id):
+    return f'counters:rate:{post_id}:{int(time.time() // 60)}'
+
+
+def _read_key(post_id, field):
+    return f'counters:sum:{post_id}:{field}'
+
+
+def adjust(post, field, delta=1):
+    """
+    Post hisoblagichini atomar o'zgartiradi; yozuv bilan bitta tranzaksiyada chaqiriladi.
+    Sharded postlarda tasodifiy shard yangilanadi, Post qatori esa tegilmaydi.
+    """
+    if post.counter_shards and field in SHARDED_FIELDS:
+        shard = random.randrange(post.counter_shards)
+        PostCounterShard.objects.filter(post_id=post.pk, field=field, shard=shard).update(count=F('count') + delta)
+        return
+    Post.objects.filter(pk=post.pk).update(**{field: F(field) + delta})
+    if field in SHARDED_FIELDS:
+        _note_write(post)
+
+
+def _note_write(post):
+    threshold = settings.COUNTER_SHARD_PROMOTE_WRITES_PER_MINUTE
+    if threshold is None:
+        return
+    key = _rate_key(post.pk)
+    cache.add(key, 0, timeout=120)
+    try:
+        writes = cache.incr(key)
+    except ValueError:
+        return
+    if writes == threshold:
+        promote(post)
+
+
+def promote(post, shards=None):
+    """Postni sharded rejimga o'tkazadi. Mavjud qiymat Post qatorida qoladi (asos sifatida)."""
+    shards = shards or settings.COUNTER_SHARDS
+    PostCounterShard.objects.bulk_create(
+        [PostCounterShard(post_id=post.pk, field=field, shard=shard)
+         for field in SHARDED_FIELDS for shard in range(shards)],
+        ignore_conflicts=True,
+    )
+    Post.objects.filter(pk=post.pk, counter_shards=0).update(counter_shards=shards)
+    post.counter_shards = shards
+
+
+def get_count(post, field, from_db=False):
+    """
+    Hisoblagich qiymati. Sharded postlarda Post qatori + shard'lar yig'indisi
+    (annotatsiyadan yoki qisqa muddatli keshdan). from_db=True — har doim bazadan
+    (masalan like/unlike javobi; sharded postda kesh ham yangilanadi).
+    """
+    # Post.objects.with_related() annotatsiyasi — ro'yxatlarda qo'shimcha so'rov yo'q
+    shards = getattr(post, f'{field}_shards', None)
+    if shards is not None and not from_db:
+        return getattr(post, field) + shards
+
+    if not post.counter_shards or field not in SHARDED_FIELDS:
+        if from_db:
+            return Post.objects.values_list(field, flat=True).get(pk=post.pk)
+        return getattr(post, field)
+
+    key = _read_key(post.pk, field)
+    value = None if from_db else cache.get(key)
+    if value is None:
+        base = Post.objects.values_list(field, flat=True).get(pk=post.pk)
+        shards = PostCounterShard.objects.filter(post_id=post.pk, field=field).aggregate(total=Sum('count'))['total']
+        value = base + (shards or 0)
+        cache.set(key, value, settings.COUNTER_SHARD_READ_CACHE_SECONDS)
+    return value
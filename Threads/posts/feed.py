@@ -0,0 +1,97 @@
+import heapq
+
+from django.conf import settings
+from django.core.cache import cache
+
+from accounts.models import User, UserFollow
+from core.pagination import decode_cursor, encode_cursor, keyset_filter
+from .models import Post, TimelineEntry
+
+
+PULL_AUTHORS_CACHE_KEY = 'feed:pull-authors'
+PULL_AUTHORS_CACHE_TIMEOUT = 300
+
+# Yangi follow qilinganda muallifning nechta oxirgi posti inbox'ga qo'shiladi
+FOLLOW_BACKFILL_LIMIT = 50
+
+
+def pull_author_ids():
+    """Followerlari juda ko'p (fan-out-on-read) mualliflar."""
+    author_ids = cache.get(PULL_AUTHORS_CACHE_KEY)
+    if author_ids is None:
+        author_ids = list(
+            User.objects.filter(followers_count__gt=settings.FEED_FANOUT_MAX_FOLLOWERS)
+            .values_list('id', flat=True)
+        )
+        cache.set(PULL_AUTHORS_CACHE_KEY, author_ids, PULL_AUTHORS_CACHE_TIMEOUT)
+    return author_ids
+
+
+def fan_out(post):
+    """Postni muallif followerlarining inbox'lariga batch'lab yozadi."""
+    entries = [TimelineEntry(owner_id=post.author_id, post=post, created_at=post.created_at)]
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+    if post.author_id in pull_author_ids():
+        return
+
+    batch_size = settings.FEED_FANOUT_BATCH_SIZE
+    follower_ids = (
+        UserFollow.objects.filter(following_id=post.author_id)
+        .values_list('follower_id', flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+    batch = []
+    for follower_id in follower_ids:
+        batch.append(TimelineEntry(owner_id=follower_id, post=post, created_at=post.created_at))
+        if len(batch) >= batch_size:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def backfill(follower, following):
+    """Follow qilinganda muallifning oxirgi postlarini inbox'ga qo'shadi."""
+    if following.id in pull_author_ids():
+        return
+    posts = Post.objects.filter(author=following).order_by('-created_at').values_list('id', 'created_at')
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(owner=follower, post_id=post_id, created_at=created_at)
+         for post_id, created_at in posts[:FOLLOW_BACKFILL_LIMIT]],
+        ignore_conflicts=True,
+    )
+
+
+def remove(follower, following):
+    """Unfollow qilinganda muallif postlarini inbox'dan olib tashlaydi."""
+    TimelineEntry.objects.filter(owner=follower, post__author=following).delete()
+
+
+def feed_page(user, cursor=None, limit=20):
+    """
+    Home feed sahifasi: inbox'dan bitta indekslangan range so'rov, plus
+    follow qilingan "pull" mualliflarning postlari. (posts, next_cursor) qaytaradi.
+    """
+    position = decode_cursor(cursor)
+
+    inbox = keyset_filter(TimelineEntry.objects.filter(owner=user), 'created_at', position, pk_field='post_id')
+    rows = list(inbox.order_by('-created_at', '-post_id').values_list('created_at', 'post_id')[:limit])
+
+    pull_ids = pull_author_ids()
+    if pull_ids:
+        followed = UserFollow.objects.filter(follower=user, following_id__in=pull_ids).values('following_id')
+        pulled = keyset_filter(Post.objects.filter(author_id__in=followed), 'created_at', position)
+        pulled = list(pulled.order_by('-created_at', '-id').values_list('created_at', 'id')[:limit])
+        if pulled:
+            merged = heapq.merge(rows, pulled, reverse=True)
+            seen, rows = set(), []
+            for row in merged:
+                if row[1] not in seen:
+                    seen.add(row[1])
+                    rows.append(row)
+            rows = rows[:limit]
+
+    posts_by_id = Post.objects.with_related().in_bulk([post_id for _, post_id in rows])
+    posts = [posts_by_id[post_id] for _, post_id in rows if post_id in posts_by_id]
+    next_cursor = encode_cursor(*rows[-1]) if len(rows) == limit else None
+    return posts, next_cursor
@@ -0,0 +1,182 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# uid -> id keshi: view endpoint'i mavjud bo'lmagan post uchun bazaga yozmasdan 404 qaytaradi
+POST_ID_CACHE_SECONDS = 300
+
+
+def _post_id_key(uid):
+    return f'ingest:post:{uid}'
+
+
+def resolve_post_id(uid):
+    """Post id'si yoki None. Mavjud postlar keshlanadi (topilmaganlar — yo'q, keyin yaratilishi mumkin)."""
+    from .models import Post
+
+    key = _post_id_key(uid)
+    post_id = cache.get(key)
+    if post_id is None:
+        post_id = Post.objects.filter(uid=uid).values_list('id', flat=True).first()
+        if post_id is not None:
+            cache.set(key, post_id, POST_ID_CACHE_SECONDS)
+    return post_id
+
+
+def forget_post(uid):
+    cache.delete(_post_id_key(uid))
+
+
+def write_views(events):
+    """
+    (post_uid, user_id, session_id) hodisalarini bazaga yozadi: bitta so'rov bilan
+    mavjudlarini aniqlaydi, qolganlarini bulk_create qiladi va hisoblagichlarni oshiradi.
+    Yozilgan yangi ko'rishlar sonini qaytaradi.
+    """
+    from . import counters
+    from .models import Post, View
+
+    events = set(events)
+    if not events:
+        return 0
+    posts = {post.uid: post for post in Post.objects.filter(uid__in={uid for uid, _, _ in events}).only('id', 'uid', 'counter_shards')}
+    rows = {(posts[uid].id, user_id, session_id) for uid, user_id, session_id in events if uid in posts}
+    if not rows:
+        return 0
+
+    # HLL rejimida views_count sketch bahosidan olinadi, View qatorlari ixtiyoriy
+    sketched = settings.VIEW_COUNTING == 'hll'
+    if sketched:
+        from .sketches import record_views
+        record_views(rows)
+        if not settings.VIEW_STORE_ROWS:
+            return len(rows)
+
+    posts_by_id = {post.id: post for post in posts.values()}
+    with transaction.atomic():
+        # Post qatorlari qulflanadi — bir vaqtda flush qilayotgan boshqa worker shu postlar uchun
+        # mavjudlik tekshiruvini bizning commit'dan keyin ko'radi (hisoblagich ikki marta oshmaydi).
+        # SQLite'da IMMEDIATE tranzaksiya yozuvchilarni o'zi navbatga qo'yadi
+        list(Post.objects.select_for_update().filter(id__in=posts_by_id).order_by('id').values_list('id', flat=True))
+        new_rows = rows - _existing_views(rows)
+        if not new_rows:
+            return 0
+        View.objects.bulk_create(
+            [View(post_id=post_id, user_id=user_id, session_id=session_id) for post_id, user_id, session_id in new_rows],
+            ignore_conflicts=True,
+        )
+        if not sketched:
+            for post_id, count in Counter(post_id for post_id, _, _ in new_rows).items():
+                counters.adjust(posts_by_id[post_id], 'views_count', count)
+    return len(new_rows)
+
+
+def _existing_views(rows):
+    # Login qilgan foydalanuvchi post uchun bir marta (sessiyadan qat'i nazar), anonim — sessiya bo'yicha
+    from .models import View
+
+    post_ids = {post_id for post_id, _, _ in rows}
+    user_ids = {user_id for _, user_id, _ in rows if user_id is not None}
+    session_ids = {session_id for _, user_id, session_id in rows if user_id is None}
+    existing = set()
+    for post_id, user_id, session_id in (
+        View.objects.filter(post_id__in=post_ids)
+        .filter(Q(user_id__in=user_ids) | Q(user__isnull=True, session_id__in=session_ids))
+        .values_list('post_id', 'user_id', 'session_id')
+    ):
+        existing.add((post_id, user_id, None) if user_id is not None else (post_id, None, session_id))
+    return existing
+
+
+class SynchronousViewBuffer:
+    """Buferlashsiz — har bir hodisa darhol yoziladi (test va lokal ishlash uchun)."""
+
+    def add(self, post_uid, user_id, session_id):
+        write_views([(post_uid, user_id, session_id)])
+
+    def flush(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+class InProcessViewBuffer:
+    """
+    Jarayon ichidagi write-behind bufer: hodisalar xotirada dublikatsiz yig'iladi va
+    MAX_SIZE ga yetganda yoki har FLUSH_INTERVAL soniyada fon oqimida yoziladi.
+    Jarayon to'xtaganda (atexit) qolgan hodisalar yozib bo'linadi.
+    """
+
+    def __init__(self, max_size=500, flush_interval=2.0):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='view-buffer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, post_uid, user_id, session_id):
+        with self._lock:
+            self._pending.add((post_uid, user_id, session_id))
+            full = len(self._pending) >= self.max_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                events, self._pending = self._pending, set()
+            if not events:
+                return 0
+            try:
+                return write_views(events)
+            except Exception:
+                # Yozib bo'lmasa hodisalarni qaytarib qo'yamiz, keyingi flush'da qayta uriniladi
+                logger.exception("Ko'rishlarni yozib bo'lmadi (%d ta hodisa)", len(events))
+                with self._lock:
+                    self._pending |= events
+                return 0
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            connection.close()
+
+    def close(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_view_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = dict(settings.VIEW_BUFFER)
+                backend = import_string(config.pop('BACKEND'))
+                _buffer = backend(**{key.lower(): value for key, value in config.items()})
+    return _buffer
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts.models import Post, PostTag
+
+# Post.tags through='PostTag' bo'lishidan oldingi avtomatik M2M jadvali (post_id, hashtag_id)
+LEGACY_TABLE = f'{Post._meta.db_table}_tags'
+
+
+def copy_legacy_tags(batch_size=5000, dry_run=False):
+    """
+    Eski jadvaldagi bog'lanishlarni PostTag'ga created_at = post.created_at bilan ko'chiradi.
+    Qayta ishga tushirish xavfsiz — mavjud (post, hashtag) juftlari o'tkazib yuboriladi.
+    Qaytaradi: (eski jadvaldagi qatorlar, qo'shilganlar).
+    """
+    seen = added = 0
+    last_id = 0
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        while True:
+            # id bo'yicha keyset — katta jadvallarda ham OFFSET'siz
+            cursor.execute(
+                f"SELECT t.id, t.post_id, t.hashtag_id, p.created_at FROM {quote(LEGACY_TABLE)} t "
+                f"JOIN {quote(Post._meta.db_table)} p ON p.id = t.post_id "
+                f"WHERE t.id > %s ORDER BY t.id LIMIT %s",
+                [last_id, batch_size],
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return seen, added
+            last_id = rows[-1][0]
+            seen += len(rows)
+            existing = set(
+                PostTag.objects.filter(post_id__in={row[1] for row in rows}).values_list('post_id', 'hashtag_id')
+            )
+            missing = [
+                PostTag(post_id=post_id, hashtag_id=hashtag_id, created_at=created_at)
+                for _, post_id, hashtag_id, created_at in rows
+                if (post_id, hashtag_id) not in existing
+            ]
+            added += len(missing)
+            if missing and not dry_run:
+                PostTag.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+class Command(BaseCommand):
+    help = (
+        "Post.tags through='PostTag' ga o'tgandan keyin eski posts_post_tags qatorlarini "
+        "created_at bilan PostTag'ga ko'chiradi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument('--drop-legacy', action='store_true', help="Ko'chirilgandan keyin eski jadvalni o'chirish")
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        prefix = "[dry-run] " if dry_run else ""
+        tables = connection.introspection.table_names()
+        if LEGACY_TABLE not in tables:
+            self.stdout.write(f"{LEGACY_TABLE} jadvali yo'q — ko'chiriladigan narsa yo'q")
+            return
+        if PostTag._meta.db_table not in tables:
+            if dry_run:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(LEGACY_TABLE)}")
+                    total = cursor.fetchone()[0]
+                self.stdout.write(self.style.SUCCESS(f"{prefix}Ko'chiriladi: {total} ta bog'lanish"))
+                return
+            # Avto-migratsiya M2M -> through o'zgarishini qila olmaydi; jadval shu yerda yaratiladi
+            with connection.schema_editor() as editor:
+                editor.create_model(PostTag)
+
+        seen, added = copy_legacy_tags(options['batch_size'], dry_run)
+        self.stdout.write(self.style.SUCCESS(f"{prefix}Ko'chirildi: {added} ta bog'lanish ({seen} tadan)"))
+
+        if options['drop_legacy'] and not dry_run:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE {connection.ops.quote_name(LEGACY_TABLE)}")
+            self.stdout.write(f"{LEGACY_TABLE} o'chirildi")
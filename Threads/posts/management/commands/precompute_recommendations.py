@@ -0,0 +1,42 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.recommender.precompute import users_to_refresh, precompute
+
+
+class Command(BaseCommand):
+    help = "Faol foydalanuvchilar uchun tavsiyalarni oldindan hisoblaydi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--active-days', type=int, default=7, help="shu kunlar ichida faol bo'lgan userlar")
+        parser.add_argument('--top-n', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--incremental', action='store_true', help="faqat yangi interaction qilgan userlar")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['active_days'])
+        user_ids = users_to_refresh(since, incremental=options['incremental'])
+        total = len(user_ids)
+        self.stdout.write(f"{total} ta foydalanuvchi, {options['workers']} worker")
+        if not total:
+            return
+
+        started = time.perf_counter()
+
+        def report(done):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {done}/{total} ({done / elapsed:.1f} users/sec)")
+
+        done = precompute(
+            user_ids, options['top_n'],
+            workers=options['workers'], batch_size=options['batch_size'], on_batch=report,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {done} foydalanuvchi, {elapsed:.2f}s, {done / elapsed:.1f} users/sec"
+        ))
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posts.models import View
+
+
+class Command(BaseCommand):
+    help = "Saqlash muddati o'tgan View qatorlarini batch'lab o'chiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.VIEW_ROW_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['days'] is None:
+            raise CommandError("VIEW_ROW_RETENTION_DAYS sozlanmagan, --days bering")
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted = 0
+        while True:
+            ids = list(View.objects.filter(viewed_at__lt=cutoff).order_by('id').values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += View.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"O'chirildi: {deleted} ta View qatori ({cutoff:%Y-%m-%d} dan eski)"))
@@ -0,0 +1,16 @@
+import time
+from django.core.management.base import BaseCommand
+from posts.recommender.index import build_index
+
+
+class Command(BaseCommand):
+    help = "Tavsiya (TF-IDF) indeksini noldan qayta quradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = build_index(chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Indeks qurildi: {count} ta post, {elapsed:.2f}s"))
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+
+from accounts.models import User, UserFollow
+from posts.models import Post, PostCounterShard, Like, Comment, View
+
+
+def count_by(queryset, field, ids):
+    rows = queryset.filter(**{f'{field}__in': ids}).values(field).annotate(n=Count('id')).values_list(field, 'n')
+    return dict(rows)
+
+
+def shard_offsets(ids):
+    # Sharded postlarda Post qatori = haqiqiy qiymat - shard'lar yig'indisi
+    offsets = {}
+    rows = (
+        PostCounterShard.objects.filter(post_id__in=ids)
+        .values('field', 'post_id').annotate(total=Sum('count'))
+        .values_list('field', 'post_id', 'total')
+    )
+    for field, post_id, total in rows:
+        offsets.setdefault(field, {})[post_id] = total
+    return offsets
+
+
+class Command(BaseCommand):
+    help = "Post va User hisoblagichlarini manba jadvallar bilan solishtirib tuzatadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        post_sources = {
+            'likes_count': (Like.objects.all(), 'post_id'),
+            'comments_count': (Comment.objects.all(), 'post_id'),
+        }
+        # HLL yoki retention yoqilgan bo'lsa View qatorlari to'liq manba emas
+        if settings.VIEW_COUNTING == 'exact' and settings.VIEW_ROW_RETENTION_DAYS is None:
+            post_sources['views_count'] = (View.objects.all(), 'post_id')
+        user_sources = {
+            'followers_count': (UserFollow.objects.all(), 'following_id'),
+            'following_count': (UserFollow.objects.all(), 'follower_id'),
+            'posts_count': (Post.objects.all(), 'author_id'),
+        }
+        fixed_posts = self.reconcile(Post, post_sources, batch_size, dry_run, offsets=shard_offsets)
+        fixed_users = self.reconcile(User, user_sources, batch_size, dry_run)
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Tuzatildi: {fixed_posts} ta post, {fixed_users} ta foydalanuvchi"
+        ))
+
+    def reconcile(self, model, sources, batch_size, dry_run, offsets=None):
+        fields = list(sources)
+        fixed = 0
+        last_id = 0
+        while True:
+            # id bo'yicha keyset — katta jadvallarda ham OFFSET'siz
+            batch = list(model.objects.filter(id__gt=last_id).order_by('id').only('id', *fields)[:batch_size])
+            if not batch:
+                return fixed
+            last_id = batch[-1].id
+            ids = [obj.id for obj in batch]
+            actual = {field: count_by(queryset, key, ids) for field, (queryset, key) in sources.items()}
+            offset = offsets(ids) if offsets else {}
+
+            for obj in batch:
+                stored = {field: getattr(obj, field) for field in fields}
+                expected = {
+                    field: actual[field].get(obj.id, 0) - offset.get(field, {}).get(obj.id, 0)
+                    for field in fields
+                }
+                if stored == expected:
+                    continue
+                fixed += 1
+                if not dry_run:
+                    # Compare-and-set: oraliqda F() bilan o'zgargan qatorni ustidan yozmaymiz
+                    model.objects.filter(pk=obj.pk, **stored).update(**expected)
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from posts.recommender.cf import train
+
+
+class Command(BaseCommand):
+    help = "UserInteraction jadvalidan collaborative filtering faktorlarini o'qitadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--factors', type=int, default=64)
+        parser.add_argument('--iterations', type=int, default=7)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = train(factors=options['factors'], iterations=options['iterations'])
+        elapsed = time.perf_counter() - started
+        if result is None:
+            self.stdout.write(self.style.WARNING("Interactionlar yetarli emas, model o'qitilmadi"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Model o'qitildi: {result['users']} user, {result['posts']} post, "
+            f"{result['factors']} faktor, {elapsed:.2f}s"
+        ))
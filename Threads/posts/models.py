@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 import shortuuid
 import os
-from accounts.models import User
+from accounts.models import PUBLIC_FIELDS, User
+from .recommender.text import HASHTAG_RE
 
 
 def generate_shortuuid():
@@ -21,27 +23,154 @@ class Hashtag(models.Model):
         return self.name
     
 
+class PostQuerySet(models.QuerySet):
+    def with_related(self):
+        """
+        PostSerializer uchun kerakli hamma narsa oldindan yuklanadi: muallif (JOIN), media va
+        teglar (prefetch), shard'lar yig'indisi (annotatsiya). Sahifa o'lchamidan qat'i nazar
+        so'rovlar soni o'zgarmas — 1 + 2 ta prefetch.
+        """
+        return self.select_related('author').prefetch_related('post_media', 'tags').with_counts()
+
+    def for_etag(self):
+        """
+        ETag validatorlari uchun (Post.etag_state): hisoblagichlar, updated_at va muallif —
+        matn, media va teglar yuklanmaydi.
+        """
+        return self.select_related('author').only(
+            'created_at', 'updated_at', 'likes_count', 'comments_count', 'views_count', 'counter_shards',
+            *(f'author__{field}' for field in PUBLIC_FIELDS),
+        ).with_counts()
+
+    def with_counts(self):
+        """Sharded hisoblagichlar yig'indisi annotatsiyasi (counters.get_count shuni ishlatadi)."""
+        return self.annotate(
+            **{f'{field}_shards': _shard_total(field) for field in ('likes_count', 'views_count')}
+        )
+
+
+def _shard_total(field):
+    # Oddiy postlarda (counter_shards=0) subquery umuman bajarilmaydi
+    total = (
+        PostCounterShard.objects.filter(post=models.OuterRef('pk'), field=field)
+        .values('post').annotate(total=models.Sum('count')).values('total')
+    )
+    return models.Case(
+        models.When(counter_shards=0, then=models.Value(0)),
+        default=Coalesce(models.Subquery(total), models.Value(0)),
+    )
+
+
 class Post(models.Model):
     uid = models.CharField(default=generate_shortuuid, max_length=11, unique=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     content = models.TextField(null=True, blank=True)
-    tags = models.ManyToManyField(Hashtag, blank=True)
+    # Eski bazalarda posts_post_tags qatorlari `manage.py backfill_post_tags` bilan ko'chiriladi
+    tags = models.ManyToManyField(Hashtag, through='PostTag', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    
+    # Denormalizatsiya qilingan hisoblagichlar (F() bilan yangilanadi, reconcile_counters tekshiradi)
+    likes_count = models.IntegerField(default=0)
+    comments_count = models.IntegerField(default=0)
+    views_count = models.IntegerField(default=0)
+    # 0 — oddiy rejim; N > 0 — like/view hisoblagichlari N ta PostCounterShard'ga bo'lingan
+    counter_shards = models.PositiveSmallIntegerField(default=0)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', '-created_at', '-id'], name='post_author_created_idx'),
+        ]
 
     def __str__(self):
         return f"Post {self.uid}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Bazadagi matn — save() da hashtaglarni qayta hisoblash kerakmi, shuni aniqlash uchun
+        instance._saved_content = instance.__dict__.get('content', models.DEFERRED)
+        return instance
+
+    def etag_state(self):
+        """
+        PostSerializer javobini o'zgartiradigan qiymatlar. Matn va teglar o'zgarsa updated_at ham
+        o'zgaradi; media post bilan birga yoziladi va tahrirlanmaydi.
+        """
+        return (
+            self.pk, self.updated_at, self.likes_count, self.comments_count, self.views_count,
+            self.likes_count_shards, self.views_count_shards, self.author.etag_state(),
+        )
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)  # Avval postni saqlaymiz
-        # Hashtaglarni aniqlash va saqlash
-        import re
-        hashtags = re.findall(r'#\w+', self.content)  # # bilan boshlanadigan so'zlarni topish
-        self.tags.clear()  # Eski hashtaglar olib tashlanadi
-        for tag in hashtags:
-            hashtag, _ = Hashtag.objects.get_or_create(name=tag.lstrip('#'))
-            self.tags.add(hashtag)
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        content_saved = 'content' in self.__dict__ and (update_fields is None or 'content' in update_fields)
+        # post_save signal'lari ham shunga qaraydi (o'zgarmagan post uchun keshni tozalash shart emas)
+        self._content_changed = content_saved and (
+            adding or self.content != getattr(self, '_saved_content', models.DEFERRED)
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)  # Avval postni saqlaymiz
+            if adding:
+                # Profil sarlavhasidagi posts_count (followers_count kabi F() bilan, bitta tranzaksiyada)
+                User.objects.filter(pk=self.author_id).update(posts_count=models.F('posts_count') + 1)
+            if self._content_changed:
+                self.sync_tags(adding=adding)
+        if content_saved:
+            self._saved_content = self.content
+
+    def sync_tags(self, adding=False):
+        """
+        Matndagi hashtaglarni joriy teglar bilan solishtirib (set diff) saqlaydi:
+        yo'q hashtaglar bitta bulk insert bilan yaratiladi, bog'lanishlar bulk qo'shiladi/o'chiriladi.
+        """
+        names = {tag.lstrip('#') for tag in HASHTAG_RE.findall(self.content or '')}
+        current = {} if adding else dict(self.tags.values_list('name', 'id'))
+
+        removed = [tag_id for name, tag_id in current.items() if name not in names]
+        if removed:
+            PostTag.objects.filter(post=self, hashtag_id__in=removed).delete()
+
+        missing = names - current.keys()
+        if missing:
+            Hashtag.objects.bulk_create([Hashtag(name=name) for name in missing], ignore_conflicts=True)
+            tag_ids = Hashtag.objects.filter(name__in=missing).values_list('id', flat=True)
+            PostTag.objects.bulk_create(
+                [PostTag(post=self, hashtag_id=tag_id, created_at=self.created_at) for tag_id in tag_ids],
+                ignore_conflicts=True,
+            )
+
+
+class PostTag(models.Model):
+    # Hashtag -> postlar inverted indeksi; created_at — post.created_at nusxasi (posting list tartibi uchun)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('post', 'hashtag')
+        indexes = [
+            models.Index(fields=['hashtag', '-created_at', '-post'], name='posttag_tag_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.hashtag_id} on {self.post_id}"
+
+
+class PostCounterShard(models.Model):
+    # Ommabop postlarda like/view yozuvlari bitta qatorda to'qnashmasligi uchun
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='counter_shards_set')
+    field = models.CharField(max_length=20, choices=[('likes_count', 'Likes'), ('views_count', 'Views')])
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('post', 'field', 'shard')
+
+    def __str__(self):
+        return f"{self.field}[{self.shard}] of {self.post_id}"
 
 
 class PostMedia(models.Model):
@@ -65,6 +194,11 @@ class Comment(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', '-created_at', '-id'], name='comment_post_created_idx'),
+        ]
+
     def __str__(self):
         return f"Comment by {self.author.username} on {self.post.uid}"
     
@@ -76,6 +210,9 @@ class Like(models.Model):
 
     class Meta:
         unique_together = ['post', 'user']  # Har bir user faqat 1 marta like qilsin
+        indexes = [
+            models.Index(fields=['post', '-created_at', '-id'], name='like_post_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} liked {self.post.uid}"
@@ -89,11 +226,36 @@ class View(models.Model):
 
     class Meta:
         unique_together = ('post', 'user', 'session_id')
+        constraints = [
+            # Login qilganlar session_id'siz yoziladi — NULL'lar unique_together'da to'qnashmaydi
+            models.UniqueConstraint(
+                fields=['post', 'user'], condition=models.Q(session_id__isnull=True), name='view_post_user_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['post', '-viewed_at', '-id'], name='view_post_viewed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user or self.session_id} viewed {self.post.uid}"
     
 
+class PostViewSketch(models.Model):
+    # Unikal ko'ruvchilar uchun HyperLogLog registrlari; day=None — butun davr uchun
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='view_sketches')
+    day = models.DateField(null=True, blank=True)
+    registers = models.BinaryField()
+
+    class Meta:
+        unique_together = ('post', 'day')
+        constraints = [
+            models.UniqueConstraint(fields=['post'], condition=models.Q(day__isnull=True), name='post_view_sketch_total_unique'),
+        ]
+
+    def __str__(self):
+        return f"View sketch of {self.post_id} ({self.day or 'total'})"
+
+
 class UserInteraction(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
@@ -101,3 +263,37 @@ class UserInteraction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
 
+class TimelineEntry(models.Model):
+    # Followerning home feed inbox'i (fan-out-on-write), created_at — post.created_at nusxasi
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('owner', 'post')
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-post'], name='timeline_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.post.uid} in {self.owner.username}'s feed"
+
+
+class UserInterest(models.Model):
+    # Foydalanuvchi qiziqishlari: {term: weight}, vaznlar updated_at vaqtiga nisbatan saqlanadi
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='interest')
+    terms = models.JSONField(default=dict)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Interests of {self.user.username}"
+
+
+class RecommendationList(models.Model):
+    # precompute_recommendations buyrug'i hisoblagan tavsiyalar (post id'lar, reyting tartibida)
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='recommendation_list')
+    post_ids = models.JSONField(default=list)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Recommendations for {self.user.username}"
@@ -0,0 +1,154 @@
+import atexit
+import heapq
+import logging
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import connection, transaction
+
+from core import metrics
+from .consumers import encode_event, post_group
+
+logger = logging.getLogger(__name__)
+
+
+async def apublish(group, payload):
+    """
+    Hodisani bir marta kodlab (JSON va msgpack) guruhga yuboradi; layer ishlamasa
+    yozuv (like/comment) buzilmaydi — faqat log.
+    """
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    message = encode_event(payload)
+    # Consumer'lar ws.delivery_lag metrikasini shundan hisoblaydi
+    message['sent_at'] = time.time()
+    try:
+        with metrics.timer('realtime.publish'):
+            await layer.group_send(group, message)
+    except Exception:
+        logger.exception("Realtime hodisani yuborib bo'lmadi (%s)", group)
+
+
+def publish(group, payload):
+    async_to_sync(apublish)(group, payload)
+
+
+def _publish_like_counts(post_ids):
+    from . import counters
+    from .models import Post
+
+    # Hisob bazadan o'qiladi — klient yuborgan qiymatga ishonilmaydi
+    for post in Post.objects.filter(pk__in=post_ids).with_counts().only('id', 'uid', 'likes_count', 'counter_shards'):
+        publish(post_group(post.uid), {
+            'type': 'like',
+            'post_id': post.uid,
+            'like_count': counters.get_count(post, 'likes_count'),
+        })
+
+
+class LikeCountCoalescer:
+    """
+    Post bo'yicha like hisobini `window` soniyada bir marta yuboradi: birinchi like flush'ni
+    rejalashtiradi, oyna ichidagi keyingilari unga qo'shiladi. Flush paytida hisob bazadan
+    o'qiladi, shuning uchun oxirgi qiymat yo'qolmaydi (viral postda soniyasiga bir necha xabar).
+    """
+
+    def __init__(self, window=0.25):
+        self.window = window
+        self._deadlines = []  # (deadline, post_id) min-heap
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='like-coalescer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def touch(self, post_id):
+        with self._lock:
+            if post_id in self._pending:
+                metrics.incr('realtime.like_coalesced')
+                return
+            self._pending.add(post_id)
+            first = not self._deadlines
+            heapq.heappush(self._deadlines, (time.monotonic() + self.window, post_id))
+        if first:
+            self._wakeup.set()
+
+    def _due(self, now):
+        # Ro'yxatdan o'qishdan oldin olinadi — o'qishdan keyingi like yangi flush rejalashtiradi
+        due = []
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, post_id = heapq.heappop(self._deadlines)
+                self._pending.discard(post_id)
+                due.append(post_id)
+            timeout = self._deadlines[0][0] - now if self._deadlines else None
+        return due, timeout
+
+    def flush(self, now=None):
+        due, timeout = self._due(time.monotonic() if now is None else now)
+        if due:
+            try:
+                _publish_like_counts(due)
+            except Exception:
+                logger.exception("Like hisoblarini yuborib bo'lmadi (%d ta post)", len(due))
+        return timeout
+
+    def _run(self):
+        timeout = None
+        while not self._stopped.is_set():
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            timeout = self.flush()
+            connection.close()
+
+    def close(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush(now=float('inf'))
+
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def get_like_coalescer():
+    global _coalescer
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                _coalescer = LikeCountCoalescer(window=settings.REALTIME['LIKE_COALESCE_WINDOW'])
+    return _coalescer
+
+
+def like_changed(post):
+    """Like/unlike'dan keyin — commit'dan so'ng post obunachilariga yangi hisob (oyna ichida birlashtiriladi)."""
+    post_id = post.pk
+
+    def send():
+        if settings.REALTIME['LIKE_COALESCE_WINDOW'] > 0:
+            get_like_coalescer().touch(post_id)
+        else:
+            _publish_like_counts([post_id])
+    transaction.on_commit(send)
+
+
+def comment_created(comment):
+    """Yangi komment serializer orqali commit'dan keyin post obunachilariga yuboriladi."""
+    from .serializers import CommentSerializer
+
+    def send():
+        publish(post_group(comment.post.uid), {
+            'type': 'comment',
+            'post_id': comment.post.uid,
+            'comment': dict(CommentSerializer(comment).data),
+        })
+    transaction.on_commit(send)
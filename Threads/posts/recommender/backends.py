@@ -0,0 +1,90 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+# Og'ir kutubxonalar (numpy/scipy/sklearn) faqat backend birinchi marta ishlatilganda yuklanadi,
+# shuning uchun bu modulda ular import qilinmaydi.
+BACKENDS = {
+    'recent': 'posts.recommender.backends.RecentRecommender',
+    'tfidf': 'posts.recommender.backends.TfidfRecommender',
+    'cf': 'posts.recommender.backends.CollaborativeRecommender',
+    'hybrid': 'posts.recommender.backends.HybridRecommender',
+}
+
+
+def fetch_in_order(queryset, post_ids):
+    """Postlarni bitta so'rov bilan olib, reyting tartibini saqlaydi."""
+    post_ids = [int(i) for i in post_ids]
+    posts_by_id = queryset.in_bulk(post_ids)
+    return [posts_by_id[i] for i in post_ids if i in posts_by_id]
+
+
+class BaseRecommender:
+    # precompute_recommendations natijasidan foydalanish mumkinmi
+    use_precomputed = True
+    # Foydalanuvchi qiziqish vektorlari (UserInterest) kerakmi — kerak bo'lmasa like/comment'da yangilanmaydi
+    uses_interests = False
+
+    def candidates(self, user, persist=True):
+        """Barcha nomzodlar uchun (post_ids, scores) yoki None."""
+        raise NotImplementedError
+
+    def recommend(self, user, k, persist=True):
+        """Eng mos k ta post id (o'zi ko'rgan/like bosganlarsiz)."""
+        from .ranking import top_k, seen_post_ids
+
+        candidates = self.candidates(user, persist=persist)
+        if candidates is None:
+            return []
+        post_ids, scores = candidates
+        return [int(i) for i in top_k(post_ids, scores, k, exclude=seen_post_ids(user))]
+
+    def recommend_posts(self, user, k):
+        from posts.models import Post
+
+        post_ids = None
+        if self.use_precomputed:
+            from .precompute import get_precomputed_post_ids
+            post_ids = get_precomputed_post_ids(user, k)
+        if post_ids is None:
+            post_ids = self.recommend(user, k)
+        return fetch_in_order(Post.objects.with_related(), post_ids)
+
+
+class RecentRecommender(BaseRecommender):
+    use_precomputed = False
+
+    def recommend(self, user, k, persist=True):
+        from posts.models import Post
+        return list(Post.objects.order_by('-created_at').values_list('id', flat=True)[:k])
+
+
+class TfidfRecommender(BaseRecommender):
+    uses_interests = True
+
+    def candidates(self, user, persist=True):
+        from .service import content_scores
+        return content_scores(user, persist=persist)
+
+
+class CollaborativeRecommender(BaseRecommender):
+    def candidates(self, user, persist=True):
+        from .service import cf_scores
+        return cf_scores(user)
+
+
+class HybridRecommender(BaseRecommender):
+    uses_interests = True
+
+    def candidates(self, user, persist=True):
+        from .service import hybrid_scores
+        return hybrid_scores(user, persist=persist)
+
+
+@lru_cache(maxsize=None)
+def get_recommender(name=None):
+    """settings.RECOMMENDER_BACKEND (alias yoki to'liq yo'l) bo'yicha backend."""
+    name = name or settings.RECOMMENDER_BACKEND
+    return import_string(BACKENDS.get(name, name))()
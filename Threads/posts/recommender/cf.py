@@ -0,0 +1,130 @@
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .index import current_version_dir, new_version_dir, publish_version
+from .interests import ACTION_WEIGHTS
+
+
+def cf_dir():
+    return Path(settings.RECOMMENDER_CF_DIR)
+
+
+class CFModel:
+    """
+    Implicit feedback asosidagi matrix factorization faktorlari.
+    Massivlar .npy fayllardan mmap orqali yuklanadi, qayta o'qitish kerak emas.
+    """
+
+    def __init__(self, version_dir):
+        self.version_dir = version_dir
+        load = lambda name: np.load(version_dir / f'{name}.npy', mmap_mode='r')
+        self.user_ids = load('user_ids')
+        self.post_ids = load('post_ids')
+        self.user_factors = load('user_factors')
+        self.item_factors = load('item_factors')
+
+    def user_vector(self, user_id):
+        row = np.searchsorted(self.user_ids, user_id)
+        if row >= len(self.user_ids) or self.user_ids[row] != user_id:
+            return None
+        return self.user_factors[row]
+
+    def score(self, user_id):
+        """(post_ids, scores) yoki None, agar foydalanuvchi modelda bo'lmasa."""
+        vector = self.user_vector(user_id)
+        if vector is None:
+            return None
+        return np.asarray(self.post_ids), self.item_factors @ vector
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_cf_model():
+    global _model
+    version_dir = current_version_dir(cf_dir())
+    if version_dir is None:
+        return None
+    with _model_lock:
+        if _model is None or _model.version_dir != version_dir:
+            _model = CFModel(version_dir)
+        return _model
+
+
+def interaction_matrix(chunk_size=10000):
+    """UserInteraction jadvalidan user×post sparse matritsa (log-scaled confidence)."""
+    from scipy import sparse
+    from posts.models import UserInteraction
+
+    users, posts, weights = [], [], []
+    rows = UserInteraction.objects.values_list('user_id', 'post_id', 'action').iterator(chunk_size=chunk_size)
+    for user_id, post_id, action in rows:
+        users.append(user_id)
+        posts.append(post_id)
+        weights.append(ACTION_WEIGHTS.get(action, 0.0))
+
+    user_ids, user_rows = np.unique(np.array(users, dtype=np.int64), return_inverse=True)
+    post_ids, post_cols = np.unique(np.array(posts, dtype=np.int64), return_inverse=True)
+    # Takroriy (user, post) juftliklari coo -> csr da qo'shiladi
+    matrix = sparse.coo_matrix(
+        (np.array(weights, dtype=np.float32), (user_rows, post_cols)),
+        shape=(len(user_ids), len(post_ids)),
+    ).tocsr()
+    matrix.data = np.log1p(matrix.data)
+    return user_ids, post_ids, matrix
+
+
+def train(factors=64, iterations=7, seed=0):
+    """Truncated SVD bilan faktorlarni o'qitib, yangi versiya sifatida saqlaydi."""
+    from sklearn.decomposition import TruncatedSVD
+
+    user_ids, post_ids, matrix = interaction_matrix()
+    n_components = min(factors, min(matrix.shape) - 1)
+    if n_components < 1:
+        return None
+
+    svd = TruncatedSVD(n_components=n_components, n_iter=iterations, random_state=seed)
+    user_factors = svd.fit_transform(matrix).astype(np.float32)
+    item_factors = svd.components_.T.astype(np.float32)
+
+    root = cf_dir()
+    version_dir = new_version_dir(root)
+    np.save(version_dir / 'user_ids.npy', user_ids)
+    np.save(version_dir / 'post_ids.npy', post_ids)
+    np.save(version_dir / 'user_factors.npy', np.ascontiguousarray(user_factors))
+    np.save(version_dir / 'item_factors.npy', np.ascontiguousarray(item_factors))
+    (version_dir / 'meta.json').write_text(json.dumps({
+        'users': len(user_ids),
+        'posts': len(post_ids),
+        'factors': n_components,
+        'explained_variance': float(svd.explained_variance_ratio_.sum()),
+    }))
+    publish_version(root, version_dir)
+    return {'users': len(user_ids), 'posts': len(post_ids), 'factors': n_components}
+
+
+def blend(first, second, weight):
+    """
+    Ikki (post_ids, scores) natijasini [0, 1] ga normallab, vaznli yig'indisini qaytaradi:
+    (1 - weight) * first + weight * second.
+    """
+    parts = [(ids, scores, w) for (ids, scores), w in ((first, 1 - weight), (second, weight)) if len(ids)]
+    if not parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    all_ids = np.concatenate([np.asarray(ids) for ids, _, _ in parts])
+    post_ids, positions = np.unique(all_ids, return_inverse=True)
+    blended = np.zeros(len(post_ids), dtype=np.float32)
+    offset = 0
+    for ids, scores, w in parts:
+        scores = np.asarray(scores, dtype=np.float32)
+        top = scores.max()
+        if top > 0:
+            np.add.at(blended, positions[offset:offset + len(ids)], w * scores / top)
+        offset += len(ids)
+    return post_ids, blended
@@ -0,0 +1,344 @@
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .text import post_document
+
+logger = logging.getLogger(__name__)
+
+
+ARRAY_NAMES = ('data', 'indices', 'indptr', 'post_ids')
+
+
+def index_dir():
+    return Path(settings.RECOMMENDER_INDEX_DIR)
+
+
+@contextmanager
+def index_lock():
+    # Bir nechta gunicorn worker delta faylni bir vaqtda yozmasligi uchun
+    path = index_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / '.lock', 'w') as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def current_version_dir(root):
+    try:
+        name = (root / 'CURRENT').read_text().strip()
+    except FileNotFoundError:
+        return None
+    return root / name if name else None
+
+
+def new_version_dir(root):
+    version_dir = root / f'v{time.time_ns()}'
+    version_dir.mkdir(parents=True)
+    return version_dir
+
+
+def _version_ns(path):
+    try:
+        return int(path.name[1:]) if path.name.startswith('v') else None
+    except ValueError:
+        return None
+
+
+def publish_version(root, version_dir):
+    """
+    CURRENT faylini atomar almashtiradi. Oldingi versiya qoldiriladi — CURRENT'ni hozirgina o'qib,
+    fayllarini yuklayotgan worker'lar FileNotFoundError olmasin; undan eskilari o'chiriladi.
+    Yangiroq (hali e'lon qilinmagan, qurilayotgan) papkalarga tegilmaydi.
+    """
+    previous = current_version_dir(root)
+    tmp_current = root / 'CURRENT.tmp'
+    tmp_current.write_text(version_dir.name)
+    os.replace(tmp_current, root / 'CURRENT')
+    if previous is None or previous == version_dir:
+        return
+    oldest_kept = _version_ns(previous)
+    for path in root.iterdir():
+        ns = _version_ns(path)
+        # Ochiq mmap'lar Linuxda o'chirilgandan keyin ham ishlashda davom etadi
+        if path.is_dir() and ns is not None and oldest_kept is not None and ns < oldest_kept:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _empty_delta(n_features):
+    from scipy import sparse
+    return sparse.csr_matrix((0, n_features), dtype=np.float32), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+
+class PostIndex:
+    """
+    Saqlangan TF-IDF indeks: asosiy (memory-mapped) matritsa + kichik delta segment.
+    Delta dagi va tombstone qilingan postlar asosiy matritsadan e'tiborsiz qoldiriladi.
+    """
+
+    def __init__(self, version_dir):
+        import joblib
+        from scipy import sparse
+
+        self.version_dir = version_dir
+        self.vectorizer = joblib.load(version_dir / 'vectorizer.joblib')
+        meta = json.loads((version_dir / 'meta.json').read_text())
+        self.n_features = meta['n_features']
+
+        arrays = {name: np.load(version_dir / f'base_{name}.npy', mmap_mode='r') for name in ARRAY_NAMES}
+        self.base = sparse.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']),
+            shape=(len(arrays['post_ids']), self.n_features),
+            copy=False,
+        )
+        self.base_ids = arrays['post_ids']
+        self.delta, self.delta_ids, self.tombstones = self._load_delta()
+        self.delta_mtime = self._delta_mtime()
+
+    @property
+    def delta_path(self):
+        return self.version_dir / 'delta.npz'
+
+    def _delta_mtime(self):
+        try:
+            return self.delta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load_delta(self):
+        from scipy import sparse
+        try:
+            with np.load(self.delta_path) as npz:
+                matrix = sparse.csr_matrix(
+                    (npz['data'], npz['indices'], npz['indptr']),
+                    shape=(len(npz['post_ids']), self.n_features),
+                )
+                return matrix, npz['post_ids'], npz['tombstones']
+        except FileNotFoundError:
+            return _empty_delta(self.n_features)
+
+    @property
+    def delta_rows(self):
+        return len(self.delta_ids) + len(self.tombstones)
+
+    def refresh_delta(self):
+        mtime = self._delta_mtime()
+        if mtime != self.delta_mtime:
+            self.delta, self.delta_ids, self.tombstones = self._load_delta()
+            self.delta_mtime = mtime
+
+    def transform(self, texts):
+        return self.vectorizer.transform(texts).astype(np.float32)
+
+    def query_vector(self, terms):
+        """{term: weight} lug'atidan IDF bilan tortilgan, normallashgan so'rov vektori."""
+        from scipy import sparse
+
+        vocabulary = self.vectorizer.vocabulary_
+        columns, values = [], []
+        for term, weight in terms.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                columns.append(column)
+                values.append(weight * self.vectorizer.idf_[column])
+        values = np.array(values, dtype=np.float32)
+        norm = np.linalg.norm(values)
+        if not norm:
+            return None
+        return sparse.csr_matrix(
+            (values / norm, np.array(columns, dtype=np.int32), np.array([0, len(columns)])),
+            shape=(1, self.n_features),
+        )
+
+    def score(self, query):
+        """
+        So'rov vektori bilan barcha postlarning cosine o'xshashligi.
+        (post_ids, scores) juftligini qaytaradi, tartib — indeks ichidagi tartib.
+        """
+        # Qatorlar L2 normallashtirilgan, shuning uchun dot product = cosine
+        query = query.T.tocsc()
+        base_scores = np.asarray((self.base @ query).todense()).ravel()
+        if len(self.tombstones):
+            alive = ~np.isin(self.base_ids, self.tombstones)
+            base_ids, base_scores = np.asarray(self.base_ids)[alive], base_scores[alive]
+        else:
+            base_ids = np.asarray(self.base_ids)
+        if not len(self.delta_ids):
+            return base_ids, base_scores
+        delta_scores = np.asarray((self.delta @ query).todense()).ravel()
+        return np.concatenate([base_ids, self.delta_ids]), np.concatenate([base_scores, delta_scores])
+
+    def write_delta(self, upserts, deletes):
+        """
+        upserts: [(post_id, content)], deletes: [post_id].
+        Lock ostida chaqirilishi kerak.
+        """
+        from scipy import sparse
+
+        self.delta, self.delta_ids, self.tombstones = self._load_delta()
+        touched = np.array([post_id for post_id, _ in upserts] + list(deletes), dtype=np.int64)
+        keep = ~np.isin(self.delta_ids, touched)
+        matrix, post_ids = self.delta[keep], self.delta_ids[keep]
+
+        docs = [(post_id, post_document(content)) for post_id, content in upserts]
+        docs = [(post_id, text) for post_id, text in docs if text]
+        if docs:
+            rows = self.transform([text for _, text in docs])
+            matrix = sparse.vstack([matrix, rows], format='csr')
+            post_ids = np.concatenate([post_ids, np.array([post_id for post_id, _ in docs], dtype=np.int64)])
+
+        tombstones = np.union1d(self.tombstones, touched[np.isin(touched, self.base_ids)])
+
+        tmp_path = self.version_dir / f'delta.{os.getpid()}.tmp.npz'
+        np.savez(
+            tmp_path,
+            data=matrix.data.astype(np.float32), indices=matrix.indices, indptr=matrix.indptr,
+            post_ids=post_ids, tombstones=tombstones,
+        )
+        os.replace(tmp_path, self.delta_path)
+        self.delta, self.delta_ids, self.tombstones = matrix, post_ids, tombstones
+        self.delta_mtime = self._delta_mtime()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Joriy indeksni qaytaradi (yoki None, agar hali qurilmagan bo'lsa)."""
+    global _index
+    version_dir = current_version_dir(index_dir())
+    if version_dir is None:
+        return None
+    with _index_lock:
+        if _index is None or _index.version_dir != version_dir:
+            _index = PostIndex(version_dir)
+        else:
+            _index.refresh_delta()
+        return _index
+
+
+def update_index(upserts=(), deletes=()):
+    """Post saqlanganda yoki o'chirilganda indeksni inkremental yangilash."""
+    with index_lock():
+        index = get_index()
+        if index is None:
+            return
+        index.write_delta(list(upserts), list(deletes))
+        oversized = index.delta_rows > settings.RECOMMENDER_INDEX_DELTA_MAX_ROWS
+    if oversized:
+        schedule_rebuild()
+
+
+def schedule_rebuild():
+    """
+    Delta chegaradan oshdi — indeks fon oqimida qayta quriladi (delta asosiy matritsaga siqiladi).
+    Bir vaqtda faqat bitta jarayon quradi (bloklanmaydigan flock), qolganlari o'tkazib yuboradi.
+    """
+    def run():
+        from django.db import connection
+
+        path = index_dir()
+        path.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(path / '.rebuild', 'w') as fh:
+                try:
+                    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+                build_index()
+        except Exception:
+            logger.exception("Tavsiya indeksini qayta qurib bo'lmadi")
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name='recommender-rebuild', daemon=True).start()
+
+
+def read_posts(chunk_size=5000):
+    """Indeks uchun postlar snapshot'i: (post_ids, matnlar) — bo'sh matnlilar tashlab ketiladi."""
+    from posts.models import Post
+
+    post_ids, texts = [], []
+    rows = Post.objects.order_by('id').values_list('id', 'content').iterator(chunk_size=chunk_size)
+    for post_id, content in rows:
+        text = post_document(content)
+        if text:
+            post_ids.append(post_id)
+            texts.append(text)
+    return post_ids, texts
+
+
+def build_index(chunk_size=5000):
+    """Indeksni noldan qurish (rebuild_recommendation_index buyrug'i va delta siqish uchun)."""
+    return publish_index(*read_posts(chunk_size))
+
+
+def publish_index(post_ids, texts):
+    """
+    Snapshot'dan yangi versiya: vectorizer lock'siz o'qitiladi (uzoq), yozish va e'lon qilish —
+    lock ostida. Snapshot'dan keyin eski versiya delta'siga yozilgan o'zgarishlar yo'qolmasligi
+    uchun e'londan oldin ko'chiriladi (replay_changes).
+    """
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(dtype=np.float32)
+    if texts:
+        matrix = vectorizer.fit_transform(texts).tocsr()
+    else:
+        vectorizer.fit(['empty'])
+        matrix = vectorizer.transform([])
+
+    with index_lock():
+        previous = get_index()
+        version_dir = new_version_dir(index_dir())
+        joblib.dump(vectorizer, version_dir / 'vectorizer.joblib')
+        np.save(version_dir / 'base_data.npy', matrix.data.astype(np.float32))
+        np.save(version_dir / 'base_indices.npy', matrix.indices.astype(np.int32))
+        np.save(version_dir / 'base_indptr.npy', matrix.indptr.astype(np.int64))
+        np.save(version_dir / 'base_post_ids.npy', np.array(post_ids, dtype=np.int64))
+        (version_dir / 'meta.json').write_text(json.dumps({
+            'n_features': len(vectorizer.vocabulary_),
+            'n_posts': len(post_ids),
+        }))
+        if previous is not None:
+            replay_changes(previous, PostIndex(version_dir), dict(zip(post_ids, texts)))
+        publish_version(index_dir(), version_dir)
+    return len(post_ids)
+
+
+def replay_changes(previous, index, snapshot):
+    """
+    Eski versiya delta'si tekkan postlar (upsert va tombstone'lar) bazadan qayta o'qiladi;
+    matni snapshot'dagidan farq qilganlari yangi versiya delta'siga yoziladi. Lock ostida.
+    """
+    from posts.models import Post
+
+    touched = {int(post_id) for post_id in np.union1d(previous.delta_ids, previous.tombstones)}
+    if not touched:
+        return
+    current = dict(Post.objects.filter(id__in=touched).values_list('id', 'content'))
+    upserts, deletes = [], []
+    for post_id in touched:
+        text = post_document(current[post_id]) if post_id in current else ''
+        if (text or None) == snapshot.get(post_id):
+            continue
+        if text:
+            upserts.append((post_id, current[post_id]))
+        else:
+            deletes.append(post_id)
+    if upserts or deletes:
+        index.write_delta(upserts, deletes)
@@ -0,0 +1,134 @@
+from collections import Counter
+import math
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .text import post_document
+
+
+ACTION_WEIGHTS = {
+    'like': 1.0,
+    'comment': 0.6,
+    'view': 0.1,
+}
+
+# Interes vektori yo'q foydalanuvchi uchun tarixdan nechta oxirgi interaction olinadi
+BACKFILL_LIMIT = 200
+
+# TfidfVectorizer'ning standart analyzer'i (lowercase + token_pattern) — indeks termlari bilan bir xil,
+# lekin sklearn like/comment yo'lida yuklanmaydi
+TOKEN_RE = re.compile(r'(?u)\b\w\w+\b')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def term_weights(content):
+    """Post matnidan L2 normallashgan term chastotalari."""
+    counts = Counter(tokenize(post_document(content)))
+    norm = math.sqrt(sum(c * c for c in counts.values()))
+    if not norm:
+        return {}
+    return {term: c / norm for term, c in counts.items()}
+
+
+def decay(terms, elapsed):
+    half_life = settings.RECOMMENDER_INTEREST_HALF_LIFE.total_seconds()
+    factor = 0.5 ** (max(elapsed.total_seconds(), 0) / half_life)
+    return {term: weight * factor for term, weight in terms.items()}
+
+
+def _prune(terms):
+    limit = settings.RECOMMENDER_INTEREST_MAX_TERMS
+    if len(terms) <= limit:
+        return terms
+    return dict(sorted(terms.items(), key=lambda item: item[1], reverse=True)[:limit])
+
+
+def _merge(terms, content, weight):
+    for term, value in term_weights(content).items():
+        terms[term] = terms.get(term, 0.0) + weight * value
+    return terms
+
+
+def record_interaction(user, post, action):
+    """
+    Yangi interaction bo'yicha foydalanuvchi vektorini inkremental yangilash — commit'dan keyin,
+    like/comment tranzaksiyasi UserInterest qatorini qulflab turmasin. Joriy backend qiziqish
+    vektorlaridan foydalanmasa (recent, cf) umuman yangilanmaydi.
+    """
+    from .backends import get_recommender
+
+    if not get_recommender(settings.RECOMMENDER_BACKEND).uses_interests:
+        return
+    content = post.content
+    transaction.on_commit(lambda: update_interest(user, content, action), robust=True)
+
+
+def update_interest(user, content, action):
+    from posts.models import UserInterest
+
+    now = timezone.now()
+    with transaction.atomic():
+        interest = UserInterest.objects.select_for_update().filter(user=user).first()
+        if interest is None:
+            # Birinchi marta — tarixdan (shu interaction ham ichida) quramiz
+            interest = _backfill(user, now)
+            if interest is not None:
+                return interest
+            interest = UserInterest(user=user, terms={}, updated_at=now)
+        terms = decay(interest.terms, now - interest.updated_at)
+        terms = _merge(terms, content, ACTION_WEIGHTS.get(action, 0.0))
+        interest.terms = _prune(terms)
+        interest.updated_at = now
+        interest.save()
+    return interest
+
+
+def _history_terms(user, now):
+    from posts.models import UserInteraction
+
+    history = (
+        UserInteraction.objects.filter(user=user, action__in=ACTION_WEIGHTS)
+        .order_by('-created_at')
+        .values_list('action', 'created_at', 'post__content')[:BACKFILL_LIMIT]
+    )
+    terms = {}
+    for action, created_at, content in history:
+        for term, value in decay(term_weights(content), now - created_at).items():
+            terms[term] = terms.get(term, 0.0) + ACTION_WEIGHTS[action] * value
+    return _prune(terms)
+
+
+def _backfill(user, now):
+    from posts.models import UserInterest
+
+    terms = _history_terms(user, now)
+    if not terms:
+        return None
+    interest, _ = UserInterest.objects.update_or_create(
+        user=user, defaults={'terms': terms, 'updated_at': now},
+    )
+    return interest
+
+
+def get_interest_terms(user, persist=True):
+    """
+    Foydalanuvchining joriy vaqtga yemirilgan qiziqish vektori ({term: weight}).
+    persist=False — vektor yo'q bo'lsa tarixdan hisoblanadi, lekin bazaga yozilmaydi.
+    """
+    from posts.models import UserInterest
+
+    now = timezone.now()
+    interest = UserInterest.objects.filter(user=user).first()
+    if interest is None:
+        if not persist:
+            return _history_terms(user, now)
+        interest = _backfill(user, now)
+        if interest is None:
+            return {}
+    return decay(interest.terms, now - interest.updated_at)
@@ -0,0 +1,91 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .ranking import seen_post_ids
+from .backends import get_recommender
+
+
+def get_precomputed_post_ids(user, k):
+    """
+    Saqlangan tavsiyalar (yangi bo'lsa), hisoblangandan keyin ko'rilgan postlarsiz.
+    Eskirgan yoki mavjud bo'lmasa None.
+    """
+    from posts.models import RecommendationList
+
+    entry = RecommendationList.objects.filter(user=user).values_list('post_ids', 'computed_at').first()
+    if entry is None:
+        return None
+    post_ids, computed_at = entry
+    if computed_at < timezone.now() - settings.RECOMMENDER_PRECOMPUTED_TTL:
+        return None
+    seen = set(seen_post_ids(user, since=computed_at).tolist())
+    post_ids = [post_id for post_id in post_ids if post_id not in seen][:k]
+    return post_ids or None
+
+
+def users_to_refresh(active_since, incremental=False):
+    """Oxirgi davrda faol bo'lgan (incremental: yangi interaction qilgan) user id'lar."""
+    from posts.models import UserInteraction
+
+    interactions = UserInteraction.objects.filter(created_at__gte=active_since)
+    if incremental:
+        interactions = interactions.filter(
+            Q(user__recommendation_list__isnull=True)
+            | Q(created_at__gt=F('user__recommendation_list__computed_at'))
+        )
+    return list(interactions.order_by('user_id').values_list('user_id', flat=True).distinct())
+
+
+def compute_batch(user_ids, k):
+    from accounts.models import User
+
+    # Workerlar faqat o'qiydi, yozish asosiy jarayonda
+    users = User.objects.in_bulk(user_ids)
+    recommender = get_recommender()
+    return [(user_id, recommender.recommend(users[user_id], k, persist=False)) for user_id in user_ids if user_id in users]
+
+
+def store(results, computed_at):
+    from posts.models import RecommendationList
+
+    RecommendationList.objects.bulk_create(
+        [RecommendationList(user_id=user_id, post_ids=post_ids, computed_at=computed_at) for user_id, post_ids in results],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['post_ids', 'computed_at'],
+    )
+
+
+def precompute(user_ids, k, workers=1, batch_size=200, on_batch=None):
+    """
+    Userlarni batch'larga bo'lib, ProcessPoolExecutor da hisoblaydi; natijalar
+    asosiy jarayonda saqlanadi (SQLite'ga parallel yozmaslik uchun).
+    """
+    batches = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+    done = 0
+    if workers <= 1:
+        for batch in batches:
+            results = compute_batch(batch, k)
+            store(results, timezone.now())
+            done += len(results)
+            if on_batch:
+                on_batch(done)
+        return done
+
+    # Fork qilishdan oldin ulanishlarni yopamiz — har bir worker o'z ulanishini ochadi
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(compute_batch, batch, k) for batch in batches]
+        for future in as_completed(futures):
+            results = future.result()
+            store(results, timezone.now())
+            done += len(results)
+            if on_batch:
+                on_batch(done)
+    return done
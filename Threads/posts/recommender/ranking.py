@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def top_k(post_ids, scores, k, exclude=None):
+    """
+    Eng yuqori k ta ball bo'yicha post id'lar (kamayish tartibida).
+    argpartition O(n), faqat tanlangan nomzodlar tartiblanadi.
+    Teng ballarda kichik id oldin keladi, natija barqaror bo'lishi uchun.
+    """
+    post_ids = np.asarray(post_ids)
+    scores = np.asarray(scores, dtype=np.float32)
+    exclude = np.asarray(exclude if exclude is not None else [], dtype=post_ids.dtype)
+
+    # Chiqarib tashlanadiganlar k+len(exclude) nomzod ichida tekshiriladi, butun massivda emas
+    n_candidates = min(k + len(exclude), len(scores))
+    if k <= 0 or n_candidates <= 0:
+        return np.empty(0, dtype=post_ids.dtype)
+    candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+    candidates = candidates[scores[candidates] > 0]
+    if len(exclude):
+        candidates = candidates[~np.isin(post_ids[candidates], exclude)]
+    order = np.lexsort((post_ids[candidates], -scores[candidates]))[:k]
+    return post_ids[candidates[order]]
+
+
+def seen_post_ids(user, since=None):
+    """
+    Foydalanuvchining o'z postlari va ko'rgan/like bosgan postlari (bitta so'rov).
+    since berilsa — faqat shu vaqtdan keyingilari.
+    """
+    from posts.models import Post, View, Like
+
+    own = Post.objects.filter(author=user)
+    viewed = View.objects.filter(user=user)
+    liked = Like.objects.filter(user=user)
+    if since is not None:
+        own = own.filter(created_at__gte=since)
+        viewed = viewed.filter(viewed_at__gte=since)
+        liked = liked.filter(created_at__gte=since)
+    return np.fromiter(
+        own.values_list('id', flat=True).union(
+            viewed.values_list('post_id', flat=True),
+            liked.values_list('post_id', flat=True),
+        ),
+        dtype=np.int64,
+    )
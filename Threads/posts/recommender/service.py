@@ -0,0 +1,35 @@
+from django.conf import settings
+
+from .cf import get_cf_model, blend
+from .index import get_index
+from .interests import get_interest_terms
+
+
+def content_scores(user, persist=True):
+    """
+    TF-IDF indeksi bo'yicha (post_ids, scores), yoki None.
+    persist=False — bazaga hech narsa yozilmaydi (batch workerlar uchun).
+    """
+    index = get_index()
+    if index is None:
+        return None
+    # Foydalanuvchining saqlangan qiziqish vektori (like/comment'larda yangilanadi)
+    user_tfidf = index.query_vector(get_interest_terms(user, persist=persist))
+    if user_tfidf is None:
+        return None
+    return index.score(user_tfidf)
+
+
+def cf_scores(user):
+    """Collaborative filtering faktorlari bo'yicha (post_ids, scores), yoki None."""
+    cf_model = get_cf_model()
+    return cf_model.score(user.id) if cf_model is not None else None
+
+
+def hybrid_scores(user, persist=True):
+    """Kontent va collaborative filtering ballarini birlashtiradi."""
+    content = content_scores(user, persist=persist)
+    collaborative = cf_scores(user)
+    if content is None or collaborative is None:
+        return content or collaborative
+    return blend(content, collaborative, settings.RECOMMENDER_CF_WEIGHT)
@@ -0,0 +1,11 @@
+import re
+
+
+HASHTAG_RE = re.compile(r'#\w+')
+
+
+def post_document(content):
+    # Post matni + hashtaglari (RecommendedPostsView dagi eski formatga mos)
+    content = content or ''
+    tags = ' '.join(tag.lstrip('#') for tag in HASHTAG_RE.findall(content))
+    return f"{content} {tags}".strip()
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Post, PostMedia, Comment, Like, View
 from accounts.serializers import UserSerializer
+from . import counters
 
 
 class PostMediaSerializer(serializers.ModelSerializer):
@@ -21,10 +22,10 @@ class PostSerializer(serializers.ModelSerializer):
     images = serializers.SerializerMethodField()
     videos = serializers.SerializerMethodField()
     author = UserSerializer(read_only=True)
-    comments_count = serializers.IntegerField(source='comments.count', read_only=True)
-    likes_count = serializers.IntegerField(source='likes.count', read_only=True)
-    views_count = serializers.IntegerField(source='views.count', read_only=True)
     tags = serializers.SerializerMethodField()
+    # Sharded postlarda shard'lar ham qo'shiladi
+    likes_count = serializers.SerializerMethodField()
+    views_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
@@ -48,6 +49,12 @@ class PostSerializer(serializers.ModelSerializer):
         images = [media for media in obj.post_media.all() if media.is_image()]
         return PostMediaSerializer(images, many=True, context=self.context).data
     
+    def get_likes_count(self, obj):
+        return counters.get_count(obj, 'likes_count')
+
+    def get_views_count(self, obj):
+        return counters.get_count(obj, 'views_count')
+
     def get_tags(self, obj):
         return [tag.name for tag in obj.tags.all()]
     
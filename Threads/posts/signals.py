@@ -0,0 +1,73 @@
+import logging
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import User, UserFollow
+from accounts.summary import invalidate_profile_summary
+from core.cache import invalidate, post_scope, user_scope
+from .ingest import forget_post
+from .models import Comment, Like, Post
+
+logger = logging.getLogger(__name__)
+
+
+def _update_index(**changes):
+    from .recommender.index import update_index
+    try:
+        update_index(**changes)
+    except Exception:
+        # Indeks xatosi post saqlanishiga to'sqinlik qilmasin
+        logger.exception("Tavsiya indeksini yangilab bo'lmadi")
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, created, **kwargs):
+    if not instance._content_changed:
+        # Matn o'zgarmagan — indeks ham, javoblar ham o'zgarmagan; muallif uchun so'rov ham kerak emas
+        return
+    upserts = [(instance.pk, instance.content)]
+    transaction.on_commit(lambda: _update_index(upserts=upserts))
+    username = instance.author.username
+    invalidate(post_scope(instance.uid), user_scope(username, 'posts'))
+    if created:
+        # Profil sarlavhasidagi posts_count
+        invalidate_profile_summary(username)
+        invalidate(user_scope(username, 'profile'))
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    deletes = [instance.pk]
+    transaction.on_commit(lambda: _update_index(deletes=deletes))
+    transaction.on_commit(lambda: forget_post(instance.uid))
+    # O'chirish tranzaksiyasi ichida (queryset.delete() va cascade'da ham signal keladi)
+    User.objects.filter(pk=instance.author_id).update(posts_count=F('posts_count') - 1)
+    username = instance.author.username
+    invalidate_profile_summary(username)
+    invalidate(post_scope(instance.uid), user_scope(username, 'posts'), user_scope(username, 'profile'))
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_counts(sender, instance, **kwargs):
+    # likes_count/comments_count post sahifasida va muallif postlari ro'yxatida ko'rinadi
+    row = Post.objects.filter(pk=instance.post_id).values_list('uid', 'author__username').first()
+    if row:
+        uid, username = row
+        invalidate(post_scope(uid), user_scope(username, 'posts'))
+
+
+@receiver(post_save, sender=UserFollow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    from .feed import backfill
+    if created:
+        backfill(instance.follower, instance.following)
+
+
+@receiver(post_delete, sender=UserFollow)
+def clear_timeline(sender, instance, **kwargs):
+    from .feed import remove
+    remove(instance.follower, instance.following)
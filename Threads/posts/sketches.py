@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .hyperloglog import HyperLogLog
+from .models import Post, PostViewSketch
+
+
+def viewer_key(user_id, session_id):
+    return f'u{user_id}' if user_id is not None else f's{session_id}'
+
+
+def _load(post_ids, days):
+    sketches = {}
+    rows = PostViewSketch.objects.select_for_update().filter(post_id__in=post_ids, day__in=days)
+    totals = PostViewSketch.objects.select_for_update().filter(post_id__in=post_ids, day__isnull=True)
+    for row in list(rows) + list(totals):
+        sketches[(row.post_id, row.day)] = row
+    return sketches
+
+
+def record_views(rows):
+    """
+    rows: {(post_id, user_id, session_id)}. Kunlik va umumiy sketch'larni yangilab,
+    Post.views_count ni umumiy sketch bahosiga tenglaydi.
+    """
+    precision = settings.VIEW_SKETCH_PRECISION
+    today = timezone.localdate()
+    keys_by_post = {}
+    for post_id, user_id, session_id in rows:
+        keys_by_post.setdefault(post_id, []).append(viewer_key(user_id, session_id))
+
+    with transaction.atomic():
+        existing = _load(keys_by_post, [today])
+        created, updated, estimates = [], [], {}
+        for post_id, keys in keys_by_post.items():
+            for day in (today, None):
+                row = existing.get((post_id, day))
+                sketch = HyperLogLog.from_bytes(row.registers) if row else HyperLogLog(precision)
+                sketch.update(keys)
+                if row is None:
+                    created.append(PostViewSketch(post_id=post_id, day=day, registers=sketch.to_bytes()))
+                else:
+                    row.registers = sketch.to_bytes()
+                    updated.append(row)
+                if day is None:
+                    estimates[post_id] = len(sketch)
+        PostViewSketch.objects.bulk_create(created)
+        PostViewSketch.objects.bulk_update(updated, ['registers'])
+        for post_id, estimate in estimates.items():
+            Post.objects.filter(pk=post_id).update(views_count=estimate)
+
+
+def unique_viewers(post, days=None):
+    """Taxminiy unikal ko'ruvchilar: butun davr uchun yoki oxirgi `days` kun (kunlik sketch'lar birlashtiriladi)."""
+    if days is None:
+        row = PostViewSketch.objects.filter(post=post, day__isnull=True).first()
+        return len(HyperLogLog.from_bytes(row.registers)) if row else 0
+    since = timezone.localdate() - timedelta(days=days - 1)
+    merged = None
+    for registers in PostViewSketch.objects.filter(post=post, day__gte=since).values_list('registers', flat=True):
+        sketch = HyperLogLog.from_bytes(registers)
+        merged = sketch if merged is None else merged.merge(sketch)
+    return len(merged) if merged is not None else 0
@@ -0,0 +1,136 @@
+import heapq
+from collections import deque
+
+from core.pagination import decode_cursor, encode_cursor, keyset_filter
+from .models import Hashtag, Post, PostTag
+
+
+# Posting list indeksdan shu o'lchamdagi bo'laklar bilan o'qiladi
+POSTING_CHUNK_SIZE = 256
+# seek'dan keyin faqat target atrofi kerak — kichik bo'lak (siyrak teg bilan kesishmada muhim)
+SEEK_CHUNK_SIZE = 16
+
+
+class PostingList:
+    """
+    Bitta hashtagning (created_at, post_id) yozuvlari, yangidan eskiga.
+    (hashtag, -created_at, -post) indeksidan bo'laklab o'qiladi; seek() kerakli joyga
+    to'g'ridan-to'g'ri range so'rov bilan sakraydi, oradagi yozuvlar o'qilmaydi.
+    """
+
+    def __init__(self, hashtag_id, position=None, chunk_size=POSTING_CHUNK_SIZE):
+        self.hashtag_id = hashtag_id
+        self.chunk_size = chunk_size
+        self._buffer = deque()
+        self._exhausted = False
+        self._last = self._position = position
+        self._fill(position, inclusive=False)
+
+    def _fill(self, position, inclusive, size=None):
+        size = size or self.chunk_size
+        queryset = keyset_filter(
+            PostTag.objects.filter(hashtag_id=self.hashtag_id),
+            'created_at', position, pk_field='post_id', inclusive=inclusive,
+        )
+        rows = list(queryset.order_by('-created_at', '-post_id').values_list('created_at', 'post_id')[:size])
+        self._buffer.extend(rows)
+        self._exhausted = len(rows) < size
+
+    @property
+    def complete(self):
+        """Qolgan barcha yozuvlar buferda (hech narsa o'qilmagan)."""
+        return self._exhausted and self._last == self._position
+
+    def head(self):
+        if not self._buffer and not self._exhausted:
+            self._fill(self._last, inclusive=False)
+        return self._buffer[0] if self._buffer else None
+
+    def pop(self):
+        entry = self._buffer.popleft()
+        self._last = entry
+        return entry
+
+    def seek(self, target):
+        """target'dan yangi yozuvlarni tashlab yuboradi (target o'zi qoladi)."""
+        while self._buffer and self._buffer[0] > target:
+            self._last = self._buffer.popleft()
+        if not self._buffer and not self._exhausted:
+            self._fill(target, inclusive=True, size=min(SEEK_CHUNK_SIZE, self.chunk_size))
+
+    def __iter__(self):
+        while (entry := self.head()) is not None:
+            yield self.pop()
+
+
+def intersect(lists, limit):
+    """AND: barcha ro'yxatlarda bor yozuvlar (leapfrog — eng eski boshga qolganlari sakraydi)."""
+    small = [posting for posting in lists if posting.complete]
+    if small:
+        return _probe(small, [posting for posting in lists if not posting.complete], limit)
+    results = []
+    while len(results) < limit:
+        heads = [posting.head() for posting in lists]
+        if None in heads:
+            break
+        target = min(heads)
+        if all(head == target for head in heads):
+            results.append(target)
+            for posting in lists:
+                posting.pop()
+            continue
+        for posting, head in zip(lists, heads):
+            if head > target:
+                posting.seek(target)
+    return results
+
+
+def _probe(small, large, limit):
+    # Siyrak teg to'liq xotirada — katta ro'yxatlar bo'ylab sakramasdan, (post, hashtag)
+    # unique indeksi orqali bitta IN so'rov bilan tekshiriladi
+    candidates = set(small[0]._buffer).intersection(*(posting._buffer for posting in small[1:]))
+    for posting in large:
+        if not candidates:
+            break
+        found = set(
+            PostTag.objects.filter(hashtag_id=posting.hashtag_id, post_id__in=[post_id for _, post_id in candidates])
+            .values_list('post_id', flat=True)
+        )
+        candidates = {entry for entry in candidates if entry[1] in found}
+    return sorted(candidates, reverse=True)[:limit]
+
+
+def union(lists, limit):
+    """OR: tartiblangan ro'yxatlarni birlashtirish, bir nechta tegli post bir marta."""
+    results = []
+    for entry in heapq.merge(*lists, reverse=True):
+        if results and results[-1] == entry:
+            continue
+        results.append(entry)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def tag_page(names, match='all', cursor=None, limit=20):
+    """
+    Hashtag(lar) bo'yicha postlar sahifasi, yangidan eskiga. match='all' — AND, 'any' — OR.
+    (posts, next_cursor) qaytaradi.
+    """
+    position = decode_cursor(cursor)
+    tag_ids = list(Hashtag.objects.filter(name__in=names).values_list('id', flat=True))
+    if not tag_ids or (match == 'all' and len(tag_ids) < len(set(names))):
+        return [], None
+
+    if len(tag_ids) == 1:
+        # Bitta teg — indeksdan bitta range so'rov
+        lists = [PostingList(tag_ids[0], position, chunk_size=limit)]
+    else:
+        lists = [PostingList(tag_id, position) for tag_id in tag_ids]
+    combine = intersect if match == 'all' else union
+    rows = combine(lists, limit)
+
+    posts_by_id = Post.objects.with_related().in_bulk([post_id for _, post_id in rows])
+    posts = [posts_by_id[post_id] for _, post_id in rows if post_id in posts_by_id]
+    next_cursor = encode_cursor(*rows[-1]) if len(rows) == limit else None
+    return posts, next_cursor
@@ -1,3 +1,901 @@
-from django.test import TestCase
+import base64
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import msgpack
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import User, UserFollow
+from core.pagination import KeysetPagination, encode_cursor, keyset_filter
+from . import counters, realtime
+from .consumers import LikeCommentConsumer, post_group
+from .feed import FOLLOW_BACKFILL_LIMIT, fan_out, feed_page
+from .hyperloglog import HyperLogLog
+from .ingest import write_views
+from .management.commands.backfill_post_tags import LEGACY_TABLE
+from .models import Comment, Hashtag, Like, Post, PostMedia, PostTag, TimelineEntry, UserInterest, View
+from .recommender import index as recommender_index
+from .recommender.interests import record_interaction, tokenize
+from .serializers import PostSerializer
+from .trending import TrendingEngine
+
+
+# Post.save atomic bloki test tranzaksiyasi ichida SAVEPOINT/RELEASE beradi — ular sanalmaydi
+TRANSACTION_PREFIXES = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+
+class QueryCountMixin:
+    def assertDataQueries(self, expected, func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            func(*args, **kwargs)
+        queries = [query['sql'] for query in ctx.captured_queries if not query['sql'].startswith(TRANSACTION_PREFIXES)]
+        self.assertEqual(len(queries), expected, '\n'.join(queries))
+
+
+class HashtagSyncQueryTests(QueryCountMixin, TestCase):
+    """Post.save dagi hashtag sinxronizatsiyasi: so'rovlar soni hashtaglar soniga bog'liq emas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', '+998900000000', password='x' * 12)
+
+    @staticmethod
+    def content(count, prefix='tag'):
+        return 'salom ' + ' '.join(f'#{prefix}{i}' for i in range(count))
+
+    @staticmethod
+    def edited(count):
+        # Yarmi o'z joyida qoladi, yarmi yangi hashtaglar bilan almashtiriladi
+        return 'tahrir ' + ' '.join(
+            [f'#tag{i}' for i in range(count // 2)] + [f'#new{i}' for i in range(count - count // 2)]
+        )
+
+    def tag_names(self, post):
+        return set(post.tags.values_list('name', flat=True))
+
+    def test_create(self):
+        # INSERT post, UPDATE muallif posts_count; hashtag bo'lsa + bulk INSERT hashtag, SELECT id'lar, bulk INSERT bog'lanishlar
+        for count, expected in ((0, 2), (5, 5), (50, 5)):
+            with self.subTest(hashtags=count):
+                post = Post(author=self.author, content=self.content(count, prefix=f'c{count}_'))
+                self.assertDataQueries(expected, post.save)
+                self.assertEqual(self.tag_names(post), {f'c{count}_{i}' for i in range(count)})
+
+    def test_resave_unchanged_content(self):
+        # Faqat UPDATE — hashtaglar ham, muallif ham so'ralmaydi
+        for count in (0, 5, 50):
+            with self.subTest(hashtags=count):
+                post = Post.objects.create(author=self.author, content=self.content(count))
+                post = Post.objects.get(pk=post.pk)
+                self.assertDataQueries(1, post.save)
+
+    def test_resave_unchanged_content_skips_index(self):
+        # Indeks upsert'i (flock + delta.npz yozish) faqat matn o'zgarganda
+        post = Post.objects.get(pk=Post.objects.create(author=self.author, content=self.content(5)).pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            post.save()
+        self.assertEqual(callbacks, [])
+        post.content = self.edited(5)
+        with self.captureOnCommitCallbacks() as callbacks:
+            post.save()
+        self.assertTrue(callbacks)
+
+    def test_edit(self):
+        # UPDATE + joriy teglar; o'zgarganda DELETE eski, bulk INSERT, SELECT id'lar, bulk INSERT bog'lanishlar
+        for count, expected in ((0, 2), (5, 6), (50, 6)):
+            with self.subTest(hashtags=count):
+                post = Post.objects.create(author=self.author, content=self.content(count))
+                # PostUpdateDeleteView kabi muallif bilan birga yuklanadi
+                post = Post.objects.select_related('author').get(pk=post.pk)
+                post.content = self.edited(count)
+                self.assertDataQueries(expected, post.save)
+                expected_names = {tag.lstrip('#') for tag in post.content.split() if tag.startswith('#')}
+                self.assertEqual(self.tag_names(post), expected_names)
+
+
+class ShardedCounterTests(TestCase):
+    def setUp(self):
+        # Shard yig'indisi keshi (locmem) testlar orasida saqlanib qoladi, pk'lar esa takrorlanadi
+        cache.clear()
+
+    def test_from_db_bypasses_read_cache(self):
+        author = User.objects.create_user('author', 'author@example.com', '+998900000000', password='x' * 12)
+        post = Post.objects.create(author=author, content='salom')
+        counters.promote(post, shards=4)
+        self.assertEqual(counters.get_count(post, 'likes_count'), 0)  # yig'indi keshlanadi
+
+        counters.adjust(post, 'likes_count', 1)
+        self.assertEqual(counters.get_count(post, 'likes_count', from_db=True), 1)
+        # from_db o'qishi keshni ham yangilaydi
+        self.assertEqual(counters.get_count(post, 'likes_count'), 1)
+
+
+class ViewIngestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('viewer', 'viewer@example.com', '+998900000001', password='x' * 12)
+        cls.post = Post.objects.create(author=cls.user, content='salom')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unknown_post_returns_404(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(reverse('post-view', kwargs={'uid': 'nosuchpost1'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_authenticated_view_counted_once_per_post(self):
+        # Har xil flush'larda ham (post, user) bir marta — session_id'siz qatorlar
+        self.assertEqual(write_views([(self.post.uid, self.user.id, None)]), 1)
+        self.assertEqual(write_views([(self.post.uid, self.user.id, None)]), 0)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 1)
+        self.assertEqual(View.objects.filter(post=self.post).count(), 1)
+
+    def test_anonymous_views_deduplicated_by_session(self):
+        events = [(self.post.uid, None, 's1'), (self.post.uid, None, 's2')]
+        self.assertEqual(write_views(events), 2)
+        self.assertEqual(write_views(events), 0)
+
+    def test_user_constraint_without_session(self):
+        View.objects.create(post=self.post, user=self.user)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            View.objects.create(post=self.post, user=self.user)
+
+
+class PostQueryCountTests(TestCase):
+    """
+    Post qaytaruvchi endpointlar: so'rovlar soni sahifa o'lchamiga bog'liq emas (N+1 yo'q).
+    Har bir so'rov sovuq keshda o'lchanadi — javob keshi hit'i sonni yashirmasin.
+    """
+    PAGE_SIZES = (1, 10, 50)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            'author', 'author@example.com', '+998900000001', password='x' * 12, fullname='Muallif',
+        )
+        cls.reader = User.objects.create_user('reader', 'reader@example.com', '+998900000002', password='x' * 12)
+        UserFollow.objects.create(follower=cls.reader, following=cls.author)
+        with cls.captureOnCommitCallbacks(execute=True):
+            posts = [
+                Post.objects.create(author=cls.author, content=f'salom qidiruv #bench #tag{i % 3}')
+                for i in range(60)
+            ]
+        for i, post in enumerate(posts):
+            PostMedia.objects.bulk_create([
+                PostMedia(post=post, media=f'uploads/users/author/posts/{i}.jpg'),
+                PostMedia(post=post, media=f'uploads/users/author/posts/{i}.mp4'),
+            ])
+            fan_out(post)
+        # Bir qismi sharded — shard yig'indisi ham so'rov qo'shmasligi kerak
+        for post in posts[::5]:
+            counters.promote(post, shards=4)
+
+    def setUp(self):
+        cache.clear()
+
+    def query_counts(self, url_for_size, user=None, results=lambda data: data['results'], sizes=PAGE_SIZES):
+        counts = []
+        for size in sizes:
+            cache.clear()
+            client = APIClient()
+            if user is not None:
+                client.force_authenticate(user)
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url_for_size(size))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(results(response.json())), size)
+            counts.append(len(ctx))
+        return counts
+
+    def assertConstant(self, counts):
+        self.assertEqual(len(set(counts)), 1, f"sahifa o'lchamlari bo'yicha so'rovlar: {counts}")
+
+    def test_serializer(self):
+        counts = []
+        for size in self.PAGE_SIZES:
+            with CaptureQueriesContext(connection) as ctx:
+                PostSerializer(Post.objects.with_related()[:size], many=True).data
+            counts.append(len(ctx))
+        self.assertConstant(counts)
+
+    def test_feed(self):
+        self.assertConstant(self.query_counts(lambda size: f'/posts/feed?page_size={size}', user=self.reader))
+
+    def test_tags(self):
+        self.assertConstant(self.query_counts(lambda size: f'/posts/tags/bench?page_size={size}'))
+
+    def test_tags_and(self):
+        # tag1 60 ta postdan 20 tasida
+        self.assertConstant(self.query_counts(lambda size: f'/posts/tags/bench,tag1?page_size={size}', sizes=(1, 10, 20)))
+
+    def test_search(self):
+        self.assertConstant(self.query_counts(
+            lambda size: f'/search?q=qidiruv&type=posts&limit={size}', results=lambda data: data['posts'],
+        ))
+
+    def test_profile(self):
+        self.assertConstant(self.query_counts(
+            lambda size: f'/{self.author.username}?page_size={size}', results=lambda data: data['posts']['results'],
+        ))
+
+    def test_recommended_anonymous(self):
+        # Anonim foydalanuvchiga so'nggi RECOMMENDED_POSTS_COUNT ta post; 1 ta post bilan taqqoslanadi
+        with CaptureQueriesContext(connection) as full:
+            response = APIClient().get('/posts/recommended')
+        self.assertEqual(len(response.json()), 20)
+        Post.objects.exclude(pk=Post.objects.latest('created_at', 'pk').pk).delete()
+        cache.clear()
+        with CaptureQueriesContext(connection) as single:
+            response = APIClient().get('/posts/recommended')
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(len(full), len(single))
+
+
+class PostETagTests(TestCase):
+    """ETag bazadagi holatdan: bump qilinmagan o'zgarishlar ham ko'rinadi, worker'lar orasida bir xil."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', '+998900000001', password='x' * 12)
+        cls.reader = User.objects.create_user('reader', 'reader@example.com', '+998900000002', password='x' * 12)
+        cls.post = Post.objects.create(author=cls.author, content='salom #etag')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+        self.url = reverse('post-detail-update-delete', kwargs={'uid': self.post.uid})
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        for header in (etag, f'W/{etag}', '*'):
+            with self.subTest(if_none_match=header):
+                self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=header).status_code, 304)
+
+    def test_same_etag_without_cached_versions(self):
+        # Boshqa worker (o'z locmem keshi) yoki versiyalar chiqarib yuborilgan — ETag o'zgarmaydi
+        etag = self.client.get(self.url)['ETag']
+        cache.clear()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_unbumped_changes_change_etag(self):
+        # update() signal'larsiz — versiyalar oshmaydi, lekin javob o'zgaradi
+        changes = [
+            ('views_count', lambda: Post.objects.filter(pk=self.post.pk).update(views_count=7),
+             lambda data: data['views_count'] == 7),
+            ('likes shard', lambda: (counters.promote(self.post, shards=2), counters.adjust(self.post, 'likes_count', 3)),
+             lambda data: data['likes_count'] == 3),
+            ('author', lambda: User.objects.filter(pk=self.author.pk).update(fullname='Yangi ism'),
+             lambda data: data['author']['fullname'] == 'Yangi ism'),
+        ]
+        for label, change, check in changes:
+            with self.subTest(label):
+                etag = self.client.get(self.url)['ETag']
+                change()
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                self.assertTrue(check(response.json()))
+
+    def test_comments_etag(self):
+        url = reverse('post-comment', kwargs={'uid': self.post.uid})
+        etag = self.client.get(url)['ETag']
+        Comment.objects.bulk_create([Comment(post=self.post, author=self.reader, content='zo\'r')])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(response.json()['results']), 1)
+        etag = response['ETag']
+        User.objects.filter(pk=self.reader.pk).update(username='reader2')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['author'], 'reader2')
+
+    def test_missing_post(self):
+        url = reverse('post-detail-update-delete', kwargs={'uid': 'nosuchpost1'})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='*').status_code, 404)
+
+
+class TrendingSyncTests(TestCase):
+    """Har bir worker'ning dvigateli hodisalarni bazadan o'qiydi — qaysi worker qabul qilganidan qat'i nazar."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', '+998900000001', password='x' * 12)
+        cls.fans = [
+            User.objects.create_user(f'fan{i}', f'fan{i}@example.com', f'+99890000010{i}', password='x' * 12)
+            for i in range(3)
+        ]
+
+    def engine(self):
+        return TrendingEngine(sync_seconds=0)
+
+    def test_engines_converge(self):
+        worker_a, worker_b = self.engine(), self.engine()
+        worker_a.sync()
+        self.assertEqual(worker_a.top(), [])
+
+        # Hodisalar "boshqa worker"da: faqat bazaga yoziladi
+        post = Post.objects.create(author=self.author, content='#django #python')
+        Post.objects.create(author=self.author, content='#python')
+        Like.objects.bulk_create([Like(post=post, user=fan) for fan in self.fans])
+        Comment.objects.create(post=post, author=self.fans[0], content='zo\'r')
+
+        worker_a.refresh()
+        worker_b.refresh()
+        self.assertEqual(worker_a.top(), worker_b.top())
+        # python: 2 post * 3 + 3 like + 1 comment * 2
+        self.assertEqual(worker_a.counts('python')[0], 11)
+        self.assertEqual(worker_a.counts('django')[0], 8)
+        self.assertEqual([name for name, _, _ in worker_a.top()], ['python', 'django'])
+
+    def test_sync_reads_each_event_once(self):
+        engine = self.engine()
+        Post.objects.create(author=self.author, content='#python')
+        engine.sync()
+        engine.sync()
+        self.assertEqual(engine.counts('python')[0], 3)
+
+    def test_refresh_interval(self):
+        engine = TrendingEngine(sync_seconds=3600)
+        engine.refresh()
+        Post.objects.create(author=self.author, content='#python')
+        engine.refresh()
+        self.assertEqual(engine.counts('python')[0], 0)
+        engine.sync()
+        self.assertEqual(engine.counts('python')[0], 3)
+
+
+class RecommenderIndexTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(RECOMMENDER_INDEX_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.root = recommender_index.index_dir()
+        self.author = User.objects.create_user('author', 'author@example.com', '+998900000001', password='x' * 12)
+
+    def post(self, content):
+        return Post.objects.create(author=self.author, content=content)
+
+    def test_changes_during_rebuild_are_replayed(self):
+        edited, deleted = self.post('python django'), self.post('pasta retsepti')
+        recommender_index.build_index()
+        snapshot = recommender_index.read_posts()
+
+        # Qurilish davomida (snapshot'dan keyin) eski versiya delta'siga yozilgan o'zgarishlar
+        Post.objects.filter(pk=edited.pk).update(content='pomidor ekish')
+        recommender_index.update_index(upserts=[(edited.pk, 'pomidor ekish')])
+        Post.objects.filter(pk=deleted.pk).delete()
+        recommender_index.update_index(deletes=[deleted.pk])
+        created = self.post('futbol')
+        recommender_index.update_index(upserts=[(created.pk, 'futbol')])
+
+        recommender_index.publish_index(*snapshot)
+        index = recommender_index.get_index()
+        self.assertEqual(set(index.delta_ids.tolist()), {edited.pk, created.pk})
+        self.assertEqual(set(index.tombstones.tolist()), {edited.pk, deleted.pk})
+
+    def test_unchanged_posts_not_replayed(self):
+        post = self.post('python django')
+        recommender_index.build_index()
+        recommender_index.update_index(upserts=[(post.pk, post.content)])
+        recommender_index.build_index()
+        self.assertEqual(recommender_index.get_index().delta_rows, 0)
+
+    def test_previous_version_kept(self):
+        self.post('python')
+        versions = []
+        for _ in range(3):
+            recommender_index.build_index()
+            versions.append(recommender_index.current_version_dir(self.root))
+        remaining = {path for path in self.root.iterdir() if path.is_dir()}
+        self.assertEqual(remaining, set(versions[1:]))
+
+    def test_oversized_delta_schedules_rebuild(self):
+        posts = [self.post(f'matn {i}') for i in range(3)]
+        recommender_index.build_index()
+        with override_settings(RECOMMENDER_INDEX_DELTA_MAX_ROWS=2), \
+                mock.patch.object(recommender_index, 'schedule_rebuild') as schedule:
+            recommender_index.update_index(upserts=[(posts[0].pk, 'yangi')])
+            schedule.assert_not_called()
+            recommender_index.update_index(upserts=[(posts[1].pk, 'yangi')])
+            schedule.assert_called_once()
+
+
+class InterestUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', 'reader@example.com', '+998900000001', password='x' * 12)
+        cls.post = Post.objects.create(author=cls.user, content='Django va Python #backend')
+
+    def test_tokenizer_matches_index_analyzer(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        analyzer = TfidfVectorizer().build_analyzer()
+        for text in ('Django va Python #backend backend', "O'zbekcha matn: ko'p_so'z, 2024 a b", 'ÉCOLE café—ok'):
+            with self.subTest(text=text):
+                self.assertEqual(tokenize(text), analyzer(text))
+
+    @override_settings(RECOMMENDER_BACKEND='recent')
+    def test_skipped_when_backend_ignores_interests(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            record_interaction(self.user, self.post, 'like')
+        self.assertEqual(callbacks, [])
+        self.assertFalse(UserInterest.objects.exists())
+
+    @override_settings(RECOMMENDER_BACKEND='hybrid')
+    def test_updated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            record_interaction(self.user, self.post, 'like')
+            # Tranzaksiya ichida hali yozilmagan — UserInterest qatori qulflanmaydi
+            self.assertFalse(UserInterest.objects.exists())
+        self.assertEqual(len(callbacks), 1)
+        terms = UserInterest.objects.get(user=self.user).terms
+        self.assertEqual(set(terms), {'django', 'va', 'python', 'backend'})
+
+
+class BackfillPostTagsTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('tagger', 'tagger@example.com', '+998900000002', password='x' * 12)
+        self.posts = [Post.objects.create(author=author, content=f'post {i}') for i in range(3)]
+        self.tags = Hashtag.objects.bulk_create([Hashtag(name='django'), Hashtag(name='python')])
+        # through='PostTag' dan oldingi avtomatik M2M jadvali
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE "{LEGACY_TABLE}" (id integer PRIMARY KEY AUTOINCREMENT, post_id integer, hashtag_id integer)'
+            )
+            for post in self.posts:
+                for tag in self.tags:
+                    cursor.execute(f'INSERT INTO "{LEGACY_TABLE}" (post_id, hashtag_id) VALUES (%s, %s)', [post.pk, tag.pk])
+        # Bittasi allaqachon ko'chirilgan
+        PostTag.objects.create(post=self.posts[0], hashtag=self.tags[0], created_at=self.posts[0].created_at)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('backfill_post_tags', '--batch-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_writes_nothing(self):
+        self.assertIn("5 ta bog'lanish (6 tadan)", self.run_command('--dry-run'))
+        self.assertEqual(PostTag.objects.count(), 1)
+
+    def test_copies_rows_with_post_created_at(self):
+        self.run_command()
+        self.assertEqual(
+            set(PostTag.objects.values_list('post_id', 'hashtag_id', 'created_at')),
+            {(post.pk, tag.pk, post.created_at) for post in self.posts for tag in self.tags},
+        )
+        # Qayta ishga tushirish hech narsa qo'shmaydi
+        self.assertIn("0 ta bog'lanish", self.run_command())
+        self.assertEqual(PostTag.objects.count(), 6)
+
+    def test_drop_legacy(self):
+        self.run_command('--drop-legacy')
+        self.assertNotIn(LEGACY_TABLE, connection.introspection.table_names())
+        self.assertIn("ko'chiriladigan narsa yo'q", self.run_command())
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('pager', 'pager@example.com', '+998900000003', password='x' * 12)
+        Post.objects.bulk_create([Post(author=author, content=f'post {i}') for i in range(7)])
+        # Bir xil created_at — tartib va cursor id bilan ajratiladi
+        cls.tied = timezone.now()
+        Post.objects.update(created_at=cls.tied)
+        cls.expected = list(Post.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def paginate(self, **params):
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get('/posts/', params))
+        rows = paginator.paginate_queryset(Post.objects.all(), request)
+        return [post.pk for post in rows], paginator.get_next_link(), paginator
+
+    def next_cursor(self, link):
+        return Request(APIRequestFactory().get(link)).query_params['cursor']
+
+    def test_pages_do_not_overlap_on_tied_created_at(self):
+        seen, params = [], {'page_size': 3}
+        while True:
+            ids, link, _ = self.paginate(**params)
+            seen += ids
+            if link is None:
+                break
+            params['cursor'] = self.next_cursor(link)
+        self.assertEqual(seen, self.expected)
+
+    def test_last_page_has_no_next(self):
+        ids, link, paginator = self.paginate(page_size=7)
+        self.assertEqual(ids, self.expected)
+        self.assertIsNone(link)
+        self.assertIsNone(paginator.get_paginated_response([]).data['next'])
+
+        last = Post.objects.get(pk=self.expected[-2])
+        ids, link, _ = self.paginate(page_size=3, cursor=encode_cursor(last.created_at, last.pk))
+        self.assertEqual(ids, self.expected[-1:])
+        self.assertIsNone(link)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        first, _, _ = self.paginate(page_size=3)
+        for cursor in (
+            'garbage!',
+            base64.urlsafe_b64encode(b'not-a-date|1').decode(),
+            base64.urlsafe_b64encode(b'2024-01-01T00:00:00|1|2').decode(),
+            base64.urlsafe_b64encode(b'2024-01-01T00:00:00|abc').decode(),
+            base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+        ):
+            with self.subTest(cursor=cursor):
+                ids, link, _ = self.paginate(page_size=3, cursor=cursor)
+                self.assertEqual(ids, first)
+                self.assertIsNotNone(link)
+
+    def test_inclusive_filter_keeps_position_row(self):
+        post = Post.objects.get(pk=self.expected[2])
+        position = (post.created_at, post.pk)
+        queryset = Post.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)
+        self.assertEqual(list(keyset_filter(queryset, 'created_at', position)), self.expected[3:])
+        self.assertEqual(list(keyset_filter(queryset, 'created_at', position, inclusive=True)), self.expected[2:])
+
+
+class ReconcileCountersTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'alice@example.com', '+998900000011', password='x' * 12)
+        self.bob = User.objects.create_user('bob', 'bob@example.com', '+998900000012', password='x' * 12)
+        self.carol = User.objects.create_user('carol', 'carol@example.com', '+998900000013', password='x' * 12)
+        self.post = Post.objects.create(author=self.alice, content='oddiy post')
+        self.viral = Post.objects.create(author=self.alice, content='sharded post')
+        counters.promote(self.viral, shards=4)
+        Post.objects.create(author=self.carol, content='carol posti')
+
+        # API view'lardagi kabi: yozuv + F() hisoblagich
+        for follower, following in ((self.bob, self.alice), (self.carol, self.alice), (self.alice, self.carol)):
+            UserFollow.objects.create(follower=follower, following=following)
+            User.objects.filter(pk=follower.pk).update(following_count=F('following_count') + 1)
+            User.objects.filter(pk=following.pk).update(followers_count=F('followers_count') + 1)
+        for user in (self.bob, self.carol):
+            Like.objects.create(post=self.post, user=user)
+            counters.adjust(self.post, 'likes_count', 1)
+            Like.objects.create(post=self.viral, user=user)
+            counters.adjust(self.viral, 'likes_count', 1)
+        Comment.objects.create(post=self.post, author=self.carol, content='zo\'r')
+        counters.adjust(self.post, 'comments_count', 1)
+        View.objects.create(post=self.post, user=self.bob)
+        counters.adjust(self.post, 'views_count', 1)
+
+    def snapshot(self):
+        return (
+            list(Post.objects.order_by('pk').values_list('likes_count', 'comments_count', 'views_count')),
+            list(User.objects.order_by('pk').values_list('followers_count', 'following_count', 'posts_count')),
+        )
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('reconcile_counters', '--batch-size', '1', *args, stdout=out)
+        return out.getvalue()
+
+    def test_restores_corrupted_and_cascade_drifted_counters(self):
+        # Sharded postda Post qatori faqat asos: like'lar shard'larda
+        self.assertEqual(counters.get_count(Post.objects.get(pk=self.viral.pk), 'likes_count', from_db=True), 2)
+        self.assertIn('0 ta post, 0 ta foydalanuvchi', self.run_command())
+
+        # Qo'lda buzilgan qiymatlar
+        Post.objects.filter(pk=self.post.pk).update(likes_count=40, views_count=-3)
+        Post.objects.filter(pk=self.viral.pk).update(likes_count=7)
+        User.objects.filter(pk=self.bob.pk).update(posts_count=5, following_count=0)
+        # Cascade: carol'ning like/comment/follow yozuvlari signal'siz F() hisoblagichlarni yangilamaydi
+        self.carol.delete()
+        drifted = self.snapshot()
+
+        self.assertIn('[dry-run] Tuzatildi: 2 ta post, 2 ta foydalanuvchi', self.run_command('--dry-run'))
+        self.assertEqual(self.snapshot(), drifted)
+
+        self.assertIn('Tuzatildi: 2 ta post, 2 ta foydalanuvchi', self.run_command())
+        self.assertEqual(self.snapshot(), (
+            [(1, 0, 1), (-1, 0, 0)],  # viral: shard'larda 2, like 1 — Post qatoridagi asos -1
+            [(1, 0, 2), (0, 1, 0)],
+        ))
+        self.assertEqual(counters.get_count(Post.objects.get(pk=self.viral.pk), 'likes_count', from_db=True), 1)
+        self.assertIn('0 ta post, 0 ta foydalanuvchi', self.run_command())
+
+
+# Har testda bir nechta foydalanuvchi yaratiladi — PBKDF2 o'rniga tez hasher
+@override_settings(
+    FEED_FANOUT_MAX_FOLLOWERS=1, FEED_FANOUT_BATCH_SIZE=2,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class FeedTests(TestCase):
+    """Fan-out gibrid: followerlari FEED_FANOUT_MAX_FOLLOWERS dan ko'p mualliflar o'qishda tortiladi."""
+
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.reader = self.user('reader')
+        self.other = self.user('other')
+        self.small = self.user('small')  # 1 follower — push
+        self.star = self.user('star')  # 2 follower — pull
+        self.follow(self.reader, self.small)
+        self.follow(self.reader, self.star)
+        self.follow(self.other, self.star)
+        cache.clear()  # pull mualliflar ro'yxati follow'lardan keyin hisoblansin
+
+    def user(self, username):
+        return User.objects.create_user(username, f'{username}@example.com', f'+99890{User.objects.count():07d}', password='x' * 12)
+
+    def follow(self, follower, following):
+        # FollowView kabi: yozuv + F() hisoblagichlar (post_save signal inbox'ni to'ldiradi)
+        UserFollow.objects.create(follower=follower, following=following)
+        User.objects.filter(pk=follower.pk).update(following_count=F('following_count') + 1)
+        User.objects.filter(pk=following.pk).update(followers_count=F('followers_count') + 1)
+
+    def post(self, author, minutes_ago, fan=True):
+        post = Post.objects.create(author=author, content=f'{author.username} {minutes_ago}')
+        Post.objects.filter(pk=post.pk).update(created_at=self.now - timedelta(minutes=minutes_ago))
+        post.refresh_from_db()
+        if fan:
+            fan_out(post)
+        return post
+
+    def inbox(self, user):
+        return set(TimelineEntry.objects.filter(owner=user).values_list('post_id', flat=True))
+
+    def test_push_author_fans_out_pull_author_does_not(self):
+        pushed = self.post(self.small, 2)
+        pulled = self.post(self.star, 1)
+        self.assertEqual(self.inbox(self.reader), {pushed.pk})
+        self.assertEqual(self.inbox(self.other), set())
+        # Muallifning o'z inbox'i har doim yoziladi
+        self.assertEqual(self.inbox(self.star), {pulled.pk})
+
+        posts, next_cursor = feed_page(self.reader)
+        self.assertEqual(posts, [pulled, pushed])
+        self.assertIsNone(next_cursor)
+        self.assertEqual(feed_page(self.other)[0], [pulled])
+
+    def test_fan_out_batches_all_followers(self):
+        followers = [self.user(f'fan{i}') for i in range(5)]
+        for follower in followers:
+            UserFollow.objects.create(follower=follower, following=self.small)
+        post = self.post(self.small, 1)
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(post=post).values_list('owner_id', flat=True)),
+            {self.small.pk, self.reader.pk, *(follower.pk for follower in followers)},
+        )
+
+    def test_merge_deduplicates_and_pages_without_overlap(self):
+        # star hali push bo'lgan paytdagi postlar inbox'da ham bor, endi pull orqali ham keladi
+        with override_settings(FEED_FANOUT_MAX_FOLLOWERS=10):
+            cache.clear()
+            old = [self.post(self.star, minutes) for minutes in (9, 7, 5)]
+        cache.clear()
+        self.assertTrue({post.pk for post in old} <= self.inbox(self.reader))
+        new = [self.post(self.star, minutes) for minutes in (3, 1)]
+        pushed = [self.post(self.small, minutes) for minutes in (8, 4, 2)]
+        expected = sorted(old + new + pushed, key=lambda post: post.created_at, reverse=True)
+
+        seen, cursor = [], None
+        while True:
+            posts, cursor = feed_page(self.reader, cursor=cursor, limit=3)
+            seen += posts
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_backfill_on_follow(self):
+        newcomer = self.user('newcomer')
+        posts = [self.post(self.small, minutes) for minutes in range(1, FOLLOW_BACKFILL_LIMIT + 3)]
+        star_post = self.post(self.star, 0)
+
+        self.follow(newcomer, self.small)
+        self.follow(newcomer, self.star)
+        # Push muallifning oxirgi FOLLOW_BACKFILL_LIMIT ta posti; pull muallif inbox'ga yozilmaydi
+        self.assertEqual(self.inbox(newcomer), {post.pk for post in posts[:FOLLOW_BACKFILL_LIMIT]})
+        self.assertEqual(feed_page(newcomer, limit=2)[0], [star_post, posts[0]])
+
+        UserFollow.objects.get(follower=newcomer, following=self.small).delete()
+        self.assertEqual(self.inbox(newcomer), set())
+        self.assertEqual(feed_page(newcomer)[0], [star_post])
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+REALTIME_TEST = {'MAX_SUBSCRIPTIONS': 2, 'LIKE_COALESCE_WINDOW': 0.25, 'BATCH_WINDOW': 0.05, 'BATCH_MAX': 3}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, REALTIME=REALTIME_TEST)
+class LikeCommentConsumerTests(TestCase):
+    async def connect(self, subprotocols=None):
+        communicator = WebsocketCommunicator(LikeCommentConsumer.as_asgi(), '/ws/like_comment/', subprotocols=subprotocols)
+        connected, subprotocol = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(subprotocol, subprotocols[0] if subprotocols else None)
+        return communicator
+
+    async def request(self, communicator, payload):
+        await communicator.send_json_to(payload)
+        return await communicator.receive_json_from()
+
+    async def test_subscribe_and_unsubscribe(self):
+        communicator = await self.connect()
+        reply = await self.request(communicator, {'type': 'subscribe', 'posts': ['abc', 'abc']})
+        self.assertEqual(reply, {'type': 'subscribed', 'posts': ['abc'], 'rejected': [], 'limit': 2})
+
+        await realtime.apublish(post_group('abc'), {'type': 'like', 'post_id': 'abc', 'like_count': 3})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'like', 'post_id': 'abc', 'like_count': 3})
+
+        reply = await self.request(communicator, {'type': 'unsubscribe', 'posts': 'abc'})
+        self.assertEqual(reply['posts'], [])
+        await realtime.apublish(post_group('abc'), {'type': 'like', 'post_id': 'abc', 'like_count': 4})
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_subscription_limit(self):
+        communicator = await self.connect()
+        reply = await self.request(communicator, {'type': 'subscribe', 'posts': ['a1', 'b2', 'c3', 'bad:uid']})
+        # Noto'g'ri uid'lar va limitdan oshganlar rad etiladi
+        self.assertEqual(reply, {'type': 'subscribed', 'posts': ['a1', 'b2'], 'rejected': ['bad:uid', 'c3'], 'limit': 2})
+        reply = await self.request(communicator, {'type': 'subscribe', 'posts': ['c3']})
+        self.assertEqual(reply['rejected'], ['c3'])
+
+        await self.request(communicator, {'type': 'unsubscribe', 'posts': ['a1']})
+        reply = await self.request(communicator, {'type': 'subscribe', 'posts': ['c3']})
+        self.assertEqual((reply['posts'], reply['rejected']), (['b2', 'c3'], []))
+        await communicator.disconnect()
+
+    async def test_error_frames(self):
+        communicator = await self.connect()
+        await communicator.send_to(text_data='not json')
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'error', 'code': 'invalid_json'})
+        for payload, code in (
+            (['subscribe'], 'invalid_message'),
+            ({'type': 'subscribe', 'posts': 5}, 'invalid_posts'),
+            ({'type': 'unsubscribe'}, 'invalid_posts'),
+            # Klient hisobiga ishonilmaydi — like/comment faqat serverdan
+            ({'type': 'like', 'post_id': 'abc', 'like_count': 10 ** 6}, 'unsupported_type'),
+        ):
+            with self.subTest(payload=payload):
+                self.assertEqual(await self.request(communicator, payload), {'type': 'error', 'code': code})
+        await communicator.send_to(bytes_data=b'\xc1')
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'error', 'code': 'invalid_msgpack'})
+        await communicator.disconnect()
+
+    async def test_like_count_read_from_database(self):
+        post = await sync_to_async(self.create_liked_post)()
+        communicator = await self.connect()
+        await self.request(communicator, {'type': 'subscribe', 'posts': [post.uid]})
+        await sync_to_async(realtime._publish_like_counts)([post.pk])
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'like', 'post_id': post.uid, 'like_count': 2})
+        await communicator.disconnect()
+
+    async def publish_likes(self, count):
+        for like_count in range(1, count + 1):
+            await realtime.apublish(post_group('abc'), {'type': 'like', 'post_id': 'abc', 'like_count': like_count})
+
+    def like(self, like_count):
+        return {'type': 'like', 'post_id': 'abc', 'like_count': like_count}
+
+    async def test_msgpack_events_batched_within_window(self):
+        communicator = await self.connect(subprotocols=['threads.msgpack'])
+        await communicator.send_to(bytes_data=msgpack.packb({'type': 'subscribe', 'posts': ['abc']}))
+        reply = msgpack.unpackb(await communicator.receive_from())
+        self.assertEqual(reply['posts'], ['abc'])
+
+        # BATCH_MAX (3) to'lsa darhol, qolgani BATCH_WINDOW dan keyin
+        await self.publish_likes(4)
+        frame = msgpack.unpackb(await communicator.receive_from())
+        self.assertEqual(frame, {'type': 'batch', 'events': [self.like(1), self.like(2), self.like(3)]})
+        # Oynada bitta hodisa — BATCH_WINDOW dan keyin, batch o'ramisiz
+        self.assertEqual(msgpack.unpackb(await communicator.receive_from()), self.like(4))
+        await communicator.disconnect()
+
+    async def test_json_subprotocol_batches_legacy_does_not(self):
+        batched = await self.connect(subprotocols=['threads.json'])
+        legacy = await self.connect()
+        for communicator in (batched, legacy):
+            await self.request(communicator, {'type': 'subscribe', 'posts': ['abc']})
+
+        await self.publish_likes(2)
+        frame = await batched.receive_from(timeout=1)
+        self.assertEqual(json.loads(frame), {'type': 'batch', 'events': [self.like(1), self.like(2)]})
+        self.assertEqual(await legacy.receive_json_from(), self.like(1))
+        self.assertEqual(await legacy.receive_json_from(), self.like(2))
+        for communicator in (batched, legacy):
+            await communicator.disconnect()
+
+    def create_liked_post(self):
+        author = User.objects.create_user('liked', 'liked@example.com', '+998900000021', password='x' * 12)
+        post = Post.objects.create(author=author, content='salom')
+        counters.adjust(post, 'likes_count', 2)
+        return post
+
+
+class LikeCountCoalescerTests(TestCase):
+    def setUp(self):
+        self.coalescer = realtime.LikeCountCoalescer(window=60)
+        self.addCleanup(self.coalescer.close)
+
+    def test_likes_within_window_publish_once(self):
+        with mock.patch.object(realtime, '_publish_like_counts') as publish:
+            for post_id in (1, 1, 2, 1):
+                self.coalescer.touch(post_id)
+            # Oyna tugamagan — hech narsa yuborilmaydi
+            self.assertIsNotNone(self.coalescer.flush())
+            publish.assert_not_called()
+
+            self.coalescer.flush(now=float('inf'))
+            publish.assert_called_once_with([1, 2])
+
+            # Flush'dan keyingi like yangi oyna ochadi
+            self.coalescer.touch(1)
+            self.coalescer.flush(now=float('inf'))
+            self.assertEqual(publish.call_args_list[-1], mock.call([1]))
+
+    def test_publish_error_does_not_stop_coalescer(self):
+        with mock.patch.object(realtime, '_publish_like_counts', side_effect=RuntimeError) as publish:
+            with self.assertLogs(realtime.logger, 'ERROR') as logs:
+                self.coalescer.touch(1)
+                self.assertIsNone(self.coalescer.flush(now=float('inf')))
+                # Xato post'ni pending'da qoldirmaydi — keyingi like yana yuboriladi
+                self.coalescer.touch(1)
+                self.coalescer.flush(now=float('inf'))
+        self.assertEqual(publish.call_count, 2)
+        self.assertEqual(len(logs.records), 2)
+
+    @override_settings(REALTIME={**REALTIME_TEST, 'LIKE_COALESCE_WINDOW': 0})
+    def test_like_changed_without_window_publishes_after_commit(self):
+        post = Post(pk=7)
+        with mock.patch.object(realtime, '_publish_like_counts') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                realtime.like_changed(post)
+                publish.assert_not_called()
+        publish.assert_called_once_with([7])
+
+
+class HyperLogLogTests(SimpleTestCase):
+    TRIALS = 20
+
+    def relative_errors(self, count, precision=12):
+        errors = []
+        for trial in range(self.TRIALS):
+            sketch = HyperLogLog(precision)
+            sketch.update(f'{trial}:{i}' for i in range(count))
+            errors.append((sketch.estimate() - count) / count)
+        return errors
+
+    def test_error_near_linear_counting_cutoff(self):
+        # p=12: standart xato 1.04/sqrt(4096) ~ 1.6%. Eski 2.5m ostonasi 10k atrofida ~2.5% siljish berardi
+        for count in (1_000, 10_000, 30_000):
+            with self.subTest(count=count):
+                errors = self.relative_errors(count)
+                self.assertLess(abs(sum(errors) / len(errors)), 0.01)
+                self.assertLess(sum(abs(error) for error in errors) / len(errors), 0.016)
+                self.assertLess(max(abs(error) for error in errors), 0.05)
+
+    def test_small_and_empty(self):
+        self.assertEqual(len(HyperLogLog()), 0)
+        sketch = HyperLogLog()
+        sketch.update(range(50))
+        self.assertEqual(len(sketch), 50)
+
+    def test_merge_matches_union(self):
+        left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        left.update(range(0, 6000))
+        right.update(range(4000, 10_000))
+        union.update(range(10_000))
+        self.assertEqual(left.merge(right).estimate(), union.estimate())
+        self.assertEqual(HyperLogLog.from_bytes(union.to_bytes()).estimate(), union.estimate())
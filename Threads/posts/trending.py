@@ -0,0 +1,239 @@
+import hashlib
+import heapq
+import math
+import threading
+import time
+from datetime import timedelta
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+
+# Hodisa og'irliklari: hashtag bilan post yozish like'dan kuchliroq signal
+EVENT_WEIGHTS = {
+    'post': 3,
+    'comment': 2,
+    'like': 1,
+}
+
+
+@lru_cache(maxsize=4096)
+def _digest(key, depth):
+    return hashlib.blake2b(key.encode(), digest_size=4 * depth).digest()
+
+
+class CountMinSketch:
+    """
+    depth x width hisoblagichlar jadvali: har bir kalit har bir qatorda bitta katakka tushadi,
+    baho — qatorlar bo'yicha minimum (faqat ortiqcha baholaydi, hech qachon kam emas).
+    Jadvallar chiziqli — oynalarni qo'shish/ayirish oddiy massiv amallari.
+    """
+
+    def __init__(self, width=1024, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def positions(self, key):
+        digest = _digest(key, self.depth)
+        return np.frombuffer(digest, dtype=np.uint32) % self.width
+
+    def add(self, key, count=1):
+        self.table[self._rows, self.positions(key)] += count
+
+    def estimate(self, key):
+        return int(self.table[self._rows, self.positions(key)].min())
+
+    def __iadd__(self, other):
+        self.table += other.table
+        return self
+
+    def __isub__(self, other):
+        self.table -= other.table
+        return self
+
+
+class TrendingEngine:
+    """
+    Sirpanuvchi oynali trending hashtaglar.
+
+    Vaqt BUCKET_SECONDS li bo'laklarga bo'linadi, har bir bo'lakning o'z Count-Min sketch'i bor.
+    Oxirgi WINDOW_BUCKETS bo'lak — "hozirgi" oyna, undan oldingi BASELINE_BUCKETS bo'lak —
+    taqqoslash oynasi. Ikkala oynaning yig'indi sketch'lari alohida saqlanadi, bo'lak oynadan
+    chiqqanda ayiriladi. Ball — hajm emas, tezlik: hozirgi son kutilgan sondan qanchalik oshgan.
+    Eng yuqori ballli CAPACITY ta hashtag min-heap'da saqlanadi, shuning uchun so'rov O(K).
+
+    Sketch'lar jarayon ichida, lekin hodisalar faqat bazadan o'qiladi (sync): har bir manba
+    bo'yicha oxirgi o'qilgan id eslab qolinadi va har SYNC_SECONDS da yangilari qo'shiladi.
+    Shuning uchun har bir worker boshqa worker'lar qabul qilgan like/comment/postlarni ham ko'radi
+    va bir xil natija beradi (SYNC_SECONDS kechikish bilan).
+    """
+
+    def __init__(self, bucket_seconds=900, window_buckets=4, baseline_buckets=96,
+                 width=1024, depth=4, capacity=200, min_count=3, sync_seconds=30):
+        self.bucket_seconds = bucket_seconds
+        self.window_buckets = window_buckets
+        self.baseline_buckets = baseline_buckets
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.min_count = min_count
+        self.sync_seconds = sync_seconds
+
+        self._buckets = {}
+        self._recent = CountMinSketch(width, depth)
+        self._baseline = CountMinSketch(width, depth)
+        self._current = None
+        self._scores = {}
+        self._heap = []
+        self._lock = threading.RLock()
+        self._seen = {}
+        self._synced_at = None
+
+    def _bucket_index(self, at=None):
+        timestamp = time.time() if at is None else at.timestamp()
+        return int(timestamp // self.bucket_seconds)
+
+    def _window(self, index, current):
+        age = current - index
+        if 0 <= age < self.window_buckets:
+            return self._recent
+        if self.window_buckets <= age < self.window_buckets + self.baseline_buckets:
+            return self._baseline
+        return None
+
+    def _advance(self, index):
+        if self._current is not None and index <= self._current:
+            return
+        previous, self._current = self._current, index
+        if previous is None:
+            return
+        # Oynadan oynaga o'tgan yoki eskirgan bo'laklar yig'indilardan ko'chiriladi
+        for bucket_index, sketch in list(self._buckets.items()):
+            old = self._window(bucket_index, previous)
+            new = self._window(bucket_index, index)
+            if old is new:
+                continue
+            if old is not None:
+                old -= sketch
+            if new is not None:
+                new += sketch
+            else:
+                del self._buckets[bucket_index]
+        self._rescore()
+
+    def record(self, names, weight=1, at=None):
+        """Hashtaglar uchun hodisa (at — hodisa vaqti, isitishda o'tgan vaqt beriladi)."""
+        if not names:
+            return
+        index = self._bucket_index(at)
+        with self._lock:
+            self._advance(index)
+            window = self._window(index, self._current)
+            if window is None:
+                return
+            sketch = self._buckets.get(index)
+            if sketch is None:
+                sketch = self._buckets[index] = CountMinSketch(self.width, self.depth)
+            for name in names:
+                sketch.add(name, weight)
+                window.add(name, weight)
+            for name in names:
+                self._offer(name, self.score(name))
+
+    def counts(self, name):
+        """(hozirgi oynadagi son, taqqoslash oynasidagi son) — sketch bahosi."""
+        return self._recent.estimate(name), self._baseline.estimate(name)
+
+    def score(self, name):
+        recent, baseline = self.counts(name)
+        if recent < self.min_count:
+            return 0.0
+        expected = baseline * self.window_buckets / self.baseline_buckets
+        # Puasson shovqiniga normallashtirilgan o'sish: yangi paydo bo'lgan teglar ham ko'tariladi
+        return (recent - expected) / math.sqrt(expected + 1)
+
+    def _offer(self, name, score):
+        if score <= 0:
+            self._scores.pop(name, None)
+            return
+        if name in self._scores or len(self._scores) < self.capacity:
+            self._scores[name] = score
+            heapq.heappush(self._heap, (score, name))
+        else:
+            self._drop_stale()
+            if score <= self._heap[0][0]:
+                return
+            _, evicted = heapq.heappop(self._heap)
+            del self._scores[evicted]
+            self._scores[name] = score
+            heapq.heappush(self._heap, (score, name))
+        if len(self._heap) > 4 * self.capacity:
+            self._compact()
+
+    def _drop_stale(self):
+        # Heap'da eski ballar qolishi mumkin (lazy o'chirish) — tepadagi yaroqsizlarini olib tashlaymiz
+        while self._heap and self._scores.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        self._heap = [(score, name) for name, score in self._scores.items()]
+        heapq.heapify(self._heap)
+
+    def _rescore(self):
+        scores = {name: self.score(name) for name in self._scores}
+        self._scores = {name: score for name, score in scores.items() if score > 0}
+        self._compact()
+
+    def top(self, limit=10):
+        """[(name, score, recent_count), ...] — ball bo'yicha kamayish tartibida."""
+        with self._lock:
+            self._advance(self._bucket_index())
+            best = heapq.nlargest(limit, self._scores.items(), key=lambda item: item[1])
+            return [(name, score, self._recent.estimate(name)) for name, score in best]
+
+    def sync(self):
+        """
+        Oynadagi, hali o'qilmagan postlar (teglar), like va commentlarni bazadan qo'shadi.
+        Birinchi chaqiruv holatni to'liq isitadi, keyingilari faqat oxirgi id'dan keyingilarini o'qiydi.
+        """
+        from .models import Comment, Like, PostTag
+
+        span = self.bucket_seconds * (self.window_buckets + self.baseline_buckets)
+        since = timezone.now() - timedelta(seconds=span)
+        sources = {
+            'post': PostTag.objects.values_list('id', 'hashtag__name', 'created_at'),
+            'comment': Comment.objects.filter(post__tags__isnull=False).values_list('id', 'post__tags__name', 'created_at'),
+            'like': Like.objects.filter(post__tags__isnull=False).values_list('id', 'post__tags__name', 'created_at'),
+        }
+        with self._lock:
+            self._advance(self._bucket_index())
+            for action, queryset in sources.items():
+                rows = queryset.filter(id__gt=self._seen.get(action, 0), created_at__gte=since).order_by('id')
+                for row_id, name, created_at in rows.iterator(chunk_size=2000):
+                    self.record([name], EVENT_WEIGHTS[action], at=created_at)
+                    self._seen[action] = row_id
+            self._synced_at = time.monotonic()
+
+    def refresh(self):
+        """Oxirgi sync'dan SYNC_SECONDS o'tgan bo'lsa yangi hodisalarni o'qiydi."""
+        with self._lock:
+            if self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_seconds:
+                self.sync()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_trending_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TrendingEngine(**{key.lower(): value for key, value in settings.TRENDING.items()})
+    _engine.refresh()
+    return _engine
@@ -1,9 +1,12 @@
 from django.urls import path, re_path
-from .views import UserPostsListView, PostCreateView, LikeToggleView, CommentListCreateView, ViewListCreateAPIView, RecommendedPostsView, PostUpdateDeleteView
+from .views import UserPostsListView, PostCreateView, LikeToggleView, CommentListCreateView, ViewListCreateAPIView, RecommendedPostsView, PostUpdateDeleteView, FeedView, TrendingHashtagsView, TagPostsView
 
 
 urlpatterns = [
     re_path(r'^recommended/?$', RecommendedPostsView.as_view(), name='post-list'),
+    re_path(r'^feed/?$', FeedView.as_view(), name='post-feed'),
+    re_path(r'^trending/?$', TrendingHashtagsView.as_view(), name='post-trending'),
+    re_path(r'^tags/(?P<names>[^/]+)/?$', TagPostsView.as_view(), name='post-tag'),
     re_path(r'^add/?$', PostCreateView.as_view(), name='post-create'),
     re_path(r'^(?P<uid>[a-zA-Z0-9]+)/?$', PostUpdateDeleteView.as_view(), name='post-detail-update-delete'),
     re_path(r'^(?P<uid>[a-zA-Z0-9]+)/like/?$', LikeToggleView.as_view(), name='post-like'),
@@ -1,3 +1,5 @@
+from operator import attrgetter
+
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -5,9 +7,22 @@ from .models import Post, PostMedia, Like, View, Comment, UserInteraction
 from .serializers import PostSerializer, PostMediaSerializer, CommentSerializer, LikeSerializer, ViewSerializer
 from rest_framework.decorators import api_view, permission_classes, APIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from .recommender.interests import record_interaction
+from .recommender.backends import get_recommender
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from .feed import fan_out, feed_page
+from .tags import tag_page
+from . import counters, realtime
+from .ingest import get_view_buffer, resolve_post_id
+from core.pagination import KeysetPagination
+from core.cache import cache_response, page_state, post_scope, user_scope
+
+
+def post_state(view):
+    # ETag validatori: post topilmasa None — view 404 qaytaradi
+    post = Post.objects.filter(uid=view.kwargs['uid']).for_etag().first()
+    return post.etag_state() if post else None
 
 
 class PostCreateView(generics.CreateAPIView):
@@ -16,7 +31,9 @@ class PostCreateView(generics.CreateAPIView):
     parser_classes = [MultiPartParser, FormParser]
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        # Followerlar inbox'iga commit'dan keyin yoziladi
+        transaction.on_commit(lambda: fan_out(post))
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -34,12 +51,16 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
     
 
 class PostUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Post.objects.all()
+    queryset = Post.objects.with_related()
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
     lookup_field = 'uid'  # Agar modelda UUID ishlatilgan bo‘lsa
     parser_classes = [MultiPartParser, FormParser]
 
+    @cache_response(lambda view: [post_scope(view.kwargs['uid'])], post_state)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
@@ -49,9 +70,18 @@ class PostUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
 class UserPostsListView(generics.ListAPIView):
     serializer_class = PostSerializer
 
+    @cache_response(
+        lambda view: [user_scope(view.kwargs['username'], 'posts')],
+        lambda view: page_state(
+            Post.objects.filter(author__username=view.kwargs['username']).for_etag(), view, Post.etag_state,
+        ),
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         username = self.kwargs.get('username')  # yoki user_id bo'lishi mumkin
-        return Post.objects.filter(author__username=username).order_by('-created_at')
+        return Post.objects.with_related().filter(author__username=username).order_by('-created_at')
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -69,22 +99,27 @@ class LikeToggleView(generics.ListCreateAPIView):
     
     def post(self, request, uid, *args, **kwargs):
         post = get_object_or_404(Post, uid=uid)
-        like, created = Like.objects.get_or_create(post=post, user=request.user)
-        if not created:
-            # Agar like allaqachon mavjud bo‘lsa – unlike qilamiz
-            like.delete()
-            action = 'Disliked'
-            status_code = status.HTTP_204_NO_CONTENT
-        else:
-            # Yangi like qo‘shildi – interaction yozamiz
-            UserInteraction.objects.create(
-                user=request.user,
-                post=post,
-                action='like'
-            )
-            action = 'Liked'
-            status_code = status.HTTP_201_CREATED
-        likes_count = Like.objects.filter(post=post).count()
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(post=post, user=request.user)
+            if not created:
+                # Agar like allaqachon mavjud bo‘lsa – unlike qilamiz
+                like.delete()
+                counters.adjust(post, 'likes_count', -1)
+                action = 'Disliked'
+                status_code = status.HTTP_204_NO_CONTENT
+            else:
+                # Yangi like qo‘shildi – interaction yozamiz
+                UserInteraction.objects.create(
+                    user=request.user,
+                    post=post,
+                    action='like'
+                )
+                counters.adjust(post, 'likes_count', 1)
+                record_interaction(request.user, post, 'like')
+                action = 'Liked'
+                status_code = status.HTTP_201_CREATED
+            realtime.like_changed(post)
+        likes_count = counters.get_count(post, 'likes_count', from_db=True)
         return Response({'message': action, 'likes_count': likes_count}, status=status_code)
 
 
@@ -92,37 +127,29 @@ class ViewListCreateAPIView(generics.ListCreateAPIView):
     serializer_class = ViewSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    pagination_ordering_field = 'viewed_at'
+
     def get_queryset(self):
         uid = self.kwargs.get('uid')
         return View.objects.filter(post__uid=uid)
 
     def create(self, request, *args, **kwargs):
         uid = self.kwargs.get('uid')
-        try:
-            post = Post.objects.get(uid=uid)
-        except Post.DoesNotExist:
+        # Keshdagi uid -> id; post yo'q bo'lsa avvalgidek 404
+        if resolve_post_id(uid) is None:
             return Response({'error': 'Post not found'}, status=404)
 
-        user = request.user if request.user.is_authenticated else None
-
-        session_id = request.session.session_key
-        if not session_id:
-            request.session.create()
-            session_id = request.session.session_key
-
-        view_exists = View.objects.filter(
-            post=post,
-            user=user if user else None,
-            session_id=session_id
-        ).exists()
-
-        if not view_exists:
-            View.objects.create(
-                post=post,
-                user=user,
-                session_id=session_id
-            )
+        if request.user.is_authenticated:
+            # Login qilgan user id bo'yicha aniqlanadi, sessiya yaratish shart emas
+            user_id, session_id = request.user.id, None
+        else:
+            user_id, session_id = None, request.session.session_key
+            if not session_id:
+                request.session.create()
+                session_id = request.session.session_key
 
+        # Hodisa buferga tushadi va fon oqimida bulk yoziladi (orada o'chirilgan postlar tashlab yuboriladi)
+        get_view_buffer().add(uid, user_id, session_id)
         return Response({'message': 'View registered'}, status=201)
 
 
@@ -130,19 +157,74 @@ class CommentListCreateView(generics.ListCreateAPIView):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
 
+    @cache_response(
+        lambda view: [post_scope(view.kwargs['uid'])],
+        # Kommentlar tahrirlanmaydi — javobda o'zgaradigani faqat muallif username'i
+        lambda view: page_state(
+            Comment.objects.filter(post__uid=view.kwargs['uid']).select_related('author')
+            .only('created_at', 'author__username'),
+            view, attrgetter('pk', 'author.username'),
+        ),
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         post_uid = self.kwargs.get('uid')
-        return Comment.objects.filter(post__uid=post_uid)
+        return Comment.objects.filter(post__uid=post_uid).select_related('author', 'post')
 
     def perform_create(self, serializer):
         post_uid = self.kwargs.get('uid')
         post = Post.objects.get(uid=post_uid)
-        UserInteraction.objects.create(
-            user=self.request.user,
-            post=post,
-            action='comment'
+        with transaction.atomic():
+            UserInteraction.objects.create(
+                user=self.request.user,
+                post=post,
+                action='comment'
+            )
+            record_interaction(self.request.user, post, 'comment')
+            comment = serializer.save(author=self.request.user, post=post)
+            counters.adjust(post, 'comments_count', 1)
+            realtime.comment_created(comment)
+
+
+class FeedView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        paginator = KeysetPagination()
+        paginator.request = request
+        posts, next_cursor = feed_page(
+            request.user,
+            cursor=request.query_params.get(paginator.cursor_query_param),
+            limit=paginator.get_page_size(request),
+        )
+        serializer = PostSerializer(posts, many=True, context={'request': request})
+        next_link = paginator.build_link(next_cursor) if next_cursor else None
+        return Response({'next': next_link, 'results': serializer.data})
+
+
+class TagPostsView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, names):
+        # /posts/tags/python,django?match=any — vergul bilan bir nechta teg, default AND
+        names = [name.lstrip('#') for name in names.split(',') if name.strip('#')]
+        match = 'any' if request.query_params.get('match') == 'any' else 'all'
+        paginator = KeysetPagination()
+        paginator.request = request
+        posts, next_cursor = tag_page(
+            names,
+            match=match,
+            cursor=request.query_params.get(paginator.cursor_query_param),
+            limit=paginator.get_page_size(request),
         )
-        serializer.save(author=self.request.user, post=post)
+        serializer = PostSerializer(posts, many=True, context={'request': request})
+        next_link = paginator.build_link(next_cursor) if next_cursor else None
+        return Response({'next': next_link, 'results': serializer.data})
+
+
+RECOMMENDED_POSTS_COUNT = 20
 
 
 class RecommendedPostsView(APIView):
@@ -150,52 +232,40 @@ class RecommendedPostsView(APIView):
 
     def get(self, request):
         user = request.user
-        posts = Post.objects.all()
+        posts = Post.objects.with_related()
+        recommended_posts = None
 
         # Agar foydalanuvchi autentifikatsiya qilingan bo'lsa, tavsiya algoritmini qo'llaymiz
         if user.is_authenticated:
-            # Foydalanuvchi yoqtirgan postlar matni va hashtaglarini olish
-            liked_posts = UserInteraction.objects.filter(user=user, action='like').values_list('post__content', flat=True)
-            liked_tags = UserInteraction.objects.filter(user=user, action='like').values_list('post__tags__name', flat=True)
-            liked_texts = []
-            for content in liked_posts:
-                content = content if content else ''
-                tags = ' '.join([tag for tag in liked_tags if tag])  # Hashtaglarni birlashtirish
-                combined_text = f"{content} {tags}".strip()
-                if combined_text:
-                    liked_texts.append(combined_text)
-
-            if liked_texts:
-                # Post matnlari va hashtaglarini olish
-                post_texts = []
-                for post in posts:
-                    content = post.content if post.content else ''
-                    tags = ' '.join([tag.name for tag in post.tags.all()])
-                    combined_text = f"{content} {tags}".strip()
-                    if combined_text:
-                        post_texts.append(combined_text)
-
-                if not post_texts:
-                    # Agar matnlar bo'lmasa, so'nggi postlarni qaytarish
-                    recommended_posts = posts.order_by('-created_at')[:20]
-                else:
-                    # TF-IDF vektorizatsiya
-                    vectorizer = TfidfVectorizer()
-                    tfidf_matrix = vectorizer.fit_transform(post_texts)
-                    user_tfidf = vectorizer.transform([' '.join(liked_texts)])
-
-                    # O'xshashlikni hisoblash
-                    similarities = cosine_similarity(user_tfidf, tfidf_matrix).flatten()
-                    # Indekslarni tartiblash va int ga aylantirish
-                    recommended_indices = [int(i) for i in similarities.argsort()[-20:][::-1] if i < len(posts)]
-                    # Tartiblangan postlarni olish
-                    recommended_posts = [posts[i] for i in recommended_indices]
-            else:
-                # Agar yoqtirilgan postlar bo'lmasa, so'nggi postlarni qaytarish
-                recommended_posts = posts.order_by('-created_at')[:20]
-        else:
-            # Autentifikatsiya qilinmagan foydalanuvchilar uchun so'nggi postlar
-            recommended_posts = posts.order_by('-created_at')[:20]
+            # Backend settings.RECOMMENDER_BACKEND orqali tanlanadi
+            recommended_posts = get_recommender().recommend_posts(user, RECOMMENDED_POSTS_COUNT) or None
+
+        if recommended_posts is None:
+            # Tavsiya qilib bo'lmasa, so'nggi postlarni qaytarish
+            recommended_posts = posts.order_by('-created_at')[:RECOMMENDED_POSTS_COUNT]
 
         serializer = PostSerializer(recommended_posts, many=True, context={'request': request})
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+TRENDING_DEFAULT_LIMIT = 10
+TRENDING_MAX_LIMIT = 50
+
+
+class TrendingHashtagsView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', TRENDING_DEFAULT_LIMIT))
+        except ValueError:
+            limit = TRENDING_DEFAULT_LIMIT
+        limit = max(1, min(limit, TRENDING_MAX_LIMIT))
+
+        # Sketch'lardan O(K) — har so'rovda GROUP BY yo'q, yangi hodisalar SYNC_SECONDS da bir marta o'qiladi
+        from .trending import get_trending_engine
+        top = get_trending_engine().top(limit)
+        return Response([
+            {'name': name, 'score': round(score, 3), 'count': count}
+            for name, score, count in top
+        ])
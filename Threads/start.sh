@@ -6,6 +6,8 @@
 # Apply database migrations
 python manage.py makemigrations accounts posts
 python manage.py migrate
+# Post.tags through='PostTag' dan oldingi bazalar uchun (yangi bazada hech narsa qilmaydi)
+python manage.py backfill_post_tags
 
 # Run the application
 gunicorn Threads.wsgi:application --bind 0.0.0.0:$PORT